@@ -10,6 +10,8 @@ from .models import (
     Call,
     CallEditHistory,
     CallStatistics,
+    CallDailyRollup,
+    GlobalCounter,
     SavedSearch,
     UploadedFile,
     ExportReport,
@@ -131,6 +133,17 @@ class CallStatisticsAdmin(admin.ModelAdmin):
     list_display = ('contact', 'project', 'total_calls', 'successful_calls', 'response_rate', 'last_call_date')
     readonly_fields = ('updated_at',)
 
+@admin.register(CallDailyRollup)
+class CallDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'project', 'caller', 'status', 'call_result', 'call_count', 'total_duration')
+    list_filter = ('project', 'status', 'call_result')
+    readonly_fields = [field.name for field in CallDailyRollup._meta.fields]
+
+@admin.register(GlobalCounter)
+class GlobalCounterAdmin(admin.ModelAdmin):
+    list_display = ('name', 'value', 'updated_at')
+    readonly_fields = [field.name for field in GlobalCounter._meta.fields]
+
 @admin.register(ContactLog)
 class ContactLogAdmin(admin.ModelAdmin):
     list_display = ('contact', 'action', 'performed_by', 'timestamp')
@@ -1,8 +1,9 @@
 # call_center/excel_imports.py
-import pandas as pd
 import uuid
 from django.contrib.auth import get_user_model
-from .models import Contact, Project, ProjectCaller
+from .models import Contact, Project, ProjectCaller, ProjectMembership
+from .services.cache import invalidate_contact_statistics, invalidate_project_statistics
+from .services.spreadsheets import read_spreadsheet
 from .utils import is_caller_user, clean_string_field
 
 User = get_user_model()
@@ -12,18 +13,20 @@ def import_callers_from_excel(file_obj):
     اکسل تماس‌گیرندگان را پردازش و کاربران تماس‌گیرنده ایجاد می‌کند.
     فرمت: ستون username, first_name, last_name, phone
     """
+    # خواندن جریانی؛ فرمت (xlsx یا csv) از پسوند/محتوای فایل تشخیص داده می‌شود
+    with read_spreadsheet(file_obj) as reader:
+        return _import_callers(reader)
+
+
+def _import_callers(reader):
     created_callers = []
-    try:
-        df = pd.read_excel(file_obj, dtype=str)
-    except Exception:
-        df = pd.read_csv(file_obj, dtype=str)
 
     required_columns = ["username", "first_name", "last_name", "phone"]
     for col in required_columns:
-        if col not in df.columns:
+        if col not in reader.columns:
             raise ValueError(f"ستون '{col}' در فایل موجود نیست.")
 
-    for index, row in df.iterrows():
+    for row_number, row in reader.rows():
         username = clean_string_field(row.get("username", f"user_{uuid.uuid4().hex[:8]}"))
         first_name = clean_string_field(row.get("first_name", ""))
         last_name = clean_string_field(row.get("last_name", ""))
@@ -48,19 +51,31 @@ def import_contacts_from_excel(file_obj, project: Project):
     اکسل مخاطبین را پردازش و مخاطبین پروژه ایجاد می‌کند.
     فرمت: full_name, phone, assigned_caller_username (اختیاری)
     """
-    created_contacts = []
-    try:
-        df = pd.read_excel(file_obj, dtype=str)
-    except Exception:
-        df = pd.read_csv(file_obj, dtype=str)
+    with read_spreadsheet(file_obj) as reader:
+        check_contact_columns(reader.columns)
+        created_contacts = []
+        for chunk in reader.chunks():
+            created_contacts.extend(import_contact_rows(chunk, project))
+        return created_contacts
+
 
+def check_contact_columns(columns):
     # ستون‌های ضروری: نام و شماره
     required_columns = ["full_name", "contact_phone"]
     for col in required_columns:
-        if col not in df.columns:
+        if col not in columns:
             raise ValueError(f"ستون '{col}' در فایل موجود نیست.")
+
+
+def import_contact_rows(rows, project):
+    """
+    ساخت مخاطبین یک دسته ردیف [(شماره ردیف، data)]؛ تماس‌گیرنده‌های دسته با دو کوئری
+    پیدا و مخاطبین با یک bulk_create ساخته می‌شوند. شماره مخاطبین ساخته شده برگردانده می‌شود.
+    """
+    contacts = []
+    caller_phones = {}
     #TODO what is exatcly unknown is for phone ?  a user with random ? number ?
-    for index, row in df.iterrows():
+    for row_number, row in rows:
         full_name = clean_string_field(row.get("full_name", "نامشخص"))
         phone = str(clean_string_field(row.get("contact_phone", f"unknown_{uuid.uuid4().hex[:8]}")))
         assigned_caller_phone = clean_string_field(row.get("assigned_caller_phone", ""))
@@ -69,37 +84,31 @@ def import_contacts_from_excel(file_obj, project: Project):
         if phone.isdigit() and not phone.startswith("0") and len(phone) in (9, 10):
             phone = "0" + phone
 
-        assigned_caller = None
-        is_special = False
-
-
-
-
-        # تلاش برای یافتن تماس‌گیرنده از طریق شماره تلفن
         # اگر شماره تماس‌گیرنده داده شده و بدون صفر بود , صفر اضافه کن
         if assigned_caller_phone and not assigned_caller_phone.startswith("0"):
             assigned_caller_phone = "0" + assigned_caller_phone
-            try:
-                caller = User.objects.get(phone_number=assigned_caller_phone)
-
-                # اگر نقش تماس‌گیرنده یا ادمین دارد → به عنوان تماس‌گیرنده ست شود
-                if is_caller_user(caller, project):
-                    assigned_caller = caller
-                    is_special = True
-            except User.DoesNotExist:
-                assigned_caller = None
-                is_special = False
-
-        # ساخت مخاطب
-        contact = Contact.objects.create(
-            project=project,
-            full_name=full_name,
-            phone=phone,
-            assigned_caller=assigned_caller,
-            is_special=is_special
-        )
-
-        created_contacts.append(contact.phone)
-
-    return created_contacts
-
+            caller_phones[len(contacts)] = assigned_caller_phone
+
+        contacts.append(Contact(project=project, full_name=full_name, phone=phone))
+
+    # تلاش برای یافتن تماس‌گیرنده از طریق شماره تلفن؛
+    # اگر نقش تماس‌گیرنده یا ادمین دارد → به عنوان تماس‌گیرنده ست شود
+    callers = {
+        user.phone_number: user
+        for user in User.objects.filter(phone_number__in=set(caller_phones.values()))
+    }
+    project_callers = set(ProjectMembership.objects.filter(
+        project=project, role="caller", user__in=callers.values()
+    ).values_list("user_id", flat=True))
+    for index, caller_phone in caller_phones.items():
+        caller = callers.get(caller_phone)
+        if caller is not None and (caller.is_staff or caller.pk in project_callers):
+            contacts[index].assigned_caller = caller
+            contacts[index].is_special = True
+
+    # ساخت مخاطبین؛ bulk_create سیگنال post_save نمی‌فرستد و کش آمار همین‌جا باطل می‌شود
+    Contact.objects.bulk_create(contacts)
+    if contacts:
+        invalidate_project_statistics(project.pk)
+        invalidate_contact_statistics(project.pk)
+    return [contact.phone for contact in contacts]
@@ -0,0 +1,105 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from call_center.models import CustomUser, Project, ProjectMembership
+from call_center.services.caller_imports import CallerImport
+from call_center.services.spreadsheets import CHUNK_SIZE
+from call_center.utils import generate_username
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "مقایسه حلقه ردیف به ردیف قبلی upload_callers با CallerImport "
+        "(داده در پایان rollback می‌شود)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help="تعداد تماس‌گیرنده فایل")
+        parser.add_argument('--existing', type=float, default=0.5, help="سهم شماره‌هایی که کاربر دارند")
+        parser.add_argument('--members', type=float, default=0.25, help="سهم شماره‌هایی که عضو پروژه‌اند")
+
+    def _rows(self, count):
+        return [
+            (index + 2, {
+                'phone_number': f'0937{index:07d}',
+                'first_name': f'تماس‌گیرنده {index}',
+                'last_name': 'آزمایشی',
+            })
+            for index in range(count)
+        ]
+
+    def _setup(self, rows, existing, members):
+        owner = get_user_model().objects.create_user(
+            username='benchmark_callers', password='benchmark', phone_number='09999999997',
+        )
+        project = Project.objects.create(name='Benchmark callers', created_by=owner)
+        users = CustomUser.objects.bulk_create(
+            CustomUser(phone_number=data['phone_number'], username=f"benchmark_{data['phone_number']}")
+            for _, data in rows[:int(len(rows) * existing)]
+        )
+        ProjectMembership.objects.bulk_create(
+            ProjectMembership(project=project, user=user, role='contact')
+            for user in users[:int(len(rows) * members)]
+        )
+        return project
+
+    def _legacy(self, project, rows):
+        """همان الگوی حلقه قبلی: SELECT کاربر، SELECT عضویت و یک INSERT/UPDATE به ازای هر ردیف"""
+        for _, data in rows:
+            # شماره‌های داده آزمایشی از قبل نرمال هستند
+            phone = data['phone_number']
+            try:
+                user = CustomUser.objects.get(phone_number=phone)
+            except CustomUser.DoesNotExist:
+                user = CustomUser.objects.create(
+                    phone_number=phone, first_name=data['first_name'], last_name=data['last_name'],
+                    username=generate_username(phone),
+                )
+            membership = ProjectMembership.objects.filter(project=project, user=user).first()
+            if membership:
+                if membership.role != 'caller':
+                    membership.role = 'caller'
+                    membership.save()
+            else:
+                ProjectMembership.objects.create(project=project, user=user, role='caller')
+
+    def _bulk(self, project, rows):
+        callers = CallerImport(project)
+        for start in range(0, len(rows), CHUNK_SIZE):
+            callers.add_rows(rows[start:start + CHUNK_SIZE])
+        callers.save()
+
+    def _run(self, label, run, rows, existing, members):
+        """اجرای یک مسیر روی داده تازه و rollback آن"""
+        elapsed = None
+        try:
+            with transaction.atomic():
+                project = self._setup(rows, existing, members)
+                started = time.perf_counter()
+                run(project, rows)
+                elapsed = time.perf_counter() - started
+                if ProjectMembership.objects.filter(project=project, role='caller').count() != len(rows):
+                    self.stderr.write(self.style.ERROR(f"{label}: تعداد تماس‌گیرندگان پروژه درست نیست."))
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(f"{label:<10}{len(rows):>8} rows {elapsed:>9.2f} s {len(rows) / elapsed:>10.0f} rows/s")
+        return elapsed
+
+    def handle(self, *args, **options):
+        rows = self._rows(options['rows'])
+        existing, members = options['existing'], options['members']
+        self.stdout.write(
+            f"{len(rows)} ردیف، {int(existing * 100)}٪ کاربر موجود، {int(members * 100)}٪ عضو پروژه"
+        )
+
+        legacy = self._run('legacy', self._legacy, rows, existing, members)
+        bulk = self._run('bulk', self._bulk, rows, existing, members)
+        self.stdout.write(self.style.SUCCESS(f"speedup: {legacy / bulk:.1f}x"))
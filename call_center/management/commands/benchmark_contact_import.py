@@ -0,0 +1,111 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from call_center.models import Contact, Project
+from call_center.services.contact_imports import IMPORT_BATCH_SIZE, ContactUpsert, canonical_phone, canonical_phones
+from call_center.services.spreadsheets import CHUNK_SIZE
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "مقایسه حلقه ردیف به ردیف قبلی upload_contacts_file با ContactUpsert "
+        "(داده در پایان rollback می‌شود)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="تعداد ردیف فایل")
+        parser.add_argument('--existing', type=float, default=0.5, help="سهم ردیف‌هایی که مخاطب موجود دارند")
+        parser.add_argument(
+            '--legacy-rows', type=int, default=5000,
+            help="تعداد ردیف اندازه‌گیری مسیر قبلی (زمان کل از نرخ آن تخمین زده می‌شود)",
+        )
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def _rows(self, count):
+        return [
+            {
+                'phone': f'936{index:07d}',
+                'full_name': f'مخاطب {index}',
+                'email': f'contact{index}@example.com' if index % 3 else '',
+                'address': 'تهران' if index % 2 else '',
+                'custom_fields': '',
+            }
+            for index in range(count)
+        ]
+
+    def _setup(self, rows, existing):
+        user = get_user_model().objects.create_user(
+            username='benchmark_import', password='benchmark', phone_number='09999999998',
+            first_name='Benchmark', last_name='Caller',
+        )
+        project = Project.objects.create(name='Benchmark import', created_by=user)
+        phones, _ = canonical_phones([row['phone'] for row in rows[:int(len(rows) * existing)]])
+        Contact.objects.bulk_create(
+            (Contact(project=project, full_name='Existing', phone=phone) for phone in phones.tolist()),
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+        return user, project, [(user.pk, user.get_full_name())]
+
+    def _legacy(self, project, callers, user, rows):
+        """همان الگوی حلقه قبلی: یک SELECT و یک save/create به ازای هر ردیف"""
+        for row in rows:
+            phone = canonical_phone(row['phone'])
+            existing_contact = Contact.objects.filter(project=project, phone=phone).first()
+            if existing_contact:
+                existing_contact.full_name = row['full_name']
+                existing_contact.email = row['email'] or existing_contact.email
+                existing_contact.address = row['address'] or existing_contact.address
+                existing_contact.is_active = True
+                if not existing_contact.assigned_caller_id:
+                    existing_contact.assigned_caller_id = random.choice(callers)[0]
+                existing_contact.save()
+            else:
+                Contact.objects.create(
+                    project=project, full_name=row['full_name'], phone=phone, email=row['email'],
+                    address=row['address'], assigned_caller_id=random.choice(callers)[0],
+                    call_status='pending', created_by=user,
+                )
+
+    def _bulk(self, project, callers, user, rows, batch_size):
+        upsert = ContactUpsert(project, callers, created_by=user, batch_size=batch_size)
+        # مانند job import: دسته‌های CHUNK_SIZE تایی خواننده فایل
+        numbered = list(enumerate(rows, start=2))
+        for start in range(0, len(numbered), CHUNK_SIZE):
+            upsert.add_rows(numbered[start:start + CHUNK_SIZE])
+        upsert.finish()
+
+    def _run(self, label, run, rows, existing, *args):
+        """اجرای یک مسیر روی داده تازه و rollback آن"""
+        elapsed = None
+        try:
+            with transaction.atomic():
+                user, project, callers = self._setup(rows, existing)
+                started = time.perf_counter()
+                run(project, callers, user, rows, *args)
+                elapsed = time.perf_counter() - started
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(f"{label:<10}{len(rows):>8} rows {elapsed:>9.2f} s {len(rows) / elapsed:>10.0f} rows/s")
+        return elapsed
+
+    def handle(self, *args, **options):
+        rows = self._rows(options['rows'])
+        existing = options['existing']
+        self.stdout.write(f"{len(rows)} ردیف، {int(existing * 100)}٪ مخاطب موجود")
+
+        bulk = self._run('bulk', self._bulk, rows, existing, options['batch_size'])
+
+        legacy_rows = rows[:options['legacy_rows']]
+        legacy = self._run('legacy', self._legacy, legacy_rows, existing)
+        estimated = legacy / len(legacy_rows) * len(rows)
+        self.stdout.write(f"legacy (تخمین برای {len(rows)} ردیف): {estimated:.1f} s")
+        self.stdout.write(self.style.SUCCESS(f"speedup: {estimated / bulk:.1f}x"))
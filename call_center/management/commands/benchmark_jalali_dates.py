@@ -0,0 +1,44 @@
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from persiantools.jdatetime import JalaliDate
+
+from call_center.utils import format_jalali_date, format_jalali_dates, _jalali_date_string
+
+
+class Command(BaseCommand):
+    help = "مقایسه سرعت تبدیل تاریخ شمسی (بدون cache، با cache LRU و نسخه دسته‌ای) روی ورودی هم‌اندازه خروجی اکسل"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="تعداد ردیف‌های خروجی")
+        parser.add_argument('--days', type=int, default=365, help="تعداد روزهای متمایز بین ردیف‌ها")
+
+    def _measure(self, label, func, values, baseline=None):
+        _jalali_date_string.cache_clear()
+        started = time.perf_counter()
+        result = func(values)
+        elapsed = time.perf_counter() - started
+        speedup = f" ({baseline / elapsed:.1f}x)" if baseline else ""
+        self.stdout.write(f"{label:<28}{elapsed * 1000:>10.1f} ms{speedup}")
+        return elapsed, result
+
+    def handle(self, *args, **options):
+        start = datetime(2025, 3, 21, 9, 30)
+        values = [start + timedelta(days=index % options['days'], minutes=index % 600)
+                  for index in range(options['rows'])]
+        self.stdout.write(f"{options['rows']} ردیف، {options['days']} روز متمایز")
+
+        baseline, expected = self._measure(
+            'JalaliDate per row', lambda rows: [str(JalaliDate(value.date())) for value in rows], values
+        )
+        _, memoized = self._measure(
+            'format_jalali_date (LRU)', lambda rows: [format_jalali_date(value) for value in rows],
+            values, baseline,
+        )
+        _, batched = self._measure('format_jalali_dates', format_jalali_dates, values, baseline)
+
+        if memoized != expected or batched != expected:
+            self.stderr.write(self.style.ERROR("خروجی نسخه‌های cache شده با تبدیل مستقیم یکی نیست."))
+            return
+        self.stdout.write(self.style.SUCCESS("خروجی هر سه روش یکسان است."))
@@ -0,0 +1,83 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from call_center.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = "مقایسه سرعت JSONRenderer و FastJSONRenderer روی یک پاسخ لیست مخاطبین"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contacts', type=int, default=10000, help="تعداد مخاطبین پاسخ")
+        parser.add_argument('--repeat', type=int, default=5, help="تعداد تکرار هر اندازه‌گیری")
+
+    def _payload(self, count, raw_values=False):
+        """
+        پاسخی هم‌شکل خروجی ContactSerializer. سریالایزرها تاریخ‌ها را رشته می‌کنند؛ با
+        raw_values تاریخ، Decimal و رشته lazy خام در داده می‌مانند (مثل پاسخ‌های آماری).
+        """
+        created_at = datetime(2025, 3, 21, 9, 30, tzinfo=timezone.utc)
+        rows = []
+        for index in range(count):
+            row_created_at = created_at + timedelta(minutes=index)
+            birth_date = (created_at + timedelta(days=index % 365)).date()
+            rows.append({
+                'id': index,
+                'full_name': f'مخاطب شماره {index}',
+                'phone': f'0912{index:07d}',
+                'email': f'contact{index}@example.com',
+                'address': 'تهران، خیابان آزادی',
+                'assigned_caller': 'تماس‌گیرنده',
+                'can_call': index % 2 == 0,
+                'call_status': 'pending',
+                'custom_fields': {'city': 'تهران', 'score': Decimal('12.50') if raw_values else '12.50'},
+                'is_active': True,
+                'created_at': row_created_at if raw_values else row_created_at.isoformat().replace('+00:00', 'Z'),
+                'birth_date': birth_date if raw_values else birth_date.isoformat(),
+                'contact_calls_count': index % 7,
+                'contacts_calls_rate': 42,
+                'persian_created_by': '1404-01-01',
+                'status_label': gettext_lazy('pending') if raw_values else 'pending',
+            })
+        return {'count': count, 'next': None, 'previous': None, 'results': rows}
+
+    def _measure(self, renderer, data, repeat):
+        best = None
+        output = b''
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = renderer.render(data, 'application/json', {})
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
+
+    def handle(self, *args, **options):
+        count = options['contacts']
+        self.stdout.write(f"{count} مخاطب، orjson {'فعال' if orjson else 'نصب نشده'}")
+
+        for label, raw_values in (('خروجی سریالایزر', False), ('مقادیر خام', True)):
+            data = self._payload(count, raw_values)
+            self.stdout.write(f"\n{label}:")
+
+            results = {}
+            for name, renderer in (('JSONRenderer', JSONRenderer()), ('FastJSONRenderer', FastJSONRenderer())):
+                elapsed, output = self._measure(renderer, data, options['repeat'])
+                results[name] = (elapsed, output)
+                self.stdout.write(
+                    f"{name:<18}{elapsed * 1000:>9.1f} ms  {count / elapsed:>10.0f} rows/s  "
+                    f"{len(output) / elapsed / 1024 / 1024:>7.1f} MB/s"
+                )
+
+            baseline, expected = results['JSONRenderer']
+            fast, output = results['FastJSONRenderer']
+            self.stdout.write(f"speedup: {baseline / fast:.1f}x")
+            if json.loads(output) != json.loads(expected):
+                self.stderr.write(self.style.ERROR("خروجی دو رندرر یکسان نیست."))
+                return
+        self.stdout.write(self.style.SUCCESS("خروجی دو رندرر یکسان است."))
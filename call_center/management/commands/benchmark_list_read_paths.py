@@ -0,0 +1,112 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from call_center.models import AnswerChoice, Call, CallAnswer, Contact, Project, Question
+from call_center.views import CallViewSet, ContactViewSet
+
+
+class Command(BaseCommand):
+    help = "مقایسه مسیر سریالایزر و مسیر values() در لیست مخاطبین و تماس‌ها (داده در پایان rollback می‌شود)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contacts', type=int, default=2000, help="تعداد مخاطبین")
+        parser.add_argument('--calls-per-contact', type=int, default=3, help="تعداد تماس هر مخاطب")
+        parser.add_argument('--page-size', type=int, default=500, help="اندازه صفحه لیست")
+        parser.add_argument('--repeat', type=int, default=3, help="تعداد تکرار هر اندازه‌گیری")
+
+    def _create_data(self, contacts, calls_per_contact):
+        user = get_user_model().objects.create_superuser(
+            username='benchmark_read_paths', password='benchmark', phone_number='09999999999',
+            first_name='Benchmark', last_name='User',
+        )
+        project = Project.objects.create(name='Benchmark read paths', created_by=user)
+        question = Question.objects.create(project=project, text='Interested?')
+        choice = AnswerChoice.objects.create(question=question, text='Yes')
+
+        contact_rows = Contact.objects.bulk_create(
+            Contact(
+                project=project, full_name=f'Contact {index}', phone=f'0935{index:07d}',
+                assigned_caller=user if index % 2 else None, custom_fields={'index': index},
+                created_by=user,
+            )
+            for index in range(contacts)
+        )
+        calls = Call.objects.bulk_create(
+            Call(
+                contact=contact, project=project, caller=user,
+                call_result='answered' if call_index % 2 else 'no_answer',
+                status='answered' if call_index % 2 else 'no_answer',
+                notes=f'note {call_index}', duration=60,
+            )
+            for contact in contact_rows
+            for call_index in range(calls_per_contact)
+        )
+        CallAnswer.objects.bulk_create(
+            CallAnswer(call=call, question=question, selected_choice=choice if index % 3 else None)
+            for index, call in enumerate(calls)
+        )
+        return user, project
+
+    def _measure(self, view, request, repeat):
+        best = None
+        content = b''
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = view(request)
+            response.render()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+            content = response.content
+        return best, content
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        pagination_class = type('BenchmarkPagination', (PageNumberPagination,), {'page_size': page_size})
+        factory = APIRequestFactory()
+
+        with transaction.atomic():
+            user, project = self._create_data(options['contacts'], options['calls_per_contact'])
+            self.stdout.write(
+                f"{options['contacts']} مخاطب، {options['contacts'] * options['calls_per_contact']} تماس، "
+                f"صفحه {page_size} ردیفی"
+            )
+
+            endpoints = (
+                ('contacts', ContactViewSet, {'project_id': project.pk}),
+                ('calls', CallViewSet, {}),
+            )
+            identical = True
+            for label, viewset, params in endpoints:
+                view = type(f'Benchmark{viewset.__name__}', (viewset,), {
+                    'pagination_class': pagination_class,
+                }).as_view({'get': 'list'})
+                self.stdout.write(f"\n{label}:")
+
+                results = {}
+                for read_path in ('serializer', 'values'):
+                    request = factory.get(f'/api/{label}/', {**params, 'read_path': read_path})
+                    force_authenticate(request, user)
+                    elapsed, content = self._measure(view, request, options['repeat'])
+                    results[read_path] = (elapsed, content)
+                    self.stdout.write(
+                        f"{read_path:<12}{elapsed * 1000:>9.1f} ms  {page_size / elapsed:>10.0f} rows/s"
+                    )
+
+                baseline, expected = results['serializer']
+                fast, content = results['values']
+                self.stdout.write(f"speedup: {baseline / fast:.1f}x")
+                # لینک‌های next/previous پارامتر read_path را دارند؛ فقط ردیف‌ها مقایسه می‌شوند
+                if json.loads(content)['results'] != json.loads(expected)['results']:
+                    identical = False
+                    self.stderr.write(self.style.ERROR(f"خروجی دو مسیر در {label} یکسان نیست."))
+
+            transaction.set_rollback(True)
+
+        if identical:
+            self.stdout.write(self.style.SUCCESS("خروجی دو مسیر یکسان است."))
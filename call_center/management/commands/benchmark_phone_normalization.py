@@ -0,0 +1,80 @@
+import random
+import re
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from call_center.utils import normalize_phone_numbers, validate_phone_numbers
+
+
+def _legacy_normalize(phone):
+    """پیاده‌سازی ردیف به ردیف قبلی normalize_phone_number"""
+    if not phone:
+        return phone
+    phone = re.sub(r'[\s\-\(\)]', '', phone)
+    if phone.startswith('+98'):
+        phone = '0' + phone[3:]
+    elif phone.startswith('0098'):
+        phone = '0' + phone[4:]
+    elif phone.startswith('98') and len(phone) == 12:
+        phone = '0' + phone[2:]
+    return phone
+
+
+def _legacy_validate(phone):
+    """پیاده‌سازی ردیف به ردیف قبلی validate_phone_number"""
+    if not phone:
+        return False
+    phone = re.sub(r'[\s\-\(\)]', '', phone)
+    for pattern in (r'^09\d{9}$', r'^\+989\d{9}$', r'^00989\d{9}$'):
+        if re.match(pattern, phone):
+            return True
+    return False
+
+
+class Command(BaseCommand):
+    help = "مقایسه نرمال‌سازی/اعتبارسنجی ردیف به ردیف شماره تلفن با نسخه برداری روی یک ستون"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--phones', type=int, default=1000000, help="تعداد شماره")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _phones(self, count, seed):
+        rng = random.Random(seed)
+        formats = (
+            '09{}', '+989{}', '00989{}', '989{}', '0912 {}', '+98 912-{}', '(0912) {}', '9{}', '12{}', '',
+        )
+        return pd.Series([
+            rng.choice(formats).format(f'{rng.randrange(10 ** 9):09d}') for _ in range(count)
+        ])
+
+    def _time(self, run):
+        started = time.perf_counter()
+        result = run()
+        return time.perf_counter() - started, result
+
+    def handle(self, *args, **options):
+        phones = self._phones(options['phones'], options['seed'])
+        self.stdout.write(f"{len(phones)} شماره")
+
+        def legacy():
+            normalized = [_legacy_normalize(phone) for phone in phones]
+            return normalized, [_legacy_validate(phone) for phone in normalized]
+
+        def vectorized():
+            normalized, _ = normalize_phone_numbers(phones)
+            _, valid = validate_phone_numbers(normalized)
+            return normalized, valid
+
+        legacy_elapsed, (expected, expected_valid) = self._time(legacy)
+        elapsed, (normalized, valid) = self._time(vectorized)
+        for label, seconds in (('row-wise', legacy_elapsed), ('vectorized', elapsed)):
+            self.stdout.write(f"{label:<12}{seconds:>8.2f} s {len(phones) / seconds:>12.0f} phones/s")
+        self.stdout.write(f"speedup: {legacy_elapsed / elapsed:.1f}x")
+
+        if normalized.tolist() == expected and np.array_equal(valid, expected_valid):
+            self.stdout.write(self.style.SUCCESS("خروجی دو مسیر یکسان است."))
+        else:
+            self.stderr.write(self.style.ERROR("خروجی دو مسیر یکسان نیست."))
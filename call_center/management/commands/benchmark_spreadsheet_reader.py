@@ -0,0 +1,78 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+
+from call_center.services.spreadsheets import CHUNK_SIZE, read_spreadsheet
+
+
+class Command(BaseCommand):
+    help = (
+        "مقایسه زمان و اوج حافظه pd.read_excel (+ fillna/astype/replace) با خواننده "
+        "جریانی services.spreadsheets روی فایل xlsx و csv"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000, help="تعداد ردیف فایل")
+        parser.add_argument('--formats', default='csv,xlsx', help="فرمت‌ها (csv، xlsx)")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def _row(self, index):
+        return (9120000000 + index, f'مخاطب {index}', f'contact{index}@example.com' if index % 3 else None, 'تهران')
+
+    def _write(self, path, file_format, rows):
+        header = ('phone', 'full_name', 'email', 'address')
+        if file_format == 'csv':
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(','.join(header) + '\n')
+                for index in range(rows):
+                    file.write(','.join('' if value is None else str(value) for value in self._row(index)) + '\n')
+            return
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet()
+        worksheet.append(header)
+        for index in range(rows):
+            worksheet.append(self._row(index))
+        workbook.save(path)
+
+    def _pandas(self, path, file_format, chunk_size):
+        """الگوی قبلی importها: کل شیت در DataFrame و چند کپی کامل از آن"""
+        read = pd.read_csv if file_format == 'csv' else pd.read_excel
+        df = read(path)
+        df = df.fillna('').astype(str)
+        df = df.replace('nan', '').replace('None', '')
+        return sum(1 for _ in df.iterrows())
+
+    def _streaming(self, path, file_format, chunk_size):
+        count = 0
+        with open(path, 'rb') as file, read_spreadsheet(file, chunk_size=chunk_size) as reader:
+            for chunk in reader.chunks():
+                count += len(chunk)
+        return count
+
+    def _measure(self, run, *args):
+        tracemalloc.start()
+        started = time.perf_counter()
+        count = run(*args)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return count, elapsed, peak
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        with tempfile.TemporaryDirectory() as directory:
+            for file_format in options['formats'].split(','):
+                path = os.path.join(directory, f'contacts.{file_format}')
+                self._write(path, file_format, rows)
+                self.stdout.write(f"\n{file_format}: {rows} ردیف، {os.path.getsize(path) / 1e6:.1f} MB")
+
+                for label, run in (('pandas', self._pandas), ('streaming', self._streaming)):
+                    count, elapsed, peak = self._measure(run, path, file_format, options['chunk_size'])
+                    self.stdout.write(
+                        f"{label:<10}{count:>9} rows {elapsed:>8.2f} s  peak {peak / 1e6:>8.1f} MB"
+                    )
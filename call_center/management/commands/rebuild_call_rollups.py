@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from call_center.services.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "بازسازی جدول خلاصه روزانه تماس‌ها (CallDailyRollup) از روی جدول تماس‌ها"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help="فقط خلاصه این پروژه بازسازی شود")
+        parser.add_argument('--batch-size', type=int, default=1000, help="تعداد ردیف در هر bulk_create")
+
+    def handle(self, *args, **options):
+        created_count = rebuild_rollups(
+            project_id=options['project'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"{created_count} ردیف خلاصه روزانه ساخته شد."))
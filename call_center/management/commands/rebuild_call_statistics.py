@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Q, OuterRef, Subquery, Exists
+
+from call_center.models import Call, CallStatistics
+
+
+class Command(BaseCommand):
+    help = "بازسازی جدول CallStatistics از روی تماس‌ها با کوئری‌های گروهی (برای backfill و تعمیر آمار)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help="فقط آمار این پروژه بازسازی شود")
+        parser.add_argument('--batch-size', type=int, default=1000, help="تعداد ردیف در هر bulk_create")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        calls = Call.objects.all()
+        statistics = CallStatistics.objects.all()
+        if options['project']:
+            calls = calls.filter(project_id=options['project'])
+            statistics = statistics.filter(project_id=options['project'])
+
+        last_call = Call.objects.filter(
+            contact=OuterRef('contact'), project=OuterRef('project')
+        ).order_by('-call_date', '-pk')
+
+        rows = calls.order_by().values('contact', 'project').annotate(
+            total=Count('pk'),
+            successful=Count('pk', filter=Q(status='answered')),
+            last_date=Max('call_date'),
+            last_result=Subquery(last_call.values('call_result')[:1]),
+        )
+
+        rebuilt_count = 0
+        with transaction.atomic():
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                total = row['total']
+                batch.append(CallStatistics(
+                    contact_id=row['contact'],
+                    project_id=row['project'],
+                    total_calls=total,
+                    successful_calls=row['successful'],
+                    last_call_date=row['last_date'],
+                    last_call_result=row['last_result'] or '',
+                    response_rate=round(row['successful'] / total * 100, 2) if total else 0,
+                ))
+                if len(batch) >= batch_size:
+                    rebuilt_count += self._write(batch)
+                    batch = []
+            if batch:
+                rebuilt_count += self._write(batch)
+
+            # حذف آمار مخاطب‌هایی که دیگر تماسی ندارند
+            removed_count, _ = statistics.filter(~Exists(
+                Call.objects.filter(contact=OuterRef('contact'), project=OuterRef('project'))
+            )).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{rebuilt_count} ردیف آمار بازسازی و {removed_count} ردیف بدون تماس حذف شد."
+        ))
+
+    def _write(self, batch):
+        CallStatistics.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['contact', 'project'],
+            update_fields=[
+                'total_calls', 'successful_calls', 'last_call_date',
+                'last_call_result', 'response_rate', 'updated_at',
+            ],
+        )
+        return len(batch)
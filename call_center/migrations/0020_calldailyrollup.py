@@ -0,0 +1,65 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:49
+
+from zoneinfo import ZoneInfo
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_call_rollups(apps, schema_editor):
+    Call = apps.get_model('call_center', 'Call')
+    CallDailyRollup = apps.get_model('call_center', 'CallDailyRollup')
+    rows = Call.objects.order_by().annotate(
+        day=TruncDate('call_date', tzinfo=ZoneInfo('Asia/Tehran')),
+        result=Coalesce('call_result', Value('')),
+    ).values('project', 'caller', 'day', 'status', 'result').annotate(
+        count=Count('pk'),
+        duration_sum=Coalesce(Sum('duration'), 0),
+        with_duration=Count('duration'),
+    )
+    CallDailyRollup.objects.bulk_create(
+        (
+            CallDailyRollup(
+                project_id=row['project'], caller_id=row['caller'], day=row['day'],
+                status=row['status'], call_result=row['result'], call_count=row['count'],
+                total_duration=row['duration_sum'], duration_count=row['with_duration'],
+            )
+            for row in rows.iterator(chunk_size=1000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_center', '0019_contact_is_special_ticket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='روز')),
+                ('status', models.CharField(max_length=20, verbose_name='وضعیت')),
+                ('call_result', models.CharField(blank=True, default='', max_length=50, verbose_name='نتیجه تماس')),
+                ('call_count', models.IntegerField(default=0, verbose_name='تعداد تماس\u200cها')),
+                ('total_duration', models.BigIntegerField(default=0, verbose_name='مجموع مدت تماس (ثانیه)')),
+                ('duration_count', models.IntegerField(default=0, verbose_name='تعداد تماس\u200cهای دارای مدت')),
+                ('caller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='call_rollups', to=settings.AUTH_USER_MODEL, verbose_name='تماس\u200cگیرنده')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='call_rollups', to='call_center.project', verbose_name='پروژه')),
+            ],
+            options={
+                'verbose_name': 'خلاصه روزانه تماس',
+                'verbose_name_plural': 'خلاصه\u200cهای روزانه تماس',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day'], name='call_center_day_90743d_idx'), models.Index(fields=['project', 'day'], name='call_center_project_8f2499_idx')],
+                'unique_together': {('project', 'caller', 'day', 'status', 'call_result')},
+            },
+        ),
+        migrations.RunPython(backfill_call_rollups, migrations.RunPython.noop),
+    ]
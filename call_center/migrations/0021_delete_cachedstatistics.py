@@ -0,0 +1,16 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:55
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_center', '0020_calldailyrollup'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='CachedStatistics',
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:04
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_global_counters(apps, schema_editor):
+    Call = apps.get_model('call_center', 'Call')
+    Project = apps.get_model('call_center', 'Project')
+    GlobalCounter = apps.get_model('call_center', 'GlobalCounter')
+
+    counters = {'projects': Project.objects.count(), 'calls': Call.objects.count()}
+    for row in Call.objects.order_by().values('status').annotate(count=Count('pk')):
+        counters[f"calls_status_{row['status']}"] = row['count']
+    GlobalCounter.objects.bulk_create(
+        GlobalCounter(name=name, value=value) for name, value in counters.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_center', '0021_delete_cachedstatistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GlobalCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='نام شمارنده')),
+                ('value', models.BigIntegerField(default=0, verbose_name='مقدار')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروزرسانی')),
+            ],
+            options={
+                'verbose_name': 'شمارنده سراسری',
+                'verbose_name_plural': 'شمارنده\u200cهای سراسری',
+            },
+        ),
+        migrations.RunPython(backfill_global_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_center', '0022_globalcounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['phone'], name='call_center_phone_8519d8_idx'),
+        ),
+    ]
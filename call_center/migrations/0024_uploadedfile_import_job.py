@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-18 05:45
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_uploads_completed(apps, schema_editor):
+    # آپلودهای قبلی همزمان در خود درخواست پردازش شده‌اند
+    UploadedFile = apps.get_model('call_center', 'UploadedFile')
+    UploadedFile.objects.update(
+        status='completed', processed_rows=F('records_count'), finished_at=F('upload_date'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_center', '0023_contact_phone_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='error_message',
+            field=models.TextField(blank=True, verbose_name='پیام خطا'),
+        ),
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='failed_rows',
+            field=models.PositiveIntegerField(default=0, verbose_name='ردیف\u200cهای ناموفق'),
+        ),
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='file',
+            field=models.FileField(blank=True, null=True, upload_to='uploads/%Y/%m/', verbose_name='فایل'),
+        ),
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='پایان پردازش'),
+        ),
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='processed_rows',
+            field=models.PositiveIntegerField(default=0, verbose_name='ردیف\u200cهای پردازش شده'),
+        ),
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='result',
+            field=models.JSONField(blank=True, null=True, verbose_name='نتیجه'),
+        ),
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='شروع پردازش'),
+        ),
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='status',
+            field=models.CharField(choices=[('pending', 'در صف پردازش'), ('processing', 'در حال پردازش'), ('completed', 'انجام شده'), ('failed', 'ناموفق')], default='pending', max_length=20, verbose_name='وضعیت'),
+        ),
+        migrations.AlterField(
+            model_name='uploadedfile',
+            name='file_type',
+            field=models.CharField(choices=[('contacts', 'مخاطبین'), ('callers', 'تماس\u200cگیرندگان'), ('assigned_contacts', 'مخاطبین با تماس\u200cگیرنده مشخص')], max_length=20, verbose_name='نوع فایل'),
+        ),
+        migrations.RunPython(mark_existing_uploads_completed, migrations.RunPython.noop),
+    ]
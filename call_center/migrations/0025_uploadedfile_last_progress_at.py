@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:37
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_last_progress_at(apps, schema_editor):
+    # jobهای در حال اجرا تا این لحظه فقط زمان شروع دارند
+    UploadedFile = apps.get_model('call_center', 'UploadedFile')
+    UploadedFile.objects.filter(started_at__isnull=False).update(last_progress_at=F('started_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('call_center', '0024_uploadedfile_import_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='last_progress_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='آخرین گزارش پیشرفت'),
+        ),
+        migrations.RunPython(backfill_last_progress_at, migrations.RunPython.noop),
+    ]
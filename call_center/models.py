@@ -1,5 +1,7 @@
-from django.db.models import functions
-from django.db import models
+from decimal import Decimal
+from django.db.models import F, Q, Case, When, Value, ExpressionWrapper, Subquery
+from django.db.models.functions import Coalesce
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 from django.core.exceptions import ValidationError
@@ -36,65 +38,50 @@ class Project(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name="تاریخ به‌روزرسانی")
     # ارتباط با کاربران از طریق مدل واسط ProjectMembership
     members = models.ManyToManyField(settings.AUTH_USER_MODEL, through='ProjectMembership', related_name='projects', verbose_name="اعضای پروژه")
-    #TODO it must get  queries optimised
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                GlobalCounter.apply_deltas({GlobalCounter.PROJECTS: 1})
     def get_statistics(self):
-        """دریافت آمار کلی پروژه"""
-        total_contacts = self.contacts.count()
-        total_callers = self.project_callers.filter(is_active=True).count()
-        total_calls = self.calls.count()
-
-        answered_calls = self.calls.filter(call_result='answered').count()
-        no_answer_calls = self.calls.filter(call_result='no_answer').count()
-        busy_calls = self.calls.filter(call_result='busy').count()
-        unreachable_calls = self.calls.filter(call_result='unreachable').count()
-        wrong_number_calls = self.calls.filter(call_result='wrong_number').count()
-        not_interested_calls = self.calls.filter(call_result='not_interested').count()
-        callback_requested_calls = self.calls.filter(call_result='callback_requested').count()
-
-        total_duration = self.calls.aggregate(models.Sum('duration'))['duration__sum'] or 0
-        average_duration = (total_duration / total_calls) if total_calls > 0 else 0
-
-        success_rate = (answered_calls / total_calls * 100) if total_calls > 0 else 0
+        """دریافت آمار کلی پروژه (از کش آمار یا یک کوئری aggregate شرطی)"""
+        from .services.cache import cached_statistic
+        from .services.statistics import get_project_statistics
+        return cached_statistic(
+            'project_statistics', lambda: get_project_statistics(self), project_id=self.pk
+        )
+    def get_call_answers_summary(self):
+        """هیستوگرام پاسخ‌های تماس‌های پروژه به سوال‌ها (از کش آمار)"""
+        from .services.cache import cached_statistic
+        from .services.statistics import get_call_answers_summary
+        return cached_statistic(
+            'call_answers_summary', lambda: get_call_answers_summary(self.pk), project_id=self.pk
+        )
 
-        return {
-            'total_contacts': total_contacts,
-            'total_callers': total_callers,
-            'total_calls': total_calls,
-            'call_results_distribution': {
-                'answered': answered_calls,
-                'no_answer': no_answer_calls,
-                'busy': busy_calls,
-                'unreachable': unreachable_calls,
-                'wrong_number': wrong_number_calls,
-                'not_interested': not_interested_calls,
-                'callback_requested': callback_requested_calls,
-            },
-            'total_duration_seconds': total_duration,
-            'average_call_duration_seconds': round(average_duration, 2),
-            'success_rate': round(success_rate, 2)
-        }
-    #TODO  it's must get optimised also
     def get_caller_performance_report(self):
-        """دریافت گزارش عملکرد تماس‌گیرندگان برای این پروژه"""
-        caller_performance = []
-        for project_caller in self.project_callers.filter(is_active=True):
-            caller = project_caller.caller
-            calls_by_caller = self.calls.filter(caller=caller)
+        """دریافت گزارش عملکرد تماس‌گیرندگان برای این پروژه (از کش آمار)"""
+        from .services.cache import cached_statistic
+        return cached_statistic(
+            'caller_performance_report', self._build_caller_performance_report, project_id=self.pk
+        )
 
-            total_calls = calls_by_caller.count()
-            answered_calls = calls_by_caller.filter(call_result='answered').count()
-            total_duration = calls_by_caller.aggregate(models.Sum('duration'))['duration__sum'] or 0
+    def _build_caller_performance_report(self):
+        from .services.statistics import get_caller_performance_rows
 
-            success_rate = (answered_calls / total_calls * 100) if total_calls > 0 else 0
+        caller_performance = []
+        for row in get_caller_performance_rows(self):
+            total_calls = row['total_calls']
+            total_duration = row['total_duration_seconds']
             average_duration = (total_duration / total_calls) if total_calls > 0 else 0
 
             caller_performance.append({
-                'caller_id': caller.id,
-                'caller_username': caller.username,
-                'caller_full_name': caller.get_full_name(),
+                'caller_id': row['caller_id'],
+                'caller_username': row['username'],
+                'caller_full_name': row['full_name'],
                 'total_calls': total_calls,
-                'answered_calls': answered_calls,
-                'success_rate': round(success_rate, 2),
+                'answered_calls': row['answered_calls'],
+                'success_rate': row['success_rate'],
                 'total_duration_seconds': total_duration,
                 'average_call_duration_seconds': round(average_duration, 2),
             })
@@ -103,44 +90,25 @@ class Project(models.Model):
     def get_call_status_over_time(self, start_date=None, end_date=None, interval='day'):
         """
         دریافت وضعیت تماس‌ها در طول زمان برای داشبورد.
-        interval می‌تواند 'day', 'week', 'month' باشد.
+        interval می‌تواند 'day', 'week', 'month' یا 'jalali_month' باشد؛ بازه‌های خالی با صفر پر می‌شوند.
+        داده‌ها از جدول خلاصه روزانه (CallDailyRollup) خوانده و کش می‌شوند.
         """
-        calls = self.calls.all()
-        if start_date:
-            calls = calls.filter(call_date__gte=start_date)
-        if end_date:
-            calls = calls.filter(call_date__lte=end_date)
-
-        if interval == 'day':
-            date_format = '%Y-%m-%d'
-        elif interval == 'week':
-            date_format = '%Y-%W'
-        elif interval == 'month':
-            date_format = '%Y-%m'
-        else:
-            raise ValueError("Invalid interval. Must be 'day', 'week', or 'month'.")
-
-        # Group by date and call result
-        data = calls.annotate(
-            date=functions.Extract('call_date', interval)
-        ).values('date', 'call_result').annotate(count=models.Count('id')).order_by('date', 'call_result')
-
-        # Format for chart
-        chart_data = {}
-        for item in data:
-            date_key = item['date']
-            if date_key not in chart_data:
-                chart_data[date_key] = {
-                    'date': item['date'],
-                    'total_calls': 0
-                }
-                for choice, _ in Call.CALL_RESULT_CHOICES:
-                    chart_data[date_key][choice] = 0
-
-            chart_data[date_key][item['call_result']] = item['count']
-            chart_data[date_key]['total_calls'] += item['count']
-
-        return list(chart_data.values())
+        from .services.cache import cached_statistic
+        return cached_statistic(
+            'call_status_over_time',
+            lambda: self._build_call_status_over_time(start_date, end_date, interval),
+            project_id=self.pk,
+            params={'start_date': start_date, 'end_date': end_date, 'interval': interval},
+        )
+
+    def _build_call_status_over_time(self, start_date, end_date, interval):
+        from .services.rollups import filter_rollups
+        from .services.timeseries import get_time_series
+
+        rollups = filter_rollups(
+            self.call_rollups.all(), start_date=start_date, end_date=end_date
+        )
+        return get_time_series(rollups, interval, start_date, end_date)
 
     class Meta:
         verbose_name = "پروژه"
@@ -218,14 +186,43 @@ class Contact(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name="تاریخ به‌روزرسانی")
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL,related_name="created_contacts", null=True,blank=True,on_delete=models.CASCADE,verbose_name="ایجاد شده توسط")
     gender = models.CharField(max_length=20,choices=GENDER_CHOICES,default="none")
+    # فیلدهایی که در آمار وضعیت مخاطبین (ContactViewSet.get_statistics) اثر دارند
+    STATUS_FIELDS = ('project_id', 'call_status', 'assigned_caller_id')
+
     class Meta:
         verbose_name = "مخاطب"
         verbose_name_plural = "مخاطبین"
         unique_together = ["project", "phone"]
+        indexes = [
+            # تاریخچه تماس‌ها بین پروژه‌ها بر اساس شماره تلفن جستجو می‌شود
+            models.Index(fields=['phone']),
+        ]
         ordering = ["full_name"]
     def __str__(self):
         return f"{self.full_name} - {self.phone}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._status_snapshot = instance.get_status_snapshot()
+        return instance
+
+    def get_status_snapshot(self):
+        """مقادیر STATUS_FIELDS از __dict__ (بدون کوئری برای فیلدهای defer شده)"""
+        values = self.__dict__
+        if any(field not in values for field in self.STATUS_FIELDS):
+            return None
+        return tuple(values[field] for field in self.STATUS_FIELDS)
+
+    def status_changed(self):
+        """آیا call_status یا assigned_caller نسبت به آخرین مقدار ذخیره شده تغییر کرده است"""
+        previous = getattr(self, '_status_snapshot', None)
+        return previous is None or previous != self.get_status_snapshot()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._status_snapshot = self.get_status_snapshot()
+
     def get_custom_fields(self):
         if self.custom_fields:
             try:
@@ -372,13 +369,146 @@ class Call(models.Model):
             }
             self.set_original_data(original)
 
+    # فیلدهایی که در CallStatistics و CallDailyRollup اثر دارند
+    STATISTICS_FIELDS = ('contact_id', 'project_id', 'caller_id', 'call_date', 'status', 'call_result', 'duration')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._statistics_snapshot = instance.get_statistics_snapshot()
+        return instance
+
+    def get_statistics_snapshot(self):
+        """
+        مقادیری از تماس که در CallStatistics اثر دارند.
+        از __dict__ خوانده می‌شود تا فیلدهای defer شده کوئری اضافه نزنند.
+        """
+        values = self.__dict__
+        if any(field not in values for field in self.STATISTICS_FIELDS):
+            return None
+        snapshot = {field: values[field] for field in self.STATISTICS_FIELDS}
+        snapshot['successful'] = int(values['status'] == 'answered')
+        return snapshot
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # به‌روزرسانی آمار پس از ذخیره
-        self.update_call_statistics()
+        adding = self._state.adding
+        previous = None if adding else getattr(self, '_statistics_snapshot', None)
+        # تماس، آمار، جدول خلاصه و شمارنده‌ها در یک تراکنش ذخیره می‌شوند
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # به‌روزرسانی آمار پس از ذخیره (به صورت تفاضلی)
+            if adding or previous is not None:
+                self.update_call_statistics(previous)
+                self.update_call_rollup(previous)
+                self.update_global_counters(previous)
+            else:
+                self.rebuild_call_statistics()
+        self._statistics_snapshot = self.get_statistics_snapshot()
+
+    def remove_from_statistics(self):
+        """
+        کم کردن تماس حذف شده از آمار، جدول خلاصه و شمارنده‌ها.
+        از سیگنال post_delete (داخل تراکنش حذف) برای حذف مستقیم تماس و حذف‌های
+        زنجیره‌ای دیگر (مثل حذف کاربر) صدا زده می‌شود؛ تماس‌های پروژه یا مخاطب حذف
+        شده در pre_delete آن‌ها دسته‌ای کم می‌شوند.
+        """
+        snapshot = self.get_statistics_snapshot()
+        if snapshot is None:
+            return
+        CallStatistics.apply_call_delta(
+            snapshot['contact_id'], snapshot['project_id'],
+            total_delta=-1, successful_delta=-snapshot['successful'],
+        )
+        self._apply_rollup_snapshot(snapshot, sign=-1)
+        GlobalCounter.apply_deltas(self._counter_deltas(snapshot, sign=-1))
+
+    @staticmethod
+    def _counter_deltas(snapshot, sign):
+        return {
+            GlobalCounter.CALLS: sign,
+            GlobalCounter.call_status_name(snapshot['status']): sign,
+        }
+
+    def update_global_counters(self, previous=None):
+        """به‌روزرسانی تفاضلی شمارنده‌های سراسری تماس‌ها"""
+        current = self.get_statistics_snapshot()
+        if previous is not None:
+            if previous['status'] == current['status']:
+                return
+            deltas = self._counter_deltas(previous, sign=-1)
+            for name, delta in self._counter_deltas(current, sign=1).items():
+                deltas[name] = deltas.get(name, 0) + delta
+        else:
+            deltas = self._counter_deltas(current, sign=1)
+        GlobalCounter.apply_deltas(deltas)
 
-    def update_call_statistics(self):
-        """به‌روزرسانی آمار تماس‌ها"""
+    def update_call_statistics(self, previous=None):
+        """
+        به‌روزرسانی تفاضلی آمار تماس‌ها.
+        previous وضعیت تماس پیش از ویرایش است؛ برای تماس جدید None ارسال می‌شود.
+        """
+        current = self.get_statistics_snapshot()
+        if previous is None:
+            CallStatistics.apply_call_delta(
+                current['contact_id'], current['project_id'],
+                total_delta=1, successful_delta=current['successful'],
+                call_date=self.call_date, call_result=current['call_result'],
+            )
+            return
+
+        if (previous['contact_id'], previous['project_id']) != (current['contact_id'], current['project_id']):
+            # تماس به مخاطب یا پروژه دیگری منتقل شده است
+            CallStatistics.apply_call_delta(
+                previous['contact_id'], previous['project_id'],
+                total_delta=-1, successful_delta=-previous['successful'],
+            )
+            CallStatistics.apply_call_delta(
+                current['contact_id'], current['project_id'],
+                total_delta=1, successful_delta=current['successful'],
+                call_date=self.call_date, call_result=current['call_result'],
+            )
+            return
+
+        successful_delta = current['successful'] - previous['successful']
+        result_changed = current['call_result'] != previous['call_result']
+        if not successful_delta and not result_changed:
+            return
+        CallStatistics.apply_call_delta(
+            current['contact_id'], current['project_id'],
+            total_delta=0, successful_delta=successful_delta,
+            call_date=self.call_date if result_changed else None,
+            call_result=current['call_result'],
+        )
+
+    @staticmethod
+    def _rollup_key(snapshot):
+        from .services.rollups import rollup_day
+        return (
+            snapshot['project_id'], snapshot['caller_id'], rollup_day(snapshot['call_date']),
+            snapshot['status'], snapshot['call_result'] or '',
+        )
+
+    def _apply_rollup_snapshot(self, snapshot, sign):
+        duration = snapshot['duration']
+        CallDailyRollup.apply_delta(
+            *self._rollup_key(snapshot),
+            count_delta=sign,
+            duration_delta=sign * (duration or 0),
+            duration_count_delta=sign * int(duration is not None),
+        )
+
+    def update_call_rollup(self, previous=None):
+        """به‌روزرسانی تفاضلی جدول خلاصه روزانه تماس‌ها"""
+        current = self.get_statistics_snapshot()
+        if previous is not None:
+            if (self._rollup_key(previous) == self._rollup_key(current)
+                    and previous['duration'] == current['duration']):
+                return
+            self._apply_rollup_snapshot(previous, sign=-1)
+        self._apply_rollup_snapshot(current, sign=1)
+
+    def rebuild_call_statistics(self):
+        """محاسبه کامل آمار مخاطب (برای حالتی که وضعیت قبلی تماس در دسترس نیست)"""
         stats, created = CallStatistics.objects.get_or_create(
             contact=self.contact,
             project=self.project
@@ -423,21 +553,190 @@ class CallStatistics(models.Model):
     def __str__(self):
         return f"{self.contact.full_name} - {self.project.name}"
 
+    @classmethod
+    def apply_call_delta(cls, contact_id, project_id, total_delta, successful_delta,
+                         call_date=None, call_result=None):
+        """
+        اعمال اتمیک تغییرات یک تماس روی آمار (upsert با F).
+        در صورت ارسال call_date، آخرین تماس فقط وقتی جایگزین می‌شود که جدیدتر یا هم‌زمان باشد.
+        با total_delta منفی (حذف یا انتقال تماس) آخرین تماس از تماس‌های باقی‌مانده دوباره خوانده می‌شود.
+        """
+        new_total = F('total_calls') + total_delta
+        new_successful = F('successful_calls') + successful_delta
+        updates = {
+            'total_calls': new_total,
+            'successful_calls': new_successful,
+            'response_rate': Case(
+                When(total_calls__gt=-total_delta, then=ExpressionWrapper(
+                    new_successful * Value(Decimal('100')) / new_total,
+                    output_field=models.DecimalField(max_digits=5, decimal_places=2),
+                )),
+                default=Value(Decimal('0')),
+                output_field=models.DecimalField(max_digits=5, decimal_places=2),
+            ),
+            'updated_at': timezone.now(),
+        }
+        if call_date is not None:
+            is_latest = Q(last_call_date__isnull=True) | Q(last_call_date__lte=call_date)
+            updates['last_call_date'] = Case(
+                When(is_latest, then=Value(call_date)),
+                default=F('last_call_date'),
+            )
+            updates['last_call_result'] = Case(
+                When(is_latest, then=Value(call_result or '')),
+                default=F('last_call_result'),
+            )
+        elif total_delta < 0:
+            # ممکن است تماس حذف شده همان آخرین تماس بوده باشد
+            latest = Call.objects.filter(
+                contact_id=contact_id, project_id=project_id
+            ).order_by('-call_date', '-pk')
+            updates['last_call_date'] = Subquery(latest.values('call_date')[:1])
+            updates['last_call_result'] = Coalesce(
+                Subquery(latest.values('call_result')[:1]), Value(''),
+                output_field=models.CharField(),
+            )
+
+        stats = cls.objects.filter(contact_id=contact_id, project_id=project_id)
+        if stats.update(**updates) or total_delta <= 0:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    contact_id=contact_id,
+                    project_id=project_id,
+                    total_calls=total_delta,
+                    successful_calls=successful_delta,
+                    last_call_date=call_date,
+                    last_call_result=call_result or '',
+                    response_rate=Decimal(successful_delta * 100) / total_delta,
+                )
+        except IntegrityError:
+            # ردیف هم‌زمان توسط درخواست دیگری ساخته شده است
+            stats.update(**updates)
+
     def update_statistics(self):
         """به‌روزرسانی آمار بر اساس تماس‌های موجود"""
         calls = Call.objects.filter(contact=self.contact, project=self.project)
 
         self.total_calls = calls.count()
-        self.successful_calls = calls.filter(call_result='answered').count()
+        self.successful_calls = calls.filter(status='answered').count()
 
-        if calls.exists():
-            last_call = calls.order_by('-call_date').first()
+        last_call = calls.order_by('-call_date').first()
+        if last_call:
             self.last_call_date = last_call.call_date
-            self.last_call_result = last_call.call_result
+            self.last_call_result = last_call.call_result or ''
 
         self.response_rate = (self.successful_calls / self.total_calls * 100) if self.total_calls > 0 else 0
         self.save()
 
+class CallDailyRollup(models.Model):
+    """
+    خلاصه روزانه تماس‌ها به ازای (پروژه، تماس‌گیرنده، روز، وضعیت، نتیجه).
+    داشبوردها به جای جدول خام تماس‌ها از این جدول می‌خوانند.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='call_rollups', verbose_name="پروژه")
+    caller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='call_rollups',
+                               verbose_name="تماس‌گیرنده")
+    day = models.DateField(verbose_name="روز")
+    status = models.CharField(max_length=20, verbose_name="وضعیت")
+    call_result = models.CharField(max_length=50, blank=True, default='', verbose_name="نتیجه تماس")
+    call_count = models.IntegerField(default=0, verbose_name="تعداد تماس‌ها")
+    total_duration = models.BigIntegerField(default=0, verbose_name="مجموع مدت تماس (ثانیه)")
+    duration_count = models.IntegerField(default=0, verbose_name="تعداد تماس‌های دارای مدت")
+
+    class Meta:
+        verbose_name = "خلاصه روزانه تماس"
+        verbose_name_plural = "خلاصه‌های روزانه تماس"
+        unique_together = ['project', 'caller', 'day', 'status', 'call_result']
+        indexes = [
+            models.Index(fields=['day']),
+            models.Index(fields=['project', 'day']),
+        ]
+        ordering = ['-day']
+
+    def __str__(self):
+        return f"{self.project_id} - {self.caller_id} - {self.day} - {self.status}"
+
+    @classmethod
+    def apply_delta(cls, project_id, caller_id, day, status, call_result,
+                    count_delta, duration_delta=0, duration_count_delta=0):
+        """اعمال اتمیک تغییرات روی یک ردیف خلاصه (upsert با F)"""
+        key = {
+            'project_id': project_id,
+            'caller_id': caller_id,
+            'day': day,
+            'status': status,
+            'call_result': call_result or '',
+        }
+        updates = {
+            'call_count': F('call_count') + count_delta,
+            'total_duration': F('total_duration') + duration_delta,
+            'duration_count': F('duration_count') + duration_count_delta,
+        }
+        rollup = cls.objects.filter(**key)
+        if rollup.update(**updates) or count_delta <= 0:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    call_count=count_delta,
+                    total_duration=duration_delta,
+                    duration_count=duration_count_delta,
+                    **key
+                )
+        except IntegrityError:
+            rollup.update(**updates)
+
+class GlobalCounter(models.Model):
+    """
+    شمارنده‌های سراسری (تعداد پروژه‌ها و تماس‌ها به تفکیک وضعیت) برای خواندن O(1).
+    همراه با ذخیره/حذف تماس و پروژه در همان تراکنش به‌روزرسانی و با
+    تسک reconcile_global_counters دوباره همگام می‌شوند.
+
+    ردیف calls (و ردیف وضعیت) داغ است: هر ثبت تماس تا پایان تراکنشش قفل آن را
+    نگه می‌دارد و ثبت‌های همزمان پشت سر هم اجرا می‌شوند. اگر این گلوگاه شد، باید
+    شمارنده به چند ردیف شکسته و در خواندن جمع زده شود.
+    """
+    PROJECTS = 'projects'
+    CALLS = 'calls'
+
+    name = models.CharField(max_length=50, unique=True, verbose_name="نام شمارنده")
+    value = models.BigIntegerField(default=0, verbose_name="مقدار")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="تاریخ به‌روزرسانی")
+
+    class Meta:
+        verbose_name = "شمارنده سراسری"
+        verbose_name_plural = "شمارنده‌های سراسری"
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+    @staticmethod
+    def call_status_name(status):
+        return f'calls_status_{status}'
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """اعمال اتمیک تغییرات روی چند شمارنده (upsert با F)"""
+        for name, delta in deltas.items():
+            if not delta:
+                continue
+            counter = cls.objects.filter(name=name)
+            if counter.update(value=F('value') + delta):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(name=name, value=delta)
+            except IntegrityError:
+                counter.update(value=F('value') + delta)
+
+    @classmethod
+    def get_values(cls, names):
+        """مقدار چند شمارنده با یک کوئری (شمارنده ساخته نشده صفر است)"""
+        values = dict(cls.objects.filter(name__in=names).values_list('name', 'value'))
+        return {name: values.get(name, 0) for name in names}
+
 class SavedSearch(models.Model):
     """مدل برای ذخیره جستجوهای کاربران"""
     search_name = models.CharField(max_length=100, verbose_name="نام جستجو")
@@ -477,16 +776,40 @@ class UploadedFile(models.Model):
     FILE_TYPE_CHOICES = [
         ('contacts', 'مخاطبین'),
         ('callers', 'تماس‌گیرندگان'),
+        ('assigned_contacts', 'مخاطبین با تماس‌گیرنده مشخص'),
+    ]
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'در صف پردازش'),
+        (STATUS_PROCESSING, 'در حال پردازش'),
+        (STATUS_COMPLETED, 'انجام شده'),
+        (STATUS_FAILED, 'ناموفق'),
     ]
 
     file_name = models.CharField(max_length=255, verbose_name="نام فایل")
     file_path = models.CharField(max_length=500, verbose_name="مسیر فایل")
+    # فایل تا اجرای job پس‌زمینه روی storage نگه داشته می‌شود
+    file = models.FileField(upload_to='uploads/%Y/%m/', null=True, blank=True, verbose_name="فایل")
     file_type = models.CharField(max_length=20, choices=FILE_TYPE_CHOICES, verbose_name="نوع فایل")
     records_count = models.PositiveIntegerField(default=0, verbose_name="تعداد رکوردها")
     upload_date = models.DateTimeField(auto_now_add=True, verbose_name="تاریخ آپلود")
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='uploaded_files', verbose_name="پروژه")
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='uploaded_files',
                                     verbose_name="آپلود شده توسط")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="وضعیت")
+    processed_rows = models.PositiveIntegerField(default=0, verbose_name="ردیف‌های پردازش شده")
+    failed_rows = models.PositiveIntegerField(default=0, verbose_name="ردیف‌های ناموفق")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="شروع پردازش")
+    # با شروع job و هر گزارش پیشرفت به‌روز می‌شود؛ job زنده با آن از job رها شده تشخیص داده می‌شود
+    last_progress_at = models.DateTimeField(null=True, blank=True, verbose_name="آخرین گزارش پیشرفت")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="پایان پردازش")
+    error_message = models.TextField(blank=True, verbose_name="پیام خطا")
+    # خلاصه نتیجه import (همان بدنه‌ای که قبلا پاسخ درخواست آپلود بود)
+    result = models.JSONField(null=True, blank=True, verbose_name="نتیجه")
+
     class Meta:
         verbose_name = "فایل آپلود شده"
         verbose_name_plural = "فایل‌های آپلود شده"
@@ -495,6 +818,18 @@ class UploadedFile(models.Model):
     def __str__(self):
         return f"{self.file_name} - {self.project.name}"
 
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_COMPLETED, self.STATUS_FAILED)
+
+    def get_progress(self):
+        """درصد ردیف‌های پردازش شده (قبل از خواندن فایل تعداد ردیف‌ها معلوم نیست)"""
+        if self.status == self.STATUS_COMPLETED:
+            return 100
+        if not self.records_count:
+            return 0
+        return min(100, int(self.processed_rows * 100 / self.records_count))
+
 class ExportReport(models.Model):
     """مدل برای گزارش‌های صادر شده"""
     EXPORT_TYPE_CHOICES = [
@@ -538,71 +873,6 @@ class ExportReport(models.Model):
         else:
             self.filters = ""
 
-class CachedStatistics(models.Model):
-    """مدل برای کش آمار"""
-    stat_type = models.CharField(max_length=50, verbose_name="نوع آمار")
-    stat_key = models.CharField(max_length=100, verbose_name="کلید آمار")
-    stat_value = models.TextField(verbose_name="مقدار آمار")
-    calculated_at = models.DateTimeField(auto_now_add=True, verbose_name="محاسبه شده در")
-    expires_at = models.DateTimeField(null=True, blank=True, verbose_name="انقضا در")
-
-    class Meta:
-        verbose_name = "آمار کش شده"
-        verbose_name_plural = "آمارهای کش شده"
-        unique_together = ['stat_type', 'stat_key']
-        ordering = ['-calculated_at']
-
-    def __str__(self):
-        return f"{self.stat_type} - {self.stat_key}"
-
-    def get_stat_value(self):
-        """دریافت مقدار آمار به صورت dict"""
-        if self.stat_value:
-            try:
-                return json.loads(self.stat_value)
-            except json.JSONDecodeError:
-                return {}
-        return {}
-
-    def set_stat_value(self, value_dict):
-        """تنظیم مقدار آمار"""
-        if value_dict:
-            self.stat_value = json.dumps(value_dict, ensure_ascii=False)
-        else:
-            self.stat_value = '{}'
-
-    def is_expired(self):
-        """بررسی انقضای کش"""
-        if not self.expires_at:
-            return False
-        return datetime.now() > self.expires_at
-
-    @classmethod
-    def get_cached_stat(cls, stat_type, stat_key):
-        """دریافت آمار کش شده"""
-        try:
-            cached = cls.objects.get(stat_type=stat_type, stat_key=stat_key)
-            if not cached.is_expired():
-                return cached.get_stat_value()
-        except cls.DoesNotExist:
-            pass
-        return None
-
-    @classmethod
-    def set_cached_stat(cls, stat_type, stat_key, value_dict, expires_in_hours=24):
-        """تنظیم آمار کش شده"""
-        cached, created = cls.objects.get_or_create(
-            stat_type=stat_type,
-            stat_key=stat_key
-        )
-
-        cached.set_stat_value(value_dict)
-        cached.calculated_at = datetime.now()
-        cached.expires_at = datetime.now() + timedelta(hours=expires_in_hours)
-        cached.save()
-
-        return cached
-
 # call_center/models.py
 class ContactLog(models.Model):
     action = models.CharField(max_length=200, verbose_name="اقدام")
@@ -2,6 +2,17 @@
 
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from .models import Project, ProjectMembership, Contact, Call
+from .services.memberships import has_project_role
+
+
+def _get_project_id(obj):
+    """شناسه پروژه آبجکت بدون بارگذاری خود پروژه (None اگر به پروژه مرتبط نباشد)"""
+    if isinstance(obj, Project):
+        return obj.pk
+    if hasattr(obj, 'project_id'):  # برای مدل‌هایی مانند Contact, Call, etc.
+        return obj.project_id
+    return None
+
 
 # 1. کلاس دسترسی برای ادمین پروژه
 class IsProjectAdmin(BasePermission):
@@ -16,21 +27,12 @@ class IsProjectAdmin(BasePermission):
         if request.user.is_superuser:
             return True
 
-        # مشخص کردن پروژه بر اساس نوع آبجکت (Project, Contact, Call, etc.)
-        project = None
-        if isinstance(obj, Project):
-            project = obj
-        elif hasattr(obj, 'project'): # برای مدل‌هایی مانند Contact, Call, etc.
-            project = obj.project
-        else:
+        project_id = _get_project_id(obj)
+        if project_id is None:
             return False # اگر آبجکت به پروژه مرتبط نباشد، دسترسی داده نمی‌شود.
 
         # بررسی اینکه آیا کاربر عضو پروژه با نقش 'admin' است یا خیر.
-        return ProjectMembership.objects.filter(
-            project=project,
-            user=request.user,
-            role='admin'
-        ).exists()
+        return has_project_role(request, project_id, ['admin'])
 
 
 # 2. کلاس دسترسی برای تماس‌گیرنده پروژه
@@ -46,20 +48,12 @@ class IsProjectCaller(BasePermission):
         if request.user.is_superuser:
             return True
 
-        project = None
-        if isinstance(obj, Project):
-            project = obj
-        elif hasattr(obj, 'project'):
-            project = obj.project
-        else:
-            return False
+        project_id = _get_project_id(obj)
+        if project_id is None:
+            return False # اگر آبجکت به پروژه مرتبط نباشد، دسترسی داده نمی‌شود.
 
         # بررسی اینکه آیا کاربر عضو پروژه با نقش 'caller' است یا خیر.
-        return ProjectMembership.objects.filter(
-            project=project,
-            user=request.user,
-            role='caller'
-        ).exists()
+        return has_project_role(request, project_id, ['caller'])
 
 
 # 3. کلاس دسترسی ترکیبی: ادمین یا تماس‌گیرنده پروژه
@@ -75,20 +69,12 @@ class IsProjectAdminOrCaller(BasePermission):
         if request.user.is_superuser:
             return True
 
-        project = None
-        if isinstance(obj, Project):
-            project = obj
-        elif hasattr(obj, 'project'):
-            project = obj.project
-        else:
-            return False
+        project_id = _get_project_id(obj)
+        if project_id is None:
+            return False # اگر آبجکت به پروژه مرتبط نباشد، دسترسی داده نمی‌شود.
 
         # بررسی اینکه آیا کاربر عضو پروژه با نقش 'admin' یا 'caller' است.
-        return ProjectMembership.objects.filter(
-            project=project,
-            user=request.user,
-            role__in=['admin', 'caller']
-        ).exists()
+        return has_project_role(request, project_id, ['admin', 'caller'])
 
 
 # 4. کلاس دسترسی برای کاربرانی که فقط حق خواندن دارند (مخاطب یا ...)
@@ -104,24 +90,16 @@ class IsReadOnlyOrProjectAdmin(BasePermission):
         if request.user.is_superuser:
             return True
 
-        project = None
-        if isinstance(obj, Project):
-            project = obj
-        elif hasattr(obj, 'project'):
-            project = obj.project
-        else:
-            return False
+        project_id = _get_project_id(obj)
+        if project_id is None:
+            return False # اگر آبجکت به پروژه مرتبط نباشد، دسترسی داده نمی‌شود.
 
         # بررسی عضویت کاربر در پروژه
-        is_member = ProjectMembership.objects.filter(project=project, user=request.user).exists()
+        is_member = has_project_role(request, project_id)
 
         # اگر متد درخواست از نوع امن (GET, HEAD, OPTIONS) باشد و کاربر عضو پروژه باشد، اجازه داده می‌شود.
         if request.method in SAFE_METHODS:
             return is_member
 
         # در غیر این صورت (برای متدهای POST, PUT, PATCH, DELETE)، باید کاربر نقش 'admin' داشته باشد.
-        return ProjectMembership.objects.filter(
-            project=project,
-            user=request.user,
-            role='admin'
-        ).exists()
+        return has_project_role(request, project_id, ['admin'])
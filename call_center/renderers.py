@@ -0,0 +1,49 @@
+"""
+رندر سریع JSON برای پاسخ‌های حجیم (لیست مخاطبین و تماس‌ها).
+اگر orjson نصب باشد از آن استفاده می‌شود و در غیر این صورت JSONRenderer خود DRF.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson اختیاری است
+    orjson = None
+
+# تاریخ‌ها به encoder خود DRF سپرده می‌شوند تا خروجی با JSONRenderer یکی بماند
+# (مثلا Z به جای +00:00 برای زمان‌های UTC)
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if orjson is not None else 0
+)
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    """
+    انواعی که orjson مستقیم نمی‌شناسد: Decimal، تاریخ و زمان، رشته‌های lazy ترجمه،
+    QuerySet و ... با همان قواعد encoder خود DRF تبدیل می‌شوند.
+    """
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    جایگزین JSONRenderer با orjson. خروجی‌های دارای indent (مثلا از BrowsableAPI)
+    و داده‌هایی که orjson نمی‌تواند رمزگذاری کند به JSONRenderer معمولی سپرده می‌شوند.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # مثلا عدد صحیح بزرگ‌تر از ۶۴ بیت
+            return super().render(data, accepted_media_type, renderer_context)
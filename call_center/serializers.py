@@ -1,7 +1,6 @@
 # call_center/serializers.py
 import re
-from persiantools.jdatetime import JalaliDate
-from django.db import transaction
+from django.db import transaction, models
 from django.db.models import Count, Prefetch
 from rest_framework import serializers
 from django.conf import settings
@@ -16,12 +15,83 @@ from .models import (
     SavedSearch,
     UploadedFile,
     ExportReport,
-    CachedStatistics, Question, AnswerChoice, CallAnswer, Ticket,
+    Question, AnswerChoice, CallAnswer, Ticket,
 )
 from rest_framework import serializers
 from .models import Call, Contact, Project, ProjectMembership
 import json
 from rest_framework import serializers
+from .services.cache import cached_projects_statistic
+from .services.statistics import (
+    get_projects_statistics, get_phone_call_counters, PHONE_CALL_COUNTERS,
+    get_call_answers_summaries,
+)
+from .services.memberships import get_project_role
+from .services.contacts import (
+    recent_note_calls_queryset, RECENT_CALL_NOTES_ATTR, RECENT_CALL_NOTES_LIMIT,
+)
+from rest_framework.permissions import SAFE_METHODS
+from .utils import format_jalali_date, format_jalali_dates
+
+
+def parse_query_list(request, name):
+    """مقدار پارامتر کاما-جدا (مثل ?fields=id,name) به صورت مجموعه؛ None اگر ارسال نشده باشد"""
+    if request is None:
+        return None
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    پشتیبانی از ?fields= و ?expand= در پاسخ‌های خواندنی.
+    fields فقط فیلدهای نام برده را نگه می‌دارد و expand فیلدهای اختیاری را اضافه می‌کند؛
+    فیلدهای حذف شده اصلا ساخته و محاسبه نمی‌شوند. فقط روی سریالایزر اصلی view اعمال
+    می‌شود و سریالایزرهای تو در تو (مثل contact داخل تماس) دست نمی‌خورند.
+    """
+    # فیلدهایی که فقط با ?expand= (یا نام بردن در ?fields=) برگردانده می‌شوند
+    EXPANDABLE_FIELDS = ()
+    # فیلدهایی که در اکشن list فقط با ?expand= برگردانده می‌شوند
+    OPTIONAL_LIST_FIELDS = ()
+
+    @classmethod
+    def get_requested_fields(cls, request, action=None):
+        """نام فیلدهای پاسخ برای یک درخواست (view ها برای انتخاب prefetch ها هم از آن استفاده می‌کنند)"""
+        names = set(cls.Meta.fields)
+        optional = set(cls.EXPANDABLE_FIELDS)
+        if action == 'list':
+            optional |= set(cls.OPTIONAL_LIST_FIELDS)
+
+        fields = None
+        expand = set()
+        if request is not None:
+            # include نام قبلی expand است (?include=call_answers_summary)
+            expand = (parse_query_list(request, 'expand') or set()) | (parse_query_list(request, 'include') or set())
+            # در درخواست‌های نوشتنی همه فیلدهای قابل نوشتن باید بمانند
+            if request.method in SAFE_METHODS:
+                fields = parse_query_list(request, 'fields')
+
+        if fields is None:
+            selected = names - optional
+        else:
+            selected = names & fields
+        return selected | (names & expand)
+
+    def _is_view_serializer(self):
+        root = self.root
+        return root is self or getattr(root, 'child', None) is self
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_view_serializer():
+            return fields
+        view = self.context.get('view')
+        selected = self.get_requested_fields(self.context.get('request'), getattr(view, 'action', None))
+        return {name: field for name, field in fields.items() if name in selected}
+
+
 # 1. سریالایزر برای مدل کاربر سفارشی
 class CustomUserSerializer(serializers.ModelSerializer):
     """
@@ -40,7 +110,7 @@ class CustomUserSerializer(serializers.ModelSerializer):
             'is_staff', 'is_active', 'date_joined', 'last_login'
         )
     def get_persian_date_joined(self, obj):
-        return str(JalaliDate((obj.date_joined.date())))
+        return format_jalali_date(obj.date_joined)
 # your_app/serializers.py
 
 class AnswerChoiceSerializer(serializers.ModelSerializer):
@@ -56,28 +126,6 @@ class QuestionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Question
         fields = ['id', 'text', 'choices']
-class CallAnswerSummarySerializer(serializers.ModelSerializer):
-    """Serializer for summarizing answers per question in a project."""
-    question = QuestionSerializer(read_only=True)
-    selected_choice = AnswerChoiceSerializer(read_only=True)
-    # Aggregate fields: e.g., count of selections per choice
-    choice_counts = serializers.SerializerMethodField()
-
-    class Meta:
-        model = CallAnswer
-        fields = ['question', 'selected_choice', 'choice_counts']
-    #TODO useless method field no use at all
-    def get_choice_counts(self, obj):
-        # Optional: Aggregate counts for this answer's choice across the project
-        project = self.context['project']
-        if obj.selected_choice:
-            count = CallAnswer.objects.filter(
-                call__project=project,
-                selected_choice=obj.selected_choice
-            ).count()
-            return {'count': count, 'choice_id': obj.selected_choice.id}
-        return None
-
 class ProjectMembershipSerializer(serializers.ModelSerializer):
     """
     سریالایزر برای مدل ProjectMembership.
@@ -95,11 +143,33 @@ class ProjectMembershipSerializer(serializers.ModelSerializer):
         fields = ('id', 'project_id', 'user', 'user_id', 'role', 'assigned_at')
         read_only_fields = ('assigned_at',)
 
+class ProjectListSerializer(serializers.ListSerializer):
+    """
+    لیست پروژه‌ها؛ آمار پروژه‌های صفحه از کش خوانده می‌شود و آمار پروژه‌هایی
+    که در کش نیستند یکجا (با یک کوئری) محاسبه می‌شود.
+    """
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        projects = list(iterable)
+        project_ids = [project.pk for project in projects]
+        if 'project_statistics' in self.child.fields:
+            self.context['project_statistics'] = cached_projects_statistic(
+                'project_statistics', project_ids, get_projects_statistics
+            )
+        if 'call_answers_summary' in self.child.fields:
+            self.context['call_answers_summary'] = cached_projects_statistic(
+                'call_answers_summary', project_ids, get_call_answers_summaries
+            )
+        return super().to_representation(projects)
+
 # 3. سریالایزر پروژه با اطلاعات اعضا
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     سریالایزر برای مدل Project.
     """
+    # فیلد سنگینی که در لیست پروژه‌ها فقط با ?expand=call_answers_summary برگردانده می‌شود
+    OPTIONAL_LIST_FIELDS = ('call_answers_summary',)
+
     call_answers_summary = serializers.SerializerMethodField()
     created_by = CustomUserSerializer(read_only=True)
     created_by_id = serializers.PrimaryKeyRelatedField(
@@ -117,36 +187,18 @@ class ProjectSerializer(serializers.ModelSerializer):
     #TODO before change date to djangojalali don't  change this
     persian_created_at = serializers.SerializerMethodField()
     def get_project_statistics(self,obj):
-        return obj.get_statistics()
+        statistics = self.context.get('project_statistics', {}).get(obj.pk)
+        if statistics is None:
+            statistics = obj.get_statistics()
+        return statistics
 
     def get_call_answers_summary(self, obj):
-        """Custom field to retrieve all answers from the project's calls, grouped by question."""
-        project = obj  # The project instance
-        # Fetch answers with prefetch for efficiency
-        answers = CallAnswer.objects.filter(
-            call__project=project
-        ).select_related(
-            'question', 'selected_choice'
-        ).prefetch_related(
-            Prefetch('question__choices')
-        )
-
-        # Group by question for structured output
-        grouped_answers = {}
-        for answer in answers:
-            q_id = answer.question.id
-            if q_id not in grouped_answers:
-                grouped_answers[q_id] = {
-                    'question': QuestionSerializer(answer.question).data,
-                    'answers': []
-                }
-            grouped_answers[q_id]['answers'].append(
-                CallAnswerSummarySerializer(answer, context={'project': project}).data
-            )
+        """هیستوگرام پاسخ‌ها به سوال‌های پروژه (تعداد انتخاب هر گزینه) از کش آمار"""
+        summary = self.context.get('call_answers_summary', {}).get(obj.pk)
+        if summary is None:
+            summary = obj.get_call_answers_summary()
+        return summary
 
-        # Convert to list for serialization
-        summary_list = list(grouped_answers.values())
-        return summary_list
     def to_representation(self, instance):
         """Ensure active questions are filtered."""
         representation = super().to_representation(instance)
@@ -164,10 +216,11 @@ class ProjectSerializer(serializers.ModelSerializer):
             ,'persian_created_at','project_statistics'
         )
         read_only_fields = ('created_at', 'updated_at', 'members')
+        list_serializer_class = ProjectListSerializer
     def get_persian_updated_at(self,obj):
-        return str(JalaliDate(obj.updated_at.date()))
+        return format_jalali_date(obj.updated_at)
     def get_persian_created_at(self,obj):
-        return str(JalaliDate(obj.created_at.date()))
+        return format_jalali_date(obj.created_at)
 
 
 # 4. سریالایزر مخاطبین
@@ -183,7 +236,7 @@ class TicketSerializer(serializers.ModelSerializer):
         model = Ticket
         fields = ("title", "description",)
 
-class ContactSerializer(serializers.ModelSerializer):
+class ContactSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     سریالایزر برای مدل Contact.
     """
@@ -227,49 +280,42 @@ class ContactSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'created_by'
         )
     def get_persian_updated_at(self,obj):
-        return str(JalaliDate(obj.updated_at.date()))
+        return format_jalali_date(obj.updated_at)
     def get_persian_created_by(self,obj):
-        return str(JalaliDate(obj.created_at.date()))
+        return format_jalali_date(obj.created_at)
+
+    def _get_phone_call_counters(self, obj):
+        """
+        شمارنده‌های تماس شماره تلفن مخاطب در همه پروژه‌ها؛ از annotate کوئری‌ست لیست
+        (annotate_phone_call_counters) خوانده می‌شود و فقط در نبود آن یک کوئری می‌زند.
+        """
+        counters = getattr(obj, '_phone_call_counters', None)
+        if counters is None:
+            if hasattr(obj, 'phone_calls_count'):
+                counters = {name: getattr(obj, name) for name in PHONE_CALL_COUNTERS}
+            else:
+                counters = get_phone_call_counters(obj.phone)
+            obj._phone_call_counters = counters
+        return counters
 
     def get_contacts_calls_answered_count(self,obj):
-        phone_number = obj.phone
-        answered_calls = Call.objects.filter(
-            contact__phone=phone_number,
-            status="answered"
-        ).count()
-        return answered_calls
+        return self._get_phone_call_counters(obj)['phone_calls_answered_count']
 
     def get_contact_calls_not_answered_count(self,obj):
-        phone_number = obj.phone
-        not_answered_calls = Call.objects.filter(
-            contact__phone=phone_number,
-            status="not_answered"
-        ).count()
-        return not_answered_calls
+        return self._get_phone_call_counters(obj)['phone_calls_not_answered_count']
 
     def get_contact_calls_count(self, obj):
-        phone_number = obj.phone
-        all_call_count = Call.objects.filter(contact__phone=phone_number).count()
+        return self._get_phone_call_counters(obj)['phone_calls_count']
 
-        return all_call_count
     def get_contacts_calls_rate(self,obj):
-        phone_number = obj.phone
-        answered_calls = Call.objects.filter(
-            contact__phone=phone_number,
-            status="answered"
-        ).count()
-
-        # تعداد کل تماس‌ها
-        total_calls = Call.objects.filter(contact__phone=phone_number).count()
-
-        # تعداد تماس‌های پاسخ داده شده
+        counters = self._get_phone_call_counters(obj)
+        total_calls = counters['phone_calls_count']
 
         # اگر تماسی نباشد، نرخ صفر است
         if total_calls == 0:
             return 0.0
-        # محاسبه درصد و گرد کردن به دو رقم اعشار
-        rate = int((answered_calls / total_calls) * 100)
-        return rate
+        # درصد تماس‌های پاسخ داده شده
+        return int((counters['phone_calls_answered_count'] / total_calls) * 100)
 
 
     def get_contact_notes(self,obj):
@@ -283,7 +329,7 @@ class ContactSerializer(serializers.ModelSerializer):
                 {
                     'caller_name': call.caller.get_full_name() if call.caller else 'ناشناس',
                     'note': call.notes,
-                    'created_at': str(JalaliDate(call.created_at.date())),
+                    'created_at': format_jalali_date(call.created_at),
                     'call_result': call.get_call_result_display() if hasattr(call,
                                                                              'get_call_result_display') else call.call_result
                 }
@@ -316,29 +362,25 @@ class ContactSerializer(serializers.ModelSerializer):
         if user.is_superuser:
             return True
 
-        # بررسی عضویت در پروژه
-        try:
-            membership = ProjectMembership.objects.get(project=obj.project, user=user)
-
-            # ادمین یا تماس‌گیرنده تخصیص یافته می‌توانند تماس بگیرند
-            if membership.role == 'admin':
-                # ادمین فقط با مخاطبین تخصیص یافته به خودش یا بدون تخصیص
-                if not obj.assigned_caller or obj.assigned_caller == user:
-                    return True
-                # اگر ادمین شماره تلفن دارد، با مطابقت شماره تلفن چک کن
-                if hasattr(user, 'phone') and user.phone and obj.assigned_caller:
-                    user_phone = re.sub(r'\D', '', user.phone)  # حذف کاراکترهای غیر عددی
-                    if hasattr(obj.assigned_caller, 'phone') and obj.assigned_caller.phone:
-                        assigned_phone = re.sub(r'\D', '', obj.assigned_caller.phone)
-                        return user_phone == assigned_phone
-                return False
-
-            elif membership.role == 'caller':
-                # تماس‌گیرنده فقط با مخاطبین تخصیص یافته به خودش
-                return obj.assigned_caller == user
-
-        except ProjectMembership.DoesNotExist:
-            pass
+        # بررسی عضویت در پروژه (از نقشه عضویت‌های درخواست، بدون کوئری به ازای هر ردیف)
+        role = get_project_role(request, obj.project_id)
+
+        # ادمین یا تماس‌گیرنده تخصیص یافته می‌توانند تماس بگیرند
+        if role == 'admin':
+            # ادمین فقط با مخاطبین تخصیص یافته به خودش یا بدون تخصیص
+            if not obj.assigned_caller_id or obj.assigned_caller_id == user.pk:
+                return True
+            # اگر ادمین شماره تلفن دارد، با مطابقت شماره تلفن چک کن
+            if hasattr(user, 'phone') and user.phone and obj.assigned_caller:
+                user_phone = re.sub(r'\D', '', user.phone)  # حذف کاراکترهای غیر عددی
+                if hasattr(obj.assigned_caller, 'phone') and obj.assigned_caller.phone:
+                    assigned_phone = re.sub(r'\D', '', obj.assigned_caller.phone)
+                    return user_phone == assigned_phone
+            return False
+
+        elif role == 'caller':
+            # تماس‌گیرنده فقط با مخاطبین تخصیص یافته به خودش
+            return obj.assigned_caller_id == user.pk
 
         return False
 
@@ -367,19 +409,18 @@ class ContactSerializer(serializers.ModelSerializer):
     def get_call_notes(self, obj):
         """یادداشت‌های تماس"""
         try:
-            # Eager loading for efficiency: prefetch answers and related fields
-            recent_calls = obj.calls.prefetch_related(
-                'answers__question',
-                'answers__selected_choice'
-            ).exclude(
-                notes=''
-            ).order_by('-call_date')[:5]
+            # تماس‌های اخیر از prefetch پنجره‌ای ContactViewSet (recent_call_notes_prefetch)
+            recent_calls = getattr(obj, RECENT_CALL_NOTES_ATTR, None)
+            if recent_calls is None:
+                recent_calls = recent_note_calls_queryset().filter(
+                    contact=obj
+                )[:RECENT_CALL_NOTES_LIMIT]
 
             return [
                 {
                     'caller_name': call.caller.get_full_name() if call.caller else 'ناشناس',
                     'note': call.notes,
-                    'created_at':  str(JalaliDate(call.call_date.date())),
+                    'created_at':  format_jalali_date(call.call_date),
                     'call_result': call.get_call_result_display() if hasattr(call,
                                                                              'get_call_result_display') else call.call_result,
                     # New: List of answers with question and choice details
@@ -479,35 +520,43 @@ class CallAnswerSerializer(serializers.ModelSerializer):
         fields = ['question', 'selected_choice','question_text','selected_choice_text',"question_text",'selected_choice_text']
 
 
-class CallSerializer(serializers.ModelSerializer):
+class CallSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     سریالایزر برای مدل Call.
+    نمایش پیش‌فرض تخت است (شناسه‌ها و چند فیلد نمایشی)؛ نسخه کامل مخاطب، پروژه و
+    کاربران فقط با ?expand=contact,project,caller,edited_by برگردانده می‌شود.
     """
-    #todo this need to get damn optimised as ssoooooon as possible
+    EXPANDABLE_FIELDS = ('contact', 'caller', 'project', 'edited_by')
+
     answers = CallAnswerSerializer(many=True, required=False)
     contact = ContactSerializer(read_only=True)
     contact_id = serializers.PrimaryKeyRelatedField(
-        queryset=Contact.objects.all(), source='contact', write_only=True
+        queryset=Contact.objects.all(), source='contact'
     )
+    contact_name = serializers.CharField(source='contact.full_name', read_only=True)
+    contact_phone = serializers.CharField(source='contact.phone', read_only=True)
     caller = CustomUserSerializer(read_only=True)
     caller_id = serializers.PrimaryKeyRelatedField(
-        queryset=CustomUser.objects.all(), source='caller', write_only=True
+        queryset=CustomUser.objects.all(), source='caller'
     )
+    caller_name = serializers.SerializerMethodField()
     project = ProjectSerializer(read_only=True)
     project_id = serializers.PrimaryKeyRelatedField(
-        queryset=Project.objects.all(), source='project', write_only=True
+        queryset=Project.objects.all(), source='project'
     )
+    project_name = serializers.CharField(source='project.name', read_only=True)
     edited_by = CustomUserSerializer(read_only=True)
     edited_by_id = serializers.PrimaryKeyRelatedField(
-        queryset=CustomUser.objects.all(), source='edited_by', write_only=True, allow_null=True, required=False
+        queryset=CustomUser.objects.all(), source='edited_by', allow_null=True, required=False
     )
     persian_call_date = serializers.SerializerMethodField()
     original_data = serializers.JSONField(required=False)
     class Meta:
         model = Call
         fields = (
-            'id', 'contact', 'contact_id', 'caller', 'caller_id', 'project',
-            'project_id', 'call_date', 'call_result', 'status', 'notes', 'feedback',
+            'id', 'contact', 'contact_id', 'contact_name', 'contact_phone',
+            'caller', 'caller_id', 'caller_name', 'project', 'project_id', 'project_name',
+            'call_date', 'call_result', 'status', 'notes', 'feedback',
             'detailed_report', 'duration', 'follow_up_required', 'follow_up_date',
             'is_editable', 'edited_at', 'edited_by', 'edited_by_id', 'edit_reason',
             'original_data',
@@ -515,8 +564,13 @@ class CallSerializer(serializers.ModelSerializer):
             'persian_call_date'
         )
         read_only_fields = ('call_date', 'created_at', 'edited_at')
+    def get_caller_name(self, obj):
+        """نام کامل تماس‌گیرنده"""
+        if obj.caller is None:
+            return None
+        return obj.caller.get_full_name() or obj.caller.username
     def get_persian_call_date(self,obj):
-        return str(JalaliDate(obj.call_date.date()))
+        return format_jalali_date(obj.call_date)
     def create(self, validated_data):
         answers_data = validated_data.pop('answers', [])
         call = Call.objects.create(**validated_data)
@@ -572,6 +626,27 @@ class UploadedFileSerializer(serializers.ModelSerializer):
     class Meta:
         model = UploadedFile
         fields = '__all__'
+
+
+class UploadedFileProgressSerializer(serializers.ModelSerializer):
+    """وضعیت job import یک فایل آپلود شده (نتیجه فقط بعد از پایان job)"""
+    progress = serializers.IntegerField(source='get_progress', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = UploadedFile
+        fields = (
+            'id', 'file_name', 'file_type', 'project', 'status', 'status_display',
+            'records_count', 'processed_rows', 'failed_rows', 'progress',
+            'upload_date', 'started_at', 'finished_at', 'error_message', 'result',
+        )
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if not instance.is_finished:
+            data.pop('result')
+        return data
 #TODO maybe this be useless to
 class ExportReportSerializer(serializers.ModelSerializer):
     exported_by_id = serializers.PrimaryKeyRelatedField(
@@ -581,14 +656,6 @@ class ExportReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = ExportReport
         fields = '__all__'
-#TODO maybe this is useless also
-class CachedStatisticsSerializer(serializers.ModelSerializer):
-    stat_value = serializers.JSONField(required=False)
-    class Meta:
-        model = CachedStatistics
-        fields = '__all__'
-
-
 class GeneralStatisticsSerializer(serializers.Serializer):
     total_contacts = serializers.IntegerField()
     total_calls = serializers.IntegerField()
@@ -636,6 +703,18 @@ class ProjectStatisticsSerializer(serializers.Serializer):
     caller_performance = CallerPerformanceSerializer(many=True)
 
 
+class CallExcelListSerializer(serializers.ListSerializer):
+    """خروجی اکسل تماس‌ها؛ تاریخ شمسی همه ردیف‌ها با format_jalali_dates یکجا ساخته می‌شود"""
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        calls = list(iterable)
+        self.context['persian_dates'] = dict(zip(
+            (call.pk for call in calls),
+            format_jalali_dates([call.call_date for call in calls]),
+        ))
+        return super().to_representation(calls)
+
+
 class CallExcelSerializer(serializers.ModelSerializer):
     contact_name = serializers.CharField(source='contact.full_name', read_only=True)
     contact_phone = serializers.CharField(source='contact.phone', read_only=True)
@@ -673,8 +752,13 @@ class CallExcelSerializer(serializers.ModelSerializer):
             "answers",
 
         ]
+        list_serializer_class = CallExcelListSerializer
     def get_persian_date(self,obj):
-        return str(JalaliDate(obj.call_date.date()))
+        # تاریخ‌های کل خروجی یکجا در CallExcelListSerializer تبدیل می‌شوند
+        persian_dates = self.context.get('persian_dates')
+        if persian_dates is not None and obj.pk in persian_dates:
+            return persian_dates[obj.pk]
+        return format_jalali_date(obj.call_date)
 
     def get_caller_phone(self, obj):
         # فرض می‌کنیم مدل User یک فیلد پروفایل دارد که شماره تماس در آن ذخیره شده است
@@ -0,0 +1,163 @@
+"""
+کش آمار روی cache framework جنگو (LocMem در توسعه و تست، Redis در production).
+
+کلیدها بر اساس پروژه فضای نام دارند و هر فضای نام یک شمارنده نسخه دارد.
+با هر تغییر تماس/مخاطب/عضویت، نسخه پروژه و نسخه سراسری بالا می‌رود و
+کلیدهای قدیمی دیگر خوانده نمی‌شوند (تا پایان TTL خودشان منقضی می‌شوند).
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+GLOBAL_NAMESPACE = 'global'
+
+# فضای نام آمار وضعیت مخاطبین
+CONTACTS_SCOPE = 'contacts'
+
+_MISSING = object()
+
+
+def _cache():
+    return caches[getattr(settings, 'STATISTICS_CACHE_ALIAS', 'default')]
+
+
+def get_ttl(name):
+    """TTL هر نوع آمار از STATISTICS_CACHE_TTLS (یا مقدار default آن)"""
+    ttls = getattr(settings, 'STATISTICS_CACHE_TTLS', {})
+    return ttls.get(name, ttls.get('default', 300))
+
+
+def _namespace(project_id=None, scope=None):
+    namespace = GLOBAL_NAMESPACE if project_id is None else f'project:{project_id}'
+    return f'{scope}:{namespace}' if scope else namespace
+
+
+def _version_key(namespace):
+    return f'stats:version:{namespace}'
+
+
+def _initial_version():
+    # شروع از زمان فعلی تا اگر شمارنده از کش حذف شد، نسخه‌های قدیمی دوباره استفاده نشوند
+    return int(time.time() * 1000)
+
+
+def _get_versions(namespaces):
+    """نسخه فعلی چند فضای نام با یک رفت و برگشت به کش"""
+    cache = _cache()
+    keys = {namespace: _version_key(namespace) for namespace in namespaces}
+    stored = cache.get_many(list(keys.values()))
+
+    versions = {}
+    for namespace, key in keys.items():
+        if key not in stored:
+            cache.add(key, _initial_version(), timeout=None)
+            stored[key] = cache.get(key)
+        versions[namespace] = stored[key]
+    return versions
+
+
+def _bump_version(namespace):
+    cache = _cache()
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        # شمارنده هنوز ساخته نشده؛ مقدار اولیه از هر نسخه قبلی بزرگ‌تر است
+        cache.add(_version_key(namespace), _initial_version(), timeout=None)
+
+
+def _bump_versions_on_commit(namespaces):
+    """
+    بالا بردن نسخه‌ها پس از commit تراکنش جاری (بیرون از تراکنش بلافاصله).
+    اگر نسخه قبل از commit عوض شود، درخواست همزمان داده قدیمی را با نسخه
+    جدید در کش می‌گذارد و تا پایان TTL همان خوانده می‌شود؛ rollback هم
+    کش را بی‌دلیل باطل نمی‌کند.
+    """
+    def bump():
+        for namespace in namespaces:
+            _bump_version(namespace)
+
+    # خطای کش پس از commit نباید درخواست موفق را خراب کند
+    transaction.on_commit(bump, robust=True)
+
+
+def invalidate_project_statistics(project_id=None):
+    """
+    باطل کردن آمار یک پروژه؛ نسخه سراسری هم بالا می‌رود چون داشبوردهای
+    کلی از داده همه پروژه‌ها ساخته می‌شوند.
+    """
+    namespaces = [GLOBAL_NAMESPACE]
+    if project_id is not None:
+        namespaces.insert(0, _namespace(project_id))
+    _bump_versions_on_commit(namespaces)
+
+
+def invalidate_contact_statistics(project_id=None):
+    """
+    باطل کردن آمار وضعیت مخاطبین (فضای نام contacts) که فقط با تغییر
+    call_status، assigned_caller یا عضویت‌ها عوض می‌شود.
+    """
+    namespaces = [_namespace(scope=CONTACTS_SCOPE)]
+    if project_id is not None:
+        namespaces.insert(0, _namespace(project_id, CONTACTS_SCOPE))
+    _bump_versions_on_commit(namespaces)
+
+
+def _make_key(name, namespace, version, params=None):
+    digest = hashlib.md5(
+        json.dumps(params or {}, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f'stats:{namespace}:v{version}:{name}:{digest}'
+
+
+def cached_statistic(name, compute, project_id=None, params=None, scope=None):
+    """
+    خواندن یک آمار از کش یا محاسبه و ذخیره آن.
+    بدون project_id آمار در فضای نام سراسری ذخیره می‌شود؛ params (مثلا بازه تاریخ)
+    بخشی از کلید است. scope فضای نامی با شمارنده نسخه جداگانه انتخاب می‌کند.
+    """
+    namespace = _namespace(project_id, scope)
+    version = _get_versions([namespace])[namespace]
+    key = _make_key(name, namespace, version, params)
+
+    cache = _cache()
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value, get_ttl(name))
+    return value
+
+
+def cached_projects_statistic(name, project_ids, compute_many):
+    """
+    نسخه چندپروژه‌ای cached_statistic برای صفحه‌های لیست.
+    compute_many فقط برای پروژه‌هایی که در کش نیستند صدا زده می‌شود و باید
+    دیکشنری {project_id: مقدار} برگرداند.
+    """
+    project_ids = list(project_ids)
+    if not project_ids:
+        return {}
+
+    namespaces = {project_id: _namespace(project_id) for project_id in project_ids}
+    versions = _get_versions(namespaces.values())
+    keys = {
+        project_id: _make_key(name, namespace, versions[namespace])
+        for project_id, namespace in namespaces.items()
+    }
+
+    cache = _cache()
+    stored = cache.get_many(list(keys.values()))
+    result = {project_id: stored[key] for project_id, key in keys.items() if key in stored}
+
+    missing = [project_id for project_id in project_ids if project_id not in result]
+    if missing:
+        computed = compute_many(missing)
+        cache.set_many(
+            {keys[project_id]: value for project_id, value in computed.items()},
+            get_ttl(name),
+        )
+        result.update(computed)
+    return result
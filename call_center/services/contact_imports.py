@@ -0,0 +1,268 @@
+"""
+درج/به‌روزرسانی دسته‌ای مخاطبین فایل آپلود شده (upload_contacts_file).
+
+برای هر دسته خوانده شده از فایل، مخاطبین موجود همان شماره‌ها با یک کوئری
+بارگذاری می‌شوند، ردیف‌ها در حافظه به دو دسته درج و به‌روزرسانی تقسیم و
+تماس‌گیرنده‌ها در حافظه تخصیص داده می‌شوند؛ نوشتن با bulk_create / upsert دسته‌ای
+انجام می‌شود. هزینه هر فایل چند کوئری به ازای هر دسته است، نه دو سه کوئری به
+ازای هر ردیف، و حافظه به اندازه یک دسته است، نه کل فایل.
+"""
+import random
+
+import numpy as np
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import Contact, CustomUser
+from ..utils import match_phone_patterns, normalize_phone_numbers
+from .cache import invalidate_contact_statistics, invalidate_project_statistics
+
+# تعداد ردیف هر INSERT / UPDATE دسته‌ای
+IMPORT_BATCH_SIZE = 1000
+
+# حداکثر تعداد ردیف‌های درج/به‌روزرسانی/ناموفق که با جزئیات در نتیجه import می‌آیند
+RESULT_SAMPLE_SIZE = 100
+
+# ستون‌های فایل که خوانده می‌شوند
+CONTACT_IMPORT_COLUMNS = ('phone', 'full_name', 'email', 'address', 'custom_fields')
+
+# فیلدهایی که برای مخاطب موجود بازنویسی می‌شوند
+UPDATE_FIELDS = ('full_name', 'email', 'address', 'custom_fields', 'is_active', 'assigned_caller', 'updated_at')
+
+
+def canonical_phones(phones):
+    """
+    شماره‌ها به فرمت 09xxxxxxxxx (برداری)؛ صفر ابتدای شماره‌ای که اکسل به عدد تبدیل
+    کرده برگردانده می‌شود. خروجی (آرایه شماره‌ها، ماسک معتبر بودن)
+    """
+    phones, _ = normalize_phone_numbers(phones)
+    length = np.strings.str_len(phones)
+    missing_zero = (
+        np.strings.isdigit(phones) & ~np.strings.startswith(phones, '0') & ((length == 9) | (length == 10))
+    )
+    if missing_zero.any():
+        phones = np.where(missing_zero, np.strings.add('0', phones), phones)
+    return phones, match_phone_patterns(phones)
+
+
+def canonical_phone(phone):
+    """نسخه تک شماره canonical_phones"""
+    if not phone:
+        return phone
+    phones, _ = canonical_phones([phone])
+    return str(phones[0])
+
+
+def _valid_email(email):
+    return email if email and '@' in email else ''
+
+
+def _max_length(name):
+    return Contact._meta.get_field(name).max_length
+
+
+class _ContactBatch:
+    """ردیف‌های ادغام شده یک دسته قبل از نوشتن"""
+
+    def __init__(self, existing):
+        # {شماره: (pk، ایمیل، آدرس، فیلدهای سفارشی، تماس‌گیرنده)} مخاطبین موجود شماره‌های دسته
+        self.existing = existing
+        self.new = {}
+        self.updated = {}
+        # شناسه مخاطبین موجود؛ روی خود شیء گذاشته نمی‌شود تا INSERT ... ON CONFLICT روی id تداخل نکند
+        self.updated_pks = {}
+
+
+class ContactUpsert:
+    """
+    یک اجرای import مخاطبین برای یک پروژه.
+
+    add_rows() (یا add() برای یک ردیف) هر دسته ردیف تمیز شده را همان لحظه می‌نویسد؛
+    از کل فایل فقط نقشه {شماره: pk} مخاطبین نوشته شده، شمارنده‌ها و نمونه‌ای محدود
+    (sample_size) از ردیف‌های درج، به‌روزرسانی و ناموفق در حافظه می‌ماند. ردیف تکراری
+    (در همان دسته یا دسته‌های بعدی) همان مخاطب قبلی را به‌روزرسانی می‌کند. finish()
+    کش آمار پروژه را یک بار باطل می‌کند.
+    """
+
+    def __init__(self, project, callers, created_by=None, batch_size=IMPORT_BATCH_SIZE,
+                 sample_size=RESULT_SAMPLE_SIZE):
+        self.project = project
+        # [(user_id, نام کامل)] تماس‌گیرندگان پروژه برای تخصیص تصادفی
+        self.callers = callers
+        self.created_by = created_by
+        self.batch_size = batch_size
+        self.sample_size = sample_size
+        self.created_count = 0
+        self.updated_count = 0
+        self.failed_count = 0
+        # نمونه ردیف‌ها برای نتیجه import
+        self.created = []
+        self.updated = []
+        self.failed = []
+        # {شماره: pk} مخاطبینی که همین import درج یا به‌روزرسانی کرده است
+        self._written = {}
+
+    def _random_caller_id(self):
+        return random.choice(self.callers)[0]
+
+    def _fail(self, row_number, data, error):
+        self.failed_count += 1
+        if len(self.failed) < self.sample_size:
+            self.failed.append({'row': row_number, 'data': data, 'error': error})
+
+    def _load_existing(self, phones):
+        """مخاطبین موجود شماره‌های یک دسته: {شماره: (pk، ایمیل، آدرس، فیلدهای سفارشی، تماس‌گیرنده)}"""
+        return {
+            row[0]: row[1:] for row in Contact.objects.filter(project=self.project, phone__in=phones).values_list(
+                'phone', 'pk', 'email', 'address', 'custom_fields', 'assigned_caller_id'
+            )
+        }
+
+    def add_rows(self, rows):
+        """
+        اضافه کردن و نوشتن یک دسته ردیف [(شماره ردیف، data)]؛ data دیکشنری رشته‌های تمیز
+        شده CONTACT_IMPORT_COLUMNS است. شماره‌های کل دسته یک جا نرمال و اعتبارسنجی و
+        مخاطبین موجود آن‌ها با یک کوئری بارگذاری می‌شوند؛ ردیف نامعتبر به failed می‌رود.
+        """
+        phones, valid = canonical_phones([data.get('phone', '') for _, data in rows])
+        phones, valid = phones.tolist(), valid.tolist()
+        batch = _ContactBatch(self._load_existing({phone for phone, is_valid in zip(phones, valid) if is_valid}))
+        for (row_number, data), phone, is_valid in zip(rows, phones, valid):
+            self._add(batch, row_number, data, phone, is_valid)
+        self._write(batch)
+
+    def add(self, row_number, data):
+        """اضافه کردن یک ردیف (add_rows با یک ردیف)"""
+        self.add_rows([(row_number, data)])
+
+    def _add(self, batch, row_number, data, phone, is_valid):
+        if not data.get('phone', ''):
+            self._fail(row_number, data, 'شماره تلفن الزامی است')
+            return
+
+        if not is_valid:
+            self._fail(row_number, data, 'شماره تلفن نامعتبر است')
+            return
+
+        full_name = data.get('full_name') or f"مخاطب {phone}"
+        email = _valid_email(data.get('email', ''))
+        # خطای طول در INSERT دسته‌ای کل دسته را خراب می‌کند؛ همین‌جا ردیف رد می‌شود
+        if len(full_name) > _max_length('full_name') or len(email) > _max_length('email'):
+            self._fail(row_number, data, 'طول نام یا ایمیل بیش از حد مجاز است')
+            return
+        address = data.get('address', '')
+        custom_fields = data.get('custom_fields', '')
+
+        contact = batch.new.get(phone) or batch.updated.get(phone)
+        if contact is None and phone in batch.existing:
+            pk, old_email, old_address, old_custom_fields, assigned_caller_id = batch.existing[phone]
+            contact = Contact(
+                project=self.project, phone=phone, email=old_email, address=old_address,
+                custom_fields=old_custom_fields, assigned_caller_id=assigned_caller_id,
+            )
+            batch.updated[phone] = contact
+            batch.updated_pks[phone] = pk
+
+        if contact is None:
+            batch.new[phone] = Contact(
+                project=self.project,
+                full_name=full_name,
+                phone=phone,
+                email=email,
+                address=address,
+                custom_fields=custom_fields,
+                assigned_caller_id=self._random_caller_id(),
+                call_status='pending',
+                created_by=self.created_by,
+            )
+            return
+
+        # به‌روزرسانی: مقدار خالی فایل، مقدار قبلی را پاک نمی‌کند
+        contact.full_name = full_name
+        contact.email = email or contact.email
+        contact.address = address or contact.address
+        contact.custom_fields = custom_fields or contact.custom_fields
+        contact.is_active = True
+        if not contact.assigned_caller_id:
+            contact.assigned_caller_id = self._random_caller_id()
+
+    def _write(self, batch):
+        """نوشتن دسته‌ای درج‌ها و به‌روزرسانی‌های یک دسته و ثبت شمارنده‌ها و نمونه‌ها"""
+        updated = list(batch.updated.values())
+        now = timezone.now()
+        for contact in updated:
+            contact.updated_at = now
+
+        with transaction.atomic():
+            created = Contact.objects.bulk_create(list(batch.new.values()), batch_size=self.batch_size)
+            if connection.features.supports_update_conflicts_with_target:
+                # INSERT ... ON CONFLICT (project_id, phone) DO UPDATE؛ bulk_update برای هر
+                # دسته یک CASE WHEN به ازای هر ردیف و فیلد می‌سازد که روی دسته‌های بزرگ کند است
+                Contact.objects.bulk_create(
+                    updated, batch_size=self.batch_size, update_conflicts=True,
+                    unique_fields=('project', 'phone'), update_fields=UPDATE_FIELDS,
+                )
+                for phone, contact in batch.updated.items():
+                    contact.pk = batch.updated_pks[phone]
+            else:
+                for phone, contact in batch.updated.items():
+                    contact.pk = batch.updated_pks[phone]
+                Contact.objects.bulk_update(updated, UPDATE_FIELDS, batch_size=self.batch_size)
+
+        if any(contact.pk is None for contact in created):
+            # دیتابیسی که شناسه ردیف‌های درج شده را برنمی‌گرداند
+            pks = dict(Contact.objects.filter(project=self.project, phone__in=batch.new).values_list('phone', 'pk'))
+            for contact in created:
+                contact.pk = pks[contact.phone]
+
+        # مخاطبی که همین import قبلا نوشته دوباره شمرده نمی‌شود
+        updated = [contact for contact in updated if contact.phone not in self._written]
+        self.created_count += len(created)
+        self.updated_count += len(updated)
+        self._written.update((contact.phone, contact.pk) for contact in created)
+        self._written.update((phone, contact.pk) for phone, contact in batch.updated.items())
+        self._add_samples(created, updated)
+
+    def _add_samples(self, created, updated):
+        created = created[:self.sample_size - len(self.created)]
+        updated = updated[:self.sample_size - len(self.updated)]
+        if not created and not updated:
+            return
+        caller_names = self.caller_names(created + updated)
+        self.created.extend(
+            {
+                'id': contact.id,
+                'full_name': contact.full_name,
+                'phone': contact.phone,
+                'assigned_caller': caller_names.get(contact.assigned_caller_id),
+                'assigned_caller_id': contact.assigned_caller_id,
+                'custom_fields': contact.custom_fields,
+                'action': 'created'
+            }
+            for contact in created
+        )
+        self.updated.extend(
+            {
+                'id': contact.id,
+                'full_name': contact.full_name,
+                'phone': contact.phone,
+                'assigned_caller': caller_names.get(contact.assigned_caller_id),
+                'custom_fields': contact.custom_fields,
+                'action': 'updated'
+            }
+            for contact in updated
+        )
+
+    def finish(self):
+        """پایان import؛ bulk_create / bulk_update سیگنال post_save نمی‌فرستند و کش یک بار باطل می‌شود"""
+        if self.created_count or self.updated_count:
+            invalidate_project_statistics(self.project.pk)
+            invalidate_contact_statistics(self.project.pk)
+
+    def caller_names(self, contacts):
+        """نام تماس‌گیرنده تخصیص یافته مخاطبین ({user_id: نام}) با حداکثر یک کوئری"""
+        names = dict(self.callers)
+        missing = {contact.assigned_caller_id for contact in contacts} - set(names) - {None}
+        for user in CustomUser.objects.filter(pk__in=missing).only('first_name', 'last_name'):
+            names[user.pk] = user.get_full_name()
+        return names
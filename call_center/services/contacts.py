@@ -0,0 +1,30 @@
+from django.db.models import Prefetch
+
+from ..models import Call, CallAnswer
+
+# تعداد یادداشت‌های اخیر هر مخاطب در ContactSerializer.call_notes
+RECENT_CALL_NOTES_LIMIT = 5
+
+# نام ویژگی که تماس‌های اخیر پیش‌بارگذاری شده روی مخاطب در آن قرار می‌گیرند
+RECENT_CALL_NOTES_ATTR = 'recent_note_calls'
+
+
+def recent_note_calls_queryset():
+    """تماس‌های دارای یادداشت به همراه تماس‌گیرنده، پاسخ‌ها، سوال‌ها و گزینه‌ها"""
+    answers = CallAnswer.objects.select_related('question', 'selected_choice').order_by('pk')
+    return Call.objects.exclude(notes='').select_related('caller').prefetch_related(
+        Prefetch('answers', queryset=answers),
+    ).order_by('-call_date', '-pk')
+
+
+def recent_call_notes_prefetch(limit=RECENT_CALL_NOTES_LIMIT):
+    """
+    پیش‌بارگذاری فقط limit تماس آخر هر مخاطب. جنگو برای prefetch با برش، یک
+    ROW_NUMBER() روی شناسه مخاطبین صفحه می‌سازد؛ پس یادداشت‌های کل صفحه با دو
+    کوئری (تماس‌ها با تماس‌گیرنده، و پاسخ‌ها با سوال و گزینه) خوانده می‌شوند.
+    """
+    return Prefetch(
+        'calls',
+        queryset=recent_note_calls_queryset()[:limit],
+        to_attr=RECENT_CALL_NOTES_ATTR,
+    )
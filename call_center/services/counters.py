@@ -0,0 +1,86 @@
+from django.db import connection, transaction
+from django.db.models import Count
+
+from ..models import Call, Project, GlobalCounter
+
+
+def call_status_counter_names():
+    return [GlobalCounter.call_status_name(choice) for choice, _ in Call.CALL_STATUS_CHOICES]
+
+
+def _call_counter_values(calls):
+    """{نام شمارنده: تعداد} تماس‌ها به تفکیک وضعیت و در کل، با یک کوئری GROUP BY"""
+    values = dict.fromkeys(call_status_counter_names(), 0)
+    total_calls = 0
+    for row in calls.order_by().values('status').annotate(count=Count('pk')):
+        values[GlobalCounter.call_status_name(row['status'])] = row['count']
+        total_calls += row['count']
+    values[GlobalCounter.CALLS] = total_calls
+    return values
+
+
+def subtract_calls_from_counters(calls):
+    """کم کردن دسته‌ای تماس‌هایی که قرار است حذف شوند از شمارنده‌های سراسری"""
+    GlobalCounter.apply_deltas({name: -count for name, count in _call_counter_values(calls).items()})
+
+
+def reconcile_global_counters():
+    """
+    همگام‌سازی شمارنده‌های سراسری با شمارش واقعی (دو کوئری شمارش).
+    ردیف شمارنده‌ها اول قفل و بعد در همان تراکنش شمرده می‌شوند تا تماسی که بین
+    شمارش و نوشتن ثبت می‌شود گم نشود؛ در این مدت ثبت تماس‌ها منتظر می‌ماند.
+    شمارنده‌هایی که مقدارشان تغییر کرده را برمی‌گرداند.
+    """
+    names = [GlobalCounter.PROJECTS, GlobalCounter.CALLS] + call_status_counter_names()
+    with transaction.atomic():
+        current = {
+            counter.name: counter
+            for counter in GlobalCounter.objects.select_for_update().filter(name__in=names)
+        }
+        expected = {GlobalCounter.PROJECTS: Project.objects.count()}
+        expected.update(_call_counter_values(Call.objects.all()))
+
+        changed = {}
+        for name, value in expected.items():
+            counter = current.get(name)
+            if counter is None:
+                GlobalCounter.objects.create(name=name, value=value)
+                changed[name] = value
+            elif counter.value != value:
+                counter.value = value
+                counter.save(update_fields=['value', 'updated_at'])
+                changed[name] = value
+    return changed
+
+
+def estimate_table_count(model):
+    """
+    تعداد تقریبی ردیف‌های جدول از آمار PostgreSQL (pg_class.reltuples).
+    روی دیتابیس‌های دیگر یا جدولی که هنوز ANALYZE نشده None برمی‌گرداند.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def get_global_counts(estimated=False):
+    """
+    شمارش‌های سراسری داشبورد از جدول شمارنده‌ها (یک کوئری).
+    در حالت estimated تعداد کل پروژه‌ها و تماس‌ها از reltuples خوانده می‌شود.
+    """
+    names = [GlobalCounter.PROJECTS, GlobalCounter.CALLS] + call_status_counter_names()
+    counts = GlobalCounter.get_values(names)
+    if estimated:
+        for name, model in ((GlobalCounter.PROJECTS, Project), (GlobalCounter.CALLS, Call)):
+            estimate = estimate_table_count(model)
+            if estimate is not None:
+                counts[name] = estimate
+    return counts
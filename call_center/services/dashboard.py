@@ -0,0 +1,261 @@
+from django.db.models import Count, Sum, Q
+from django.db.models.functions import Coalesce
+
+from ..models import Project, CustomUser, Call, ProjectMembership
+from .rollups import filter_rollups, get_rollup_totals, rollup_sum
+from .timeseries import get_time_series
+
+# کلید توزیع برای تماس‌هایی که نتیجه ثبت نشده دارند
+NO_RESULT = 'no_result'
+
+
+def _day_filter(prefix='', start_date=None, end_date=None):
+    """شرط بازه روز روی جدول خلاصه (برای Sum شرطی از طریق رابطه)"""
+    condition = Q()
+    if start_date:
+        condition &= Q(**{f'{prefix}day__gte': start_date})
+    if end_date:
+        condition &= Q(**{f'{prefix}day__lte': end_date})
+    return condition
+
+
+def _format_minutes(seconds):
+    """تبدیل ثانیه به دقیقه:ثانیه برای نمایش"""
+    return f"{int(seconds // 60)}:{int(seconds % 60):02d}"
+
+
+def _build_caller_row(row):
+    """ساخت ردیف عملکرد یک تماس‌گیرنده از خروجی گروه‌بندی جدول خلاصه"""
+    # ساخت نام کامل
+    full_name = f"{row['caller__first_name'] or ''} {row['caller__last_name'] or ''}".strip()
+    if not full_name:
+        full_name = row['caller__username']
+
+    total_calls = row['total_calls']
+    answered_calls = row['answered_calls']
+    successful_calls = row['successful_calls']
+
+    # نرخ پاسخ‌دهی، نرخ موفقیت و نرخ تبدیل
+    response_rate = (answered_calls * 100.0 / total_calls) if total_calls else 0.0
+    success_rate = (successful_calls * 100.0 / total_calls) if total_calls else 0.0
+    conversion_rate = (successful_calls * 100.0 / answered_calls) if answered_calls else 0.0
+
+    # میانگین مدت تماس (فقط برای تماس‌های پاسخ داده شده)
+    avg_call_duration_seconds = (
+        row['answered_duration'] / row['answered_with_duration']
+        if row['answered_with_duration'] else 0.0
+    )
+    total_duration_seconds = row['total_duration_seconds']
+
+    return {
+        'caller_id': row['caller__id'],
+        'name': full_name,
+        'username': row['caller__username'],
+        'phone_number': row['caller__phone_number'],
+        'total_calls': total_calls,
+        'answered_calls': answered_calls,
+        'successful_calls': successful_calls,
+        'response_rate': round(response_rate, 2),
+        'success_rate': round(success_rate, 2),
+        'conversion_rate': round(conversion_rate, 2),
+        'avg_call_duration_formatted': _format_minutes(avg_call_duration_seconds),
+        'avg_call_duration_seconds': round(avg_call_duration_seconds, 2),
+        'total_duration_formatted': _format_minutes(total_duration_seconds),
+        'total_duration_seconds': total_duration_seconds,
+        'project_count': row['project_count'],
+        # برای سازگاری با کد قبلی
+        'total_calls_all_projects': total_calls,
+        'total_successful_calls_all_projects': successful_calls,
+        'total_answered_calls_all_projects': answered_calls,
+        'total_duration_all_projects': total_duration_seconds,
+        'overall_response_rate': round(response_rate, 2),
+        'overall_success_rate': round(success_rate, 2),
+        'overall_conversion_rate': round(conversion_rate, 2),
+        'overall_avg_duration': round(avg_call_duration_seconds, 2),
+    }
+
+
+def get_dashboard_snapshot(project_id=None, allowed_project_ids=None, start_date=None, end_date=None,
+                           interval='day'):
+    """
+    تصویر کامل داشبورد با تعداد ثابت کوئری (پنج کوئری گروهی)، مستقل از تعداد پروژه‌ها.
+
+    فیلتر پروژه (project_id)، محدوده دسترسی (allowed_project_ids؛ None یعنی همه پروژه‌ها)
+    و بازه تاریخ روی همه بخش‌ها یکسان اعمال می‌شوند. interval بازه‌بندی روند تماس‌هاست.
+    """
+    projects = Project.objects.all()
+    if allowed_project_ids is not None:
+        projects = projects.filter(pk__in=allowed_project_ids)
+    if project_id:
+        projects = projects.filter(pk=project_id)
+
+    rollups = filter_rollups(start_date=start_date, end_date=end_date)
+    if allowed_project_ids is not None or project_id:
+        rollups = rollups.filter(project__in=projects.values('pk'))
+
+    # ۱. شمارنده‌های کل و توزیع نتیجه/وضعیت
+    totals = get_rollup_totals(rollups)
+
+    # ۲. آمار هر پروژه (پروژه‌های بدون تماس هم با صفر برگردانده می‌شوند)
+    day_filter = _day_filter('call_rollups__', start_date, end_date)
+    project_stats = [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'total_calls': row['total_calls'],
+            'successful_calls': row['successful_calls'],
+        }
+        for row in projects.order_by('-created_at').values('id', 'name').annotate(
+            total_calls=Coalesce(Sum('call_rollups__call_count', filter=day_filter), 0),
+            successful_calls=Coalesce(Sum(
+                'call_rollups__call_count',
+                filter=day_filter & Q(call_rollups__call_result='interested'),
+            ), 0),
+        )
+    ]
+
+    # ۳. تعداد تماس‌گیرندگان پروژه‌ها
+    total_callers = CustomUser.objects.filter(
+        projectmembership__role='caller',
+        projectmembership__project__in=projects.values('pk'),
+    ).distinct().count()
+
+    # ۴. عملکرد تماس‌گیرندگان
+    caller_rows = rollups.order_by().values(
+        'caller__id',
+        'caller__username',
+        'caller__first_name',
+        'caller__last_name',
+        'caller__phone_number',
+    ).annotate(
+        total_calls=rollup_sum(),
+        answered_calls=rollup_sum(Q(status='answered')),
+        successful_calls=rollup_sum(Q(call_result='interested')),
+        total_duration_seconds=Coalesce(Sum('total_duration'), 0),
+        answered_duration=Coalesce(Sum('total_duration', filter=Q(status='answered')), 0),
+        answered_with_duration=Coalesce(Sum('duration_count', filter=Q(status='answered')), 0),
+        project_count=Count('project', distinct=True),
+    ).order_by('-total_calls')
+
+    # ۵. روند تماس‌ها (بازه‌های خالی با صفر پر می‌شوند)
+    call_trends = get_time_series(
+        rollups, interval, start_date, end_date,
+        series={'calls': None, 'successful': Q(call_result='interested')},
+    )
+
+    total_calls = totals['total_calls']
+    interested_calls = totals['result_interested']
+    success_rate = (interested_calls / total_calls * 100) if total_calls else 0
+
+    return {
+        'total_projects': len(project_stats),
+        'total_calls': total_calls,
+        'total_callers': total_callers,
+        'success_rate': success_rate,
+        'projectStats': project_stats,
+        'callStatusDistribution': [
+            {'name': 'interested', 'count': totals['result_interested']},
+            {'name': 'not_interested', 'count': totals['result_not_interested']},
+            {'name': 'no_time', 'count': totals['result_no_time']},
+        ],
+        'callTrends': call_trends,
+        'callerPerformance': [_build_caller_row(row) for row in caller_rows],
+    }
+
+
+def _build_result_distribution(rows, total_calls):
+    """توزیع نتیجه تماس‌ها به صورت دیکشنری کلیدخورده با کد نتیجه"""
+    labels = dict(Call.CALL_RESULT_CHOICES)
+    distribution = {
+        code: {'name': label, 'count': 0, 'rate': 0}
+        for code, label in Call.CALL_RESULT_CHOICES
+    }
+    for row in rows:
+        # تماس‌های بدون نتیجه با کلید no_result
+        code = row['call_result'] or NO_RESULT
+        entry = distribution.setdefault(code, {'name': labels.get(code, code), 'count': 0, 'rate': 0})
+        entry['count'] += row['count']
+    for entry in distribution.values():
+        entry['rate'] = (entry['count'] / total_calls * 100) if total_calls else 0
+    return distribution
+
+
+def get_admin_dashboard_snapshot(start_date=None, end_date=None, interval='day'):
+    """
+    داده داشبورد مدیریت روی پروژه‌های فعال با سه کوئری گروهی
+    (آمار پروژه‌ها، آمار تماس‌گیرندگان و توزیع نتیجه) به علاوه روند تماس‌ها در بازه interval.
+    تماس موفق در این داشبورد تماس با وضعیت answered است.
+    """
+    rollups = filter_rollups(start_date=start_date, end_date=end_date)
+    successful = Q(status='answered')
+
+    # ۱. آمار پروژه‌های فعال؛ گروه‌بندی روی id است تا پروژه‌های هم‌نام ادغام نشوند
+    # (order_by فقط ترتیب نمایش است)
+    day_filter = _day_filter('call_rollups__', start_date, end_date)
+    project_stats = list(
+        Project.objects.filter(status='active').values('id', 'name').annotate(
+            total_calls=Coalesce(Sum('call_rollups__call_count', filter=day_filter), 0),
+            successful_calls=Coalesce(Sum(
+                'call_rollups__call_count', filter=day_filter & Q(call_rollups__status='answered')
+            ), 0),
+        ).order_by('-created_at')
+    )
+
+    # ۲. آمار تماس‌گیرندگان (همه کاربرانی که در پروژه‌ای نقش caller دارند)
+    caller_ids = ProjectMembership.objects.filter(role='caller').values('user')
+    caller_rows = CustomUser.objects.filter(pk__in=caller_ids).values(
+        'username', 'first_name', 'last_name'
+    ).annotate(
+        total_calls=Coalesce(Sum('call_rollups__call_count', filter=day_filter), 0),
+        successful_calls=Coalesce(Sum(
+            'call_rollups__call_count', filter=day_filter & Q(call_rollups__status='answered')
+        ), 0),
+        total_duration=Coalesce(Sum('call_rollups__total_duration', filter=day_filter), 0),
+        calls_with_duration=Coalesce(Sum('call_rollups__duration_count', filter=day_filter), 0),
+    )
+    caller_performance = []
+    for row in caller_rows:
+        total_calls = row['total_calls']
+        calls_with_duration = row['calls_with_duration']
+        avg_duration = (row['total_duration'] / calls_with_duration) if calls_with_duration else 0
+        caller_performance.append({
+            'name': f"{row['first_name']} {row['last_name']}".strip() or row['username'],
+            'total_calls': total_calls,
+            'successful_calls': row['successful_calls'],
+            'success_rate': round(row['successful_calls'] / total_calls * 100, 1) if total_calls else 0,
+            # دقیقه
+            'avg_duration': round(avg_duration / 60, 1) if avg_duration else 0,
+        })
+
+    # ۳. توزیع نتیجه و شمارنده‌های کل
+    result_rows = list(
+        rollups.order_by().values('call_result').annotate(
+            count=rollup_sum(),
+            successful=rollup_sum(successful),
+        )
+    )
+    total_calls = sum(row['count'] for row in result_rows)
+    successful_calls = sum(row['successful'] for row in result_rows)
+    distribution = _build_result_distribution(result_rows, total_calls)
+
+    # ۴. روند تماس‌ها (بازه‌های خالی با صفر پر می‌شوند)
+    call_trends = get_time_series(
+        rollups, interval, start_date, end_date,
+        series={'calls': None, 'successful': successful},
+    )
+
+    return {
+        'total_projects': len(project_stats),
+        'total_calls': total_calls,
+        'total_callers': len(caller_performance),
+        'success_rate': round(successful_calls / total_calls * 100, 1) if total_calls else 0,
+        'projectStats': project_stats,
+        'projectLength': len(project_stats),
+        'callStatusDistribution': distribution,
+        'callTrends': call_trends,
+        'callerPerformance': caller_performance,
+        # کلیدهای قبلی برای سازگاری با کلاینت
+        'no_time_rate': distribution['no_time']['rate'],
+        'not_intrested_rate': distribution['not_interested']['rate'],
+        'intersted_rate': distribution['interested']['rate'],
+    }
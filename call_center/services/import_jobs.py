@@ -0,0 +1,362 @@
+"""
+اجرای import فایل‌های آپلود شده (مخاطبین و تماس‌گیرندگان) در پس‌زمینه.
+
+درخواست آپلود فقط فایل را روی storage ذخیره، یک UploadedFile با وضعیت pending
+می‌سازد و run_import_job_task را در صف Celery می‌گذارد. job وضعیت، تعداد ردیف‌های
+پردازش شده/ناموفق و زمان شروع و پایان را روی همان UploadedFile ثبت می‌کند تا
+کلاینت با endpoint پیشرفت (uploaded-files/<id>/progress) آن را دنبال کند.
+"""
+import logging
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import ProjectMembership, UploadedFile
+from .caller_imports import CallerImport
+from .contact_imports import RESULT_SAMPLE_SIZE, ContactUpsert
+from .spreadsheets import SpreadsheetError, read_spreadsheet
+
+logger = logging.getLogger(__name__)
+
+# هر چند ردیف (اندازه هر دسته خوانده شده از فایل) یک بار پیشرفت در دیتابیس ثبت شود
+PROGRESS_EVERY = 1000
+
+
+class ImportJobError(Exception):
+    """خطای قابل نمایش به کاربر (مثلا ستون ضروری موجود نیست)؛ details در result ذخیره می‌شود"""
+
+    def __init__(self, message, details=None):
+        super().__init__(message)
+        self.details = details
+
+
+def enqueue_import(file, file_type, project, user):
+    """
+    ذخیره فایل و گذاشتن job آن در صف؛ job بعد از commit تراکنش فعلی ارسال می‌شود
+    تا worker حتما ردیف UploadedFile را ببیند.
+    """
+    from ..tasks import run_import_job_task
+
+    uploaded_file = UploadedFile(
+        file_name=file.name,
+        file_type=file_type,
+        project=project,
+        uploaded_by=user,
+        status=UploadedFile.STATUS_PENDING,
+    )
+    uploaded_file.file.save(file.name, file, save=False)
+    uploaded_file.file_path = uploaded_file.file.name
+    uploaded_file.save()
+
+    transaction.on_commit(lambda: run_import_job_task.delay(uploaded_file.pk))
+    return uploaded_file
+
+
+def _report_progress(uploaded_file, processed, failed):
+    uploaded_file.processed_rows = processed
+    uploaded_file.failed_rows = failed
+    uploaded_file.last_progress_at = timezone.now()
+    UploadedFile.objects.filter(pk=uploaded_file.pk).update(
+        processed_rows=processed, failed_rows=failed, last_progress_at=uploaded_file.last_progress_at,
+    )
+
+
+def _set_records_count(uploaded_file, count):
+    uploaded_file.records_count = count
+    uploaded_file.last_progress_at = timezone.now()
+    UploadedFile.objects.filter(pk=uploaded_file.pk).update(
+        records_count=count, last_progress_at=uploaded_file.last_progress_at,
+    )
+
+
+def _iter_chunks(reader, uploaded_file, importer=None):
+    """
+    دسته‌های [(شماره ردیف، داده)] فایل؛ بعد از پردازش هر دسته پیشرفت (با failed_count
+    importer، اگر داده شده) و در پایان تعداد ردیف‌ها ثبت می‌شود
+    """
+    processed = 0
+    for chunk in reader.chunks():
+        yield chunk
+        processed += len(chunk)
+        _report_progress(uploaded_file, processed, importer.failed_count if importer else 0)
+    _set_records_count(uploaded_file, processed)
+
+
+@contextmanager
+def _open_spreadsheet(uploaded_file):
+    """خواننده جریانی فایل ذخیره شده؛ تعداد تخمینی ردیف‌ها برای گزارش پیشرفت ثبت می‌شود"""
+    with uploaded_file.file.open('rb') as file:
+        try:
+            reader = read_spreadsheet(file, name=uploaded_file.file_name, chunk_size=PROGRESS_EVERY)
+        except SpreadsheetError as e:
+            raise ImportJobError(f"خطا در خواندن فایل اکسل: {str(e)}")
+        with reader:
+            if reader.total_rows is not None:
+                _set_records_count(uploaded_file, reader.total_rows)
+            try:
+                yield reader
+            except SpreadsheetError as e:
+                # خطای قالب در میانه فایل (مثلا CSV با encoding غیر UTF-8)
+                raise ImportJobError(f"خطا در خواندن فایل: {str(e)}")
+
+
+def _check_contacts_columns(columns):
+    """بررسی وجود ستون‌های ضروری فایل مخاطبین"""
+    required_columns = ['phone']
+    optional_columns = ['full_name', 'email', 'address', 'custom_fields']
+
+    missing_columns = [col for col in required_columns if col not in columns]
+    if missing_columns:
+        raise ImportJobError(f"ستون‌های ضروری موجود نیستند: {', '.join(missing_columns)}", {
+            "required_columns": required_columns,
+            "optional_columns": optional_columns,
+            "available_columns": [column for column in columns if column]
+        })
+
+
+def _check_callers_columns(columns):
+    """بررسی وجود ستون‌های ضروری فایل تماس‌گیرندگان"""
+    required_columns = ['phone_number', 'first_name', 'last_name']
+    if any(column not in columns for column in required_columns):
+        raise ImportJobError("ستون های  ';last_name','first_name',' phone_number'  الزامی است", {
+            "required_columns": required_columns,
+            "available_columns": [column for column in columns if column]
+        })
+
+
+def _project_callers(project):
+    return ProjectMembership.objects.filter(project=project, role='caller')
+
+
+NO_CALLERS_ERROR = "در این پروژه هیچ تماس‌گیرنده‌ای وجود ندارد"
+
+
+def validate_upload(file, file_type, project):
+    """
+    بررسی‌های ارزان قبل از گذاشتن job در صف تا خطای آشکار (نبودن تماس‌گیرنده در پروژه
+    یا ستون ضروری) همان لحظه با 400 برگردد، نه بعد از ذخیره فایل و اجرای job.
+    فقط سرستون خوانده می‌شود؛ فایل xls قدیمی خواندن جریانی ندارد و در خود job بررسی می‌شود.
+    """
+    if file_type == 'contacts' and not _project_callers(project).exists():
+        raise ImportJobError(NO_CALLERS_ERROR)
+
+    check = COLUMN_CHECKS.get(file_type)
+    if check is None or file.name.lower().endswith('.xls'):
+        return
+    try:
+        with read_spreadsheet(file, name=file.name) as reader:
+            check(reader.columns)
+    except SpreadsheetError as e:
+        raise ImportJobError(f"خطا در خواندن فایل اکسل: {str(e)}")
+    finally:
+        file.seek(0)
+
+
+def import_contacts_file(uploaded_file):
+    """
+    مخاطبین فایل (ستون‌های CONTACT_IMPORT_COLUMNS) با تخصیص تصادفی تماس‌گیرندگان پروژه
+    """
+    project = uploaded_file.project
+
+    with _open_spreadsheet(uploaded_file) as reader:
+        _check_contacts_columns(reader.columns)
+
+        # دریافت لیست تماس‌گیرندگان فعال پروژه (ممکن است بعد از آپلود حذف شده باشند)
+        project_callers = [
+            (membership.user_id, membership.user.get_full_name())
+            for membership in _project_callers(project).select_related('user')
+        ]
+        if not project_callers:
+            raise ImportJobError(NO_CALLERS_ERROR)
+
+        # هر دسته همان لحظه با bulk_create / upsert دسته‌ای نوشته می‌شود؛ اگر خواندن فایل
+        # وسط کار خطا بدهد، دسته‌های قبلی ثبت شده‌اند و آپلود دوباره همان‌ها را به‌روزرسانی می‌کند
+        upsert = ContactUpsert(project, project_callers, created_by=uploaded_file.uploaded_by)
+        try:
+            for chunk in _iter_chunks(reader, uploaded_file, upsert):
+                upsert.add_rows(chunk)
+        finally:
+            upsert.finish()
+
+    # شمارنده‌ها کامل و لیست‌ها فقط نمونه‌ای از ردیف‌ها (RESULT_SAMPLE_SIZE) هستند
+    result = {
+        'total_records': uploaded_file.records_count,
+        'successful_count': upsert.created_count,
+        'updated_count': upsert.updated_count,
+        'failed_count': upsert.failed_count,
+        'project_id': project.id,
+        'project_name': project.name,
+        'callers_count': len(project_callers)
+    }
+    if upsert.created:
+        result['successful_contacts'] = upsert.created
+    if upsert.updated:
+        result['updated_contacts'] = upsert.updated
+    if upsert.failed:
+        result['failed_contacts'] = upsert.failed
+    return result
+
+
+def import_callers_file(uploaded_file):
+    """
+    کاربران فایل (بر اساس شماره تلفن) به عنوان تماس‌گیرنده پروژه اضافه می‌شوند؛
+    کاربری که وجود ندارد ساخته می‌شود.
+    """
+    project = uploaded_file.project
+
+    with _open_spreadsheet(uploaded_file) as reader:
+        _check_callers_columns(reader.columns)
+
+        # کاربران و عضویت‌ها بعد از خواندن کل فایل دسته‌ای نوشته می‌شوند
+        callers = CallerImport(project)
+        for chunk in _iter_chunks(reader, uploaded_file, callers):
+            callers.add_rows(chunk)
+
+    callers.save()
+    # مانند import مخاطبین، نتیجه ذخیره شده فقط نمونه‌ای از ردیف‌ها را نگه می‌دارد
+    successful_callers = callers.successful
+    updated_callers = callers.updated
+    failed_callers = callers.failed
+
+    result = {
+        'total_records': uploaded_file.records_count,
+        'successful_count': len(successful_callers),
+        'updated_count': len(updated_callers),
+        'failed_count': len(failed_callers),
+        'project_id': project.id,
+        'project_name': project.name
+    }
+    if successful_callers:
+        result['successful_callers'] = successful_callers[:RESULT_SAMPLE_SIZE]
+    if updated_callers:
+        result['updated_callers'] = updated_callers[:RESULT_SAMPLE_SIZE]
+    if failed_callers:
+        result['failed_callers'] = failed_callers[:RESULT_SAMPLE_SIZE]
+    return result
+
+
+def import_assigned_contacts_file(uploaded_file):
+    """مخاطبین با تماس‌گیرنده مشخص (import_contacts_from_excel، ContactImportView)"""
+    from ..excel_imports import check_contact_columns, import_contact_rows
+
+    project = uploaded_file.project
+    created_count = 0
+    created_contacts = []
+    with _open_spreadsheet(uploaded_file) as reader:
+        try:
+            check_contact_columns(reader.columns)
+        except ValueError as e:
+            raise ImportJobError(f"خطا در پردازش فایل: {str(e)}")
+
+        # مانند import مخاطبین، هر دسته جدا نوشته و پیشرفت آن ثبت می‌شود؛
+        # نتیجه فقط نمونه‌ای از شماره‌ها را نگه می‌دارد
+        for chunk in _iter_chunks(reader, uploaded_file):
+            phones = import_contact_rows(chunk, project)
+            created_count += len(phones)
+            created_contacts.extend(phones[:RESULT_SAMPLE_SIZE - len(created_contacts)])
+
+    return {
+        'created_count': created_count,
+        "contacts": created_contacts,
+        "project": project.name,
+        'successful_count': created_count,
+        'failed_count': 0,
+    }
+
+
+# نوع فایل → تابع import
+IMPORTERS = {
+    'contacts': import_contacts_file,
+    'callers': import_callers_file,
+    'assigned_contacts': import_assigned_contacts_file,
+}
+
+# نوع فایل → بررسی سرستون‌ها (assigned_contacts قالب خودش را در excel_imports بررسی می‌کند)
+COLUMN_CHECKS = {
+    'contacts': _check_contacts_columns,
+    'callers': _check_callers_columns,
+}
+
+# jobی که این مدت در وضعیت processing پیشرفتی گزارش نکرده (worker از کار افتاده) ناموفق ثبت می‌شود
+STALE_AFTER = timedelta(hours=1)
+
+
+def run_import_job(uploaded_file_id):
+    """
+    اجرای job یک فایل آپلود شده. فقط فایل pending اجرا می‌شود تا تحویل دوباره پیام
+    در صف، فایل را دو بار import نکند.
+    """
+    now = timezone.now()
+    claimed = UploadedFile.objects.filter(
+        pk=uploaded_file_id, status=UploadedFile.STATUS_PENDING
+    ).update(status=UploadedFile.STATUS_PROCESSING, started_at=now, last_progress_at=now)
+    if not claimed:
+        return None
+
+    uploaded_file = UploadedFile.objects.select_related('project', 'uploaded_by').get(pk=uploaded_file_id)
+    try:
+        result = IMPORTERS[uploaded_file.file_type](uploaded_file)
+    except ImportJobError as e:
+        uploaded_file.status = UploadedFile.STATUS_FAILED
+        uploaded_file.error_message = str(e)
+        uploaded_file.result = e.details
+    except Exception as e:
+        logger.error(f"خطا در پردازش فایل آپلود شده {uploaded_file_id}: {str(e)}", exc_info=True)
+        uploaded_file.status = UploadedFile.STATUS_FAILED
+        uploaded_file.error_message = f"خطای داخلی سرور: {str(e)}"
+    else:
+        uploaded_file.status = UploadedFile.STATUS_COMPLETED
+        uploaded_file.result = result
+        uploaded_file.failed_rows = result.get('failed_count', 0)
+        uploaded_file.processed_rows = uploaded_file.records_count
+
+    uploaded_file.finished_at = timezone.now()
+    # اگر fail_stale_import_jobs در این فاصله job را ناموفق ثبت کرده، وضعیت آن بازنویسی نمی‌شود
+    finished = UploadedFile.objects.filter(
+        pk=uploaded_file.pk, status=UploadedFile.STATUS_PROCESSING
+    ).update(**{
+        field: getattr(uploaded_file, field) for field in (
+            'status', 'error_message', 'result', 'records_count', 'processed_rows', 'failed_rows', 'finished_at',
+        )
+    })
+    if not finished:
+        logger.warning(f"job فایل آپلود شده {uploaded_file_id} پیش از پایان متوقف شده ثبت شده بود")
+        return UploadedFile.STATUS_FAILED
+    _delete_stored_file(uploaded_file)
+    return uploaded_file.status
+
+
+def _delete_stored_file(uploaded_file):
+    """حذف فایل از storage؛ فایل فقط تا پایان job لازم است"""
+    try:
+        uploaded_file.file.delete(save=False)
+    except OSError as e:
+        logger.warning(f"حذف فایل آپلود شده {uploaded_file.pk} ناموفق بود: {str(e)}")
+        return
+    UploadedFile.objects.filter(pk=uploaded_file.pk).update(file='')
+
+
+def fail_stale_import_jobs(stale_after=STALE_AFTER):
+    """
+    jobهایی که بیش از stale_after در وضعیت processing پیشرفتی گزارش نکرده‌اند (worker
+    وسط کار متوقف شده) ناموفق ثبت و فایلشان حذف می‌شود؛ کاربر می‌تواند فایل را دوباره
+    آپلود کند. job طولانی که هنوز دسته‌های فایل را پردازش می‌کند بسته نمی‌شود.
+    تعداد jobهای بسته شده را برمی‌گرداند.
+    """
+    stale = UploadedFile.objects.filter(
+        status=UploadedFile.STATUS_PROCESSING, last_progress_at__lt=timezone.now() - stale_after
+    )
+    count = 0
+    for uploaded_file in stale.only('pk', 'file'):
+        # شرط وضعیت دوباره بررسی می‌شود تا jobی که همین حالا تمام شده بازنویسی نشود
+        if not stale.filter(pk=uploaded_file.pk).update(
+            status=UploadedFile.STATUS_FAILED,
+            error_message="پردازش فایل متوقف شد؛ لطفا فایل را دوباره آپلود کنید",
+            finished_at=timezone.now(),
+        ):
+            continue
+        _delete_stored_file(uploaded_file)
+        count += 1
+    return count
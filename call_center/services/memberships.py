@@ -0,0 +1,48 @@
+from ..models import ProjectMembership
+
+# اولویت نقش‌ها وقتی کاربر در یک پروژه چند عضویت دارد
+ROLE_PRIORITY = ('admin', 'caller', 'contact')
+
+# نام ویژگی که نقشه عضویت‌ها روی درخواست نگه داشته می‌شود
+_REQUEST_ATTR = '_project_roles'
+
+
+def load_project_roles(user):
+    """همه نقش‌های کاربر در پروژه‌ها به صورت {project_id: set(roles)} با یک کوئری"""
+    roles = {}
+    if user is None or not user.is_authenticated:
+        return roles
+    for project_id, role in ProjectMembership.objects.filter(user=user).values_list('project_id', 'role'):
+        roles.setdefault(project_id, set()).add(role)
+    return roles
+
+
+def get_project_roles(request):
+    """
+    نقشه عضویت کاربر درخواست؛ فقط بار اول کوئری می‌زند و روی خود request
+    نگه داشته می‌شود تا سریالایزرها و کلاس‌های دسترسی از آن استفاده کنند.
+    """
+    roles = getattr(request, _REQUEST_ATTR, None)
+    if roles is None:
+        roles = load_project_roles(getattr(request, 'user', None))
+        setattr(request, _REQUEST_ATTR, roles)
+    return roles
+
+
+def get_project_role(request, project_id):
+    """مهم‌ترین نقش کاربر در پروژه یا None اگر عضو نیست"""
+    roles = get_project_roles(request).get(project_id)
+    if not roles:
+        return None
+    for role in ROLE_PRIORITY:
+        if role in roles:
+            return role
+    return next(iter(roles))
+
+
+def has_project_role(request, project_id, roles=None):
+    """آیا کاربر در پروژه یکی از نقش‌های roles را دارد (بدون roles: هر نوع عضویت)"""
+    project_roles = get_project_roles(request).get(project_id)
+    if not project_roles:
+        return False
+    return roles is None or bool(project_roles.intersection(roles))
@@ -0,0 +1,327 @@
+"""
+مسیر خواندن values() برای لیست‌های پرحجم (مخاطبین و تماس‌ها).
+
+به جای ساختن مدل و اجرای کامل سریالایزر برای هر ردیف، ستون‌های لازم با یک
+values() خوانده می‌شوند و فیلدهای محاسباتی با چند کوئری دسته‌ای برای کل صفحه
+ساخته می‌شوند. شکل خروجی دقیقا همان خروجی ContactSerializer / CallSerializer است
+و فیلدهای سریالایزر (بعد از ?fields= / ?expand=) تعیین می‌کنند چه چیزی خوانده شود.
+"""
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from rest_framework import serializers
+
+from ..models import Call, CallAnswer
+from ..utils import format_jalali_dates
+from .contacts import RECENT_CALL_NOTES_LIMIT
+from .memberships import get_project_role
+
+# مقادیر ?read_path=
+READ_PATHS = ('serializer', 'values')
+
+# فیلدهایی که خروجی‌شان همان مقدار خام دیتابیس است
+_IDENTITY_FIELDS = (
+    serializers.CharField, serializers.EmailField, serializers.BooleanField, serializers.IntegerField,
+)
+
+
+def _converter(field):
+    """تابع تبدیل مقدار خام به خروجی فیلد (None یعنی خود مقدار)"""
+    # رابطه‌ها در values() همان شناسه هستند و ستون فیلدهای متدی از قبل annotate شده است
+    if type(field) in _IDENTITY_FIELDS or isinstance(
+        field, (serializers.RelatedField, serializers.SerializerMethodField)
+    ):
+        return None
+    return field.to_representation
+
+
+def _full_name(first_name, last_name):
+    # مثل AbstractUser.get_full_name
+    return f"{first_name} {last_name}".strip()
+
+
+class ValuesProjection:
+    """
+    پایه مسیر values(). زیرکلاس‌ها مشخص می‌کنند هر فیلد خروجی از کدام ستون خوانده
+    شود (COLUMNS) یا با کدام متد get_<نام> و کدام ستون‌ها (COMPUTED) ساخته شود.
+    """
+    # نام فیلد خروجی → lookup ستون در values()
+    COLUMNS = {}
+    # نام فیلد محاسباتی → ستون‌هایی که متد get_<نام> لازم دارد
+    COMPUTED = {}
+
+    def __init__(self, serializer, request=None):
+        self.fields = {
+            name: field for name, field in serializer.fields.items() if not field.write_only
+        }
+        self.request = request
+
+    @property
+    def supported(self):
+        """آیا همه فیلدهای خواسته شده در این مسیر پشتیبانی می‌شوند"""
+        return all(name in self.COLUMNS or name in self.COMPUTED for name in self.fields)
+
+    def get_lookups(self):
+        lookups = {'pk'}
+        for name in self.fields:
+            if name in self.COLUMNS:
+                lookups.add(self.COLUMNS[name])
+            else:
+                lookups.update(self.COMPUTED[name])
+        return sorted(lookups)
+
+    def values(self, queryset):
+        """کوئری‌ست values() با همه ستون‌های لازم (قابل صفحه‌بندی)"""
+        return queryset.prefetch_related(None).values(*self.get_lookups())
+
+    def prepare(self, records):
+        """داده‌های دسته‌ای کل صفحه (زیرکلاس‌ها بازنویسی می‌کنند)"""
+        return {}
+
+    def rows(self, records):
+        records = list(records)
+        batch = self.prepare(records)
+        plan = []
+        for name, field in self.fields.items():
+            if name in self.COLUMNS:
+                plan.append((name, self.COLUMNS[name], _converter(field), None))
+            else:
+                plan.append((name, None, None, getattr(self, f'get_{name}')))
+
+        result = []
+        for record in records:
+            row = {}
+            for name, column, convert, compute in plan:
+                if compute is not None:
+                    row[name] = compute(record, batch)
+                    continue
+                value = record[column]
+                row[name] = value if value is None or convert is None else convert(value)
+            result.append(row)
+        return result
+
+
+class ContactProjection(ValuesProjection):
+    """مسیر values() برای ContactSerializer"""
+    COLUMNS = {
+        'id': 'id',
+        'full_name': 'full_name',
+        'phone': 'phone',
+        'email': 'email',
+        'address': 'address',
+        'call_status': 'call_status',
+        'custom_fields': 'custom_fields',
+        'is_active': 'is_active',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+        'created_by': 'created_by_id',
+        'is_special': 'is_special',
+        'gender': 'gender',
+        'birth_date': 'birth_date',
+        # شمارنده‌های annotate_phone_call_counters
+        'contact_calls_count': 'phone_calls_count',
+        'contacts_calls_answered_count': 'phone_calls_answered_count',
+        'contact_calls_not_answered_count': 'phone_calls_not_answered_count',
+    }
+    COMPUTED = {
+        'assigned_caller': (
+            'assigned_caller_id', 'assigned_caller__first_name',
+            'assigned_caller__last_name', 'assigned_caller__username',
+        ),
+        'assigned_caller_phone': ('assigned_caller_id', 'assigned_caller__phone_number'),
+        'can_call': ('project_id', 'assigned_caller_id'),
+        'call_statistics': (),
+        'call_notes': (),
+        'contacts_calls_rate': ('phone_calls_count', 'phone_calls_answered_count'),
+        'persian_created_by': ('created_at',),
+        'persian_updated_at': ('updated_at',),
+    }
+
+    def prepare(self, records):
+        batch = {}
+        contact_ids = [record['pk'] for record in records]
+        if 'persian_created_by' in self.fields:
+            batch['persian_created_by'] = format_jalali_dates([record['created_at'] for record in records])
+        if 'persian_updated_at' in self.fields:
+            batch['persian_updated_at'] = format_jalali_dates([record['updated_at'] for record in records])
+        if 'persian_created_by' in batch or 'persian_updated_at' in batch:
+            batch['index'] = {record['pk']: index for index, record in enumerate(records)}
+        if 'call_statistics' in self.fields:
+            batch['call_statistics'] = self._call_statistics(contact_ids)
+        if 'call_notes' in self.fields:
+            batch['call_notes'] = self._call_notes(contact_ids)
+        return batch
+
+    @staticmethod
+    def _call_statistics(contact_ids):
+        """شمارنده‌های ContactSerializer.call_statistics برای همه مخاطبین صفحه با یک GROUP BY"""
+        rows = Call.objects.filter(contact_id__in=contact_ids).order_by().values('contact_id').annotate(
+            total_calls=Count('pk'),
+            answered_calls=Count('pk', filter=Q(call_result='answered')),
+            unanswered_calls=Count('pk', filter=Q(call_result='no_answer')),
+            unreachable_calls=Count('pk', filter=Q(call_result__in=['unreachable', 'wrong_number'])),
+        )
+        return {row.pop('contact_id'): row for row in rows}
+
+    @staticmethod
+    def _call_notes(contact_ids):
+        """یادداشت‌های اخیر هر مخاطب (مثل recent_call_notes_prefetch) با ROW_NUMBER روی values()"""
+        result_labels = dict(Call.CALL_RESULT_CHOICES)
+        calls = list(
+            Call.objects.filter(contact_id__in=contact_ids).exclude(notes='').annotate(
+                row_number=Window(
+                    RowNumber(), partition_by=F('contact_id'),
+                    order_by=[F('call_date').desc(), F('pk').desc()],
+                )
+            ).filter(row_number__lte=RECENT_CALL_NOTES_LIMIT).order_by(
+                'contact_id', 'row_number'
+            ).values(
+                'pk', 'contact_id', 'notes', 'call_date', 'call_result',
+                'caller_id', 'caller__first_name', 'caller__last_name',
+            )
+        )
+        answers = {}
+        for answer in CallAnswer.objects.filter(call_id__in=[call['pk'] for call in calls]).order_by('pk').values(
+            'call_id', 'question__text', 'selected_choice_id', 'selected_choice__text'
+        ):
+            answers.setdefault(answer['call_id'], []).append({
+                'question_text': answer['question__text'],
+                'selected_choice_text': answer['selected_choice__text'] if answer['selected_choice_id'] else None,
+            })
+
+        dates = format_jalali_dates([call['call_date'] for call in calls])
+        notes = {}
+        for call, created_at in zip(calls, dates):
+            notes.setdefault(call['contact_id'], []).append({
+                'caller_name': (
+                    _full_name(call['caller__first_name'], call['caller__last_name'])
+                    if call['caller_id'] else 'ناشناس'
+                ),
+                'note': call['notes'],
+                'created_at': created_at,
+                'call_result': result_labels.get(call['call_result'], call['call_result']),
+                'answers': answers.get(call['pk'], []),
+            })
+        return notes
+
+    def get_assigned_caller(self, record, batch):
+        if not record['assigned_caller_id']:
+            return None
+        return (
+            _full_name(record['assigned_caller__first_name'], record['assigned_caller__last_name'])
+            or record['assigned_caller__username']
+        )
+
+    def get_assigned_caller_phone(self, record, batch):
+        if not record['assigned_caller_id']:
+            return None
+        return record['assigned_caller__phone_number']
+
+    def get_can_call(self, record, batch):
+        request = self.request
+        if not request or not request.user.is_authenticated:
+            return False
+        user = request.user
+        if user.is_superuser:
+            return True
+        role = get_project_role(request, record['project_id'])
+        if role == 'admin':
+            return not record['assigned_caller_id'] or record['assigned_caller_id'] == user.pk
+        if role == 'caller':
+            return record['assigned_caller_id'] == user.pk
+        return False
+
+    def get_call_statistics(self, record, batch):
+        return batch['call_statistics'].get(record['pk']) or {
+            'total_calls': 0,
+            'answered_calls': 0,
+            'unanswered_calls': 0,
+            'unreachable_calls': 0,
+        }
+
+    def get_call_notes(self, record, batch):
+        return batch['call_notes'].get(record['pk'], [])
+
+    def get_contacts_calls_rate(self, record, batch):
+        total_calls = record['phone_calls_count']
+        if total_calls == 0:
+            return 0.0
+        return int((record['phone_calls_answered_count'] / total_calls) * 100)
+
+    def get_persian_created_by(self, record, batch):
+        return batch['persian_created_by'][batch['index'][record['pk']]]
+
+    def get_persian_updated_at(self, record, batch):
+        return batch['persian_updated_at'][batch['index'][record['pk']]]
+
+
+class CallProjection(ValuesProjection):
+    """مسیر values() برای نمایش تخت CallSerializer (فیلدهای expand شده پشتیبانی نمی‌شوند)"""
+    COLUMNS = {
+        'id': 'id',
+        'contact_id': 'contact_id',
+        'contact_name': 'contact__full_name',
+        'contact_phone': 'contact__phone',
+        'caller_id': 'caller_id',
+        'project_id': 'project_id',
+        'project_name': 'project__name',
+        'call_date': 'call_date',
+        'call_result': 'call_result',
+        'status': 'status',
+        'notes': 'notes',
+        'feedback': 'feedback',
+        'detailed_report': 'detailed_report',
+        'duration': 'duration',
+        'follow_up_required': 'follow_up_required',
+        'follow_up_date': 'follow_up_date',
+        'is_editable': 'is_editable',
+        'edited_at': 'edited_at',
+        'edited_by_id': 'edited_by_id',
+        'edit_reason': 'edit_reason',
+        'original_data': 'original_data',
+    }
+    COMPUTED = {
+        'caller_name': ('caller_id', 'caller__first_name', 'caller__last_name', 'caller__username'),
+        'answers': (),
+        'persian_call_date': ('call_date',),
+    }
+
+    def prepare(self, records):
+        batch = {}
+        if 'persian_call_date' in self.fields:
+            dates = format_jalali_dates([record['call_date'] for record in records])
+            batch['persian_call_date'] = {record['pk']: value for record, value in zip(records, dates)}
+        if 'answers' in self.fields:
+            batch['answers'] = self._answers([record['pk'] for record in records])
+        return batch
+
+    @staticmethod
+    def _answers(call_ids):
+        """پاسخ‌های تماس‌های صفحه به شکل CallAnswerSerializer با یک کوئری"""
+        answers = {}
+        for answer in CallAnswer.objects.filter(call_id__in=call_ids).order_by('pk').values(
+            'call_id', 'question_id', 'question__text', 'selected_choice_id', 'selected_choice__text'
+        ):
+            row = {
+                'question': answer['question_id'],
+                'selected_choice': answer['selected_choice_id'],
+                'question_text': answer['question__text'],
+            }
+            # DRF فیلد selected_choice_text را برای پاسخ بدون گزینه حذف می‌کند
+            if answer['selected_choice_id'] is not None:
+                row['selected_choice_text'] = answer['selected_choice__text']
+            answers.setdefault(answer['call_id'], []).append(row)
+        return answers
+
+    def get_caller_name(self, record, batch):
+        if record['caller_id'] is None:
+            return None
+        return (
+            _full_name(record['caller__first_name'], record['caller__last_name'])
+            or record['caller__username']
+        )
+
+    def get_answers(self, record, batch):
+        return batch['answers'].get(record['pk'], [])
+
+    def get_persian_call_date(self, record, batch):
+        return batch['persian_call_date'][record['pk']]
@@ -0,0 +1,121 @@
+from zoneinfo import ZoneInfo
+
+from django.db import transaction
+from django.db.models import Count, Sum, Q, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from ..models import Call, CallDailyRollup
+
+# روزهای جدول خلاصه بر اساس ساعت تهران بسته می‌شوند
+ROLLUP_TIME_ZONE = ZoneInfo('Asia/Tehran')
+
+
+def rollup_day(value):
+    """روز (به وقت تهران) که یک تماس در آن شمرده می‌شود"""
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return timezone.localtime(value, ROLLUP_TIME_ZONE).date()
+
+
+def filter_rollups(rollups=None, project_ids=None, start_date=None, end_date=None):
+    """
+    فیلتر جدول خلاصه بر اساس پروژه و بازه روز (هر دو سر بازه شامل می‌شوند).
+    """
+    if rollups is None:
+        rollups = CallDailyRollup.objects.all()
+    if project_ids is not None:
+        rollups = rollups.filter(project_id__in=project_ids)
+    if start_date:
+        rollups = rollups.filter(day__gte=start_date)
+    if end_date:
+        rollups = rollups.filter(day__lte=end_date)
+    return rollups
+
+
+def rollup_sum(filter=None):
+    """جمع تعداد تماس‌ها روی ردیف‌های خلاصه (در صورت نیاز با فیلتر شرطی)"""
+    return Coalesce(Sum('call_count', filter=filter), 0)
+
+
+def rollup_totals_annotations():
+    """شمارنده‌های کل، توزیع نتیجه/وضعیت و مدت تماس روی جدول خلاصه"""
+    annotations = {
+        'total_calls': rollup_sum(),
+        'total_duration': Coalesce(Sum('total_duration'), 0),
+        'calls_with_duration': Coalesce(Sum('duration_count'), 0),
+    }
+    for choice, _ in Call.CALL_RESULT_CHOICES:
+        annotations[f'result_{choice}'] = rollup_sum(Q(call_result=choice))
+    for choice, _ in Call.CALL_STATUS_CHOICES:
+        annotations[f'status_{choice}'] = rollup_sum(Q(status=choice))
+    return annotations
+
+
+def get_rollup_totals(rollups):
+    """جمع کل یک کوئری‌ست خلاصه در یک کوئری"""
+    return rollups.aggregate(**rollup_totals_annotations())
+
+
+def _grouped_calls(calls):
+    """ردیف‌های خلاصه تماس‌ها (کلید جدول خلاصه و جمع‌ها) با یک کوئری GROUP BY"""
+    return calls.order_by().annotate(
+        day=TruncDate('call_date', tzinfo=ROLLUP_TIME_ZONE),
+        result=Coalesce('call_result', Value('')),
+    ).values('project', 'caller', 'day', 'status', 'result').annotate(
+        count=Count('pk'),
+        duration_sum=Coalesce(Sum('duration'), 0),
+        with_duration=Count('duration'),
+    )
+
+
+def subtract_calls_from_rollups(calls):
+    """
+    کم کردن دسته‌ای تماس‌هایی که قرار است حذف شوند از جدول خلاصه
+    (یک GROUP BY و یک UPDATE به ازای هر ردیف خلاصه، نه به ازای هر تماس).
+    """
+    for row in _grouped_calls(calls):
+        CallDailyRollup.apply_delta(
+            row['project'], row['caller'], row['day'], row['status'], row['result'],
+            count_delta=-row['count'],
+            duration_delta=-row['duration_sum'],
+            duration_count_delta=-row['with_duration'],
+        )
+
+
+def rebuild_rollups(project_id=None, batch_size=1000):
+    """
+    بازسازی کامل جدول خلاصه از روی تماس‌ها با یک کوئری GROUP BY و درج دسته‌ای.
+    تعداد ردیف‌های ساخته شده را برمی‌گرداند.
+    """
+    calls = Call.objects.all()
+    rollups = CallDailyRollup.objects.all()
+    if project_id:
+        calls = calls.filter(project_id=project_id)
+        rollups = rollups.filter(project_id=project_id)
+
+    rows = _grouped_calls(calls)
+
+    created_count = 0
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(CallDailyRollup(
+                project_id=row['project'],
+                caller_id=row['caller'],
+                day=row['day'],
+                status=row['status'],
+                call_result=row['result'],
+                call_count=row['count'],
+                total_duration=row['duration_sum'],
+                duration_count=row['with_duration'],
+            ))
+            if len(batch) >= batch_size:
+                CallDailyRollup.objects.bulk_create(batch)
+                created_count += len(batch)
+                batch = []
+        if batch:
+            CallDailyRollup.objects.bulk_create(batch)
+            created_count += len(batch)
+    return created_count
@@ -0,0 +1,176 @@
+"""
+خواندن جریانی (streaming) فایل‌های اکسل و CSV آپلود شده برای importها.
+
+به جای pd.read_excel و چند کپی کامل از DataFrame (fillna، astype(str)، replace)،
+ردیف‌ها یکی یکی از فایل خوانده و تمیز می‌شوند: xlsx با openpyxl در حالت read_only
+و CSV با ماژول csv. حافظه مصرفی به اندازه فایل بستگی ندارد و به اندازه یک دسته
+(chunk) از ردیف‌هاست.
+"""
+import csv
+import io
+
+from openpyxl import load_workbook
+
+# تعداد ردیف هر دسته در chunks()
+CHUNK_SIZE = 1000
+
+# پسوندهای قابل آپلود
+SPREADSHEET_EXTENSIONS = ('.xlsx', '.xlsm', '.xls', '.csv')
+
+# مقادیری که سلول خالی حساب می‌شوند (مقادیر NaN پیش‌فرض pandas)
+EMPTY_VALUES = frozenset(['', 'nan', 'none', 'null', 'na', 'n/a'])
+
+# امضای فایل zip (xlsx)
+_ZIP_MAGIC = b'PK\x03\x04'
+
+
+class SpreadsheetError(ValueError):
+    """فایل قابل خواندن نیست یا فرمت آن پشتیبانی نمی‌شود"""
+
+
+def clean_cell(value):
+    """
+    مقدار یک سلول به رشته تمیز؛ None، NaN و 'null' رشته خالی می‌شوند و عدد صحیحی که
+    اکسل اعشاری ذخیره کرده (9121234567.0) بدون .0 برگردانده می‌شود.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if value != value:
+            return ''
+        if value.is_integer():
+            value = int(value)
+
+    str_value = str(value).strip()
+    if str_value.lower() in EMPTY_VALUES:
+        return ''
+    return str_value
+
+
+def _file_name(file, name):
+    return (name or getattr(file, 'name', None) or '').lower()
+
+
+def _is_zip(file):
+    position = file.tell()
+    magic = file.read(len(_ZIP_MAGIC))
+    file.seek(position)
+    return magic == _ZIP_MAGIC
+
+
+class SpreadsheetReader:
+    """
+    خواننده ردیف‌های یک فایل اکسل/CSV که سطر اول آن سرستون‌هاست.
+
+    columns سرستون‌های تمیز شده و total_rows تخمین تعداد ردیف‌های داده (برای
+    گزارش پیشرفت؛ ممکن است None باشد) است. rows() ردیف‌ها را به صورت
+    (شماره ردیف در فایل، {ستون: رشته تمیز}) و chunks() همان‌ها را در دسته‌های
+    chunk_size تایی برمی‌گرداند. ردیف‌های کاملا خالی رد می‌شوند.
+    """
+
+    def __init__(self, file, name=None, chunk_size=CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.total_rows = None
+        self._workbook = None
+        self._text = None
+
+        file_name = _file_name(file, name)
+        try:
+            if file_name.endswith('.csv') or (not file_name.endswith('.xls') and not _is_zip(file)):
+                values = self._open_csv()
+            elif file_name.endswith('.xls'):
+                values = self._open_xls()
+            else:
+                values = self._open_xlsx()
+            header = next(values, None)
+        except SpreadsheetError:
+            self.close()
+            raise
+        except Exception as e:
+            self.close()
+            raise SpreadsheetError(str(e)) from e
+
+        if header is None:
+            self.close()
+            raise SpreadsheetError("فایل خالی است")
+        self.columns = [clean_cell(value) for value in header]
+        self._values = values
+
+    def _open_xlsx(self):
+        self._workbook = load_workbook(self.file, read_only=True, data_only=True)
+        # مانند pd.read_excel، اولین شیت خوانده می‌شود
+        worksheet = self._workbook.worksheets[0]
+        if worksheet.max_row:
+            # از dimension ذخیره شده در فایل؛ فایل بدون dimension تخمین ندارد
+            self.total_rows = max(worksheet.max_row - 1, 0)
+        return worksheet.iter_rows(values_only=True)
+
+    def _open_csv(self):
+        if self.file.seekable():
+            self.total_rows = max(self._count_lines() - 1, 0)
+        self._text = io.TextIOWrapper(self.file, encoding='utf-8-sig', newline='')
+        return csv.reader(self._text)
+
+    def _count_lines(self):
+        """تعداد خطوط فایل با خواندن بلوکی (فیلد چند خطی داخل کوتیشن تخمین را کمی بیشتر می‌کند)"""
+        position = self.file.tell()
+        lines = 0
+        last = b''
+        for block in iter(lambda: self.file.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block
+        self.file.seek(position)
+        return lines + (1 if last and not last.endswith(b'\n') else 0)
+
+    def _open_xls(self):
+        # فرمت قدیمی xls خواندن جریانی ندارد؛ pandas (با xlrd) کل شیت را می‌خواند
+        import pandas as pd
+
+        df = pd.read_excel(self.file, dtype=object, header=None)
+        self.total_rows = max(len(df) - 1, 0)
+        return df.itertuples(index=False, name=None)
+
+    def rows(self):
+        columns = [(index, column) for index, column in enumerate(self.columns) if column]
+        width = len(self.columns)
+        try:
+            # سطر ۱ سرستون است
+            for row_number, values in enumerate(self._values, start=2):
+                if len(values) < width:
+                    values = tuple(values) + (None,) * (width - len(values))
+                row = {column: clean_cell(values[index]) for index, column in columns}
+                if any(row.values()):
+                    yield row_number, row
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise SpreadsheetError(str(e)) from e
+
+    def chunks(self):
+        chunk = []
+        for item in self.rows():
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+        if self._text is not None:
+            # فایل اصلی متعلق به فراخواننده است و نباید با wrapper بسته شود
+            self._text.detach()
+            self._text = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_spreadsheet(file, name=None, chunk_size=CHUNK_SIZE):
+    """باز کردن SpreadsheetReader؛ file باید باینری و قابل seek باشد"""
+    return SpreadsheetReader(file, name=name, chunk_size=chunk_size)
@@ -0,0 +1,260 @@
+from django.db.models import Count, Sum, Avg, Q, OuterRef, Subquery, IntegerField
+from django.db.models.functions import Coalesce
+
+from ..models import Project, Contact, ProjectCaller, Call, CallAnswer, Question
+from .rollups import rollup_totals_annotations
+
+
+def _count_subquery(model, **filters):
+    """
+    زیرکوئری شمارش رکوردهای یک مدل به ازای هر پروژه (برای annotate روی Project)
+    """
+    queryset = model.objects.filter(
+        project=OuterRef('pk'), **filters
+    ).order_by().values('project').annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(queryset, output_field=IntegerField()), 0)
+
+
+def _result_key(choice):
+    return f'result_{choice}'
+
+
+def _status_key(choice):
+    return f'status_{choice}'
+
+
+def _project_statistics_annotations():
+    """
+    تمام شمارنده‌های آماری پروژه به صورت aggregate شرطی روی جدول تماس‌ها
+    """
+    annotations = {
+        'total_contacts': _count_subquery(Contact),
+        'active_contacts': _count_subquery(Contact, is_active=True),
+        'total_callers': _count_subquery(ProjectCaller, is_active=True),
+        'total_calls': Count('calls'),
+        'total_duration': Coalesce(Sum('calls__duration'), 0),
+        'calls_with_duration': Count('calls__duration'),
+    }
+    for choice, _ in Call.CALL_RESULT_CHOICES:
+        annotations[_result_key(choice)] = Count('calls', filter=Q(calls__call_result=choice))
+    for choice, _ in Call.CALL_STATUS_CHOICES:
+        annotations[_status_key(choice)] = Count('calls', filter=Q(calls__status=choice))
+    return annotations
+
+
+def _build_statistics(row):
+    """ساخت دیکشنری خروجی آمار پروژه از یک ردیف aggregate شده"""
+    total_calls = row['total_calls']
+    total_duration = row['total_duration']
+    successful_calls = row[_result_key('interested')]
+    answered_calls = row[_status_key('answered')]
+
+    average_duration = (total_duration / total_calls) if total_calls > 0 else 0
+    success_rate = (successful_calls / total_calls * 100) if total_calls > 0 else 0
+    answer_rate = (answered_calls / total_calls * 100) if total_calls > 0 else 0
+
+    return {
+        'total_contacts': row['total_contacts'],
+        'active_contacts': row['active_contacts'],
+        'total_callers': row['total_callers'],
+        'total_calls': total_calls,
+        'successful_calls': successful_calls,
+        'answered_calls': answered_calls,
+        'call_results_distribution': {
+            choice: row[_result_key(choice)] for choice, _ in Call.CALL_RESULT_CHOICES
+        },
+        'call_status_distribution': {
+            choice: row[_status_key(choice)] for choice, _ in Call.CALL_STATUS_CHOICES
+        },
+        'total_duration_seconds': total_duration,
+        'calls_with_duration': row['calls_with_duration'],
+        'average_call_duration_seconds': round(average_duration, 2),
+        'success_rate': round(success_rate, 2),
+        'answer_rate': round(answer_rate, 2),
+    }
+
+
+def get_projects_statistics(project_ids):
+    """
+    محاسبه آمار چند پروژه با یک کوئری واحد.
+    خروجی دیکشنری {project_id: آمار} است؛ برای صفحه‌بندی لیست پروژه‌ها استفاده می‌شود.
+    """
+    project_ids = list(project_ids)
+    if not project_ids:
+        return {}
+
+    rows = Project.objects.filter(pk__in=project_ids).order_by().values('pk').annotate(
+        **_project_statistics_annotations()
+    )
+    return {row['pk']: _build_statistics(row) for row in rows}
+
+
+def get_project_statistics(project):
+    """آمار کلی یک پروژه (یک کوئری)"""
+    project_id = getattr(project, 'pk', project)
+    return get_projects_statistics([project_id]).get(project_id)
+
+
+def _caller_performance_annotations():
+    """شمارنده‌های عملکرد هر تماس‌گیرنده (روی values('caller') اعمال می‌شود)"""
+    annotations = {
+        'total_calls': Count('id'),
+        'total_duration': Coalesce(Sum('duration'), 0),
+        'avg_duration': Avg('duration'),
+        'calls_with_duration': Count('duration'),
+    }
+    for choice, _ in Call.CALL_RESULT_CHOICES:
+        annotations[_result_key(choice)] = Count('id', filter=Q(call_result=choice))
+    for choice, _ in Call.CALL_STATUS_CHOICES:
+        annotations[_status_key(choice)] = Count('id', filter=Q(status=choice))
+    return annotations
+
+
+def _build_caller_performance(row):
+    """ساخت ردیف عملکرد یک تماس‌گیرنده از خروجی GROUP BY"""
+    total_calls = row['total_calls']
+    first_name = row['caller__first_name'] or ''
+    last_name = row['caller__last_name'] or ''
+    interested_calls = row[_result_key('interested')]
+    answered_calls = row[_status_key('answered')]
+
+    success_rate = (interested_calls / total_calls * 100) if total_calls > 0 else 0
+    answer_rate = (answered_calls / total_calls * 100) if total_calls > 0 else 0
+
+    performance = {
+        'caller_id': row['caller'],
+        'first_name': first_name,
+        'last_name': last_name,
+        'full_name': f"{first_name} {last_name}".strip(),
+        'username': row['caller__username'],
+        'phone_number': row['caller__phone_number'] or '',
+        'total_calls': total_calls,
+    }
+    # تماس‌ها بر اساس نتیجه و وضعیت، مثلا interested_calls و answered_calls
+    for choice, _ in Call.CALL_RESULT_CHOICES:
+        performance[f'{choice}_calls'] = row[_result_key(choice)]
+    for choice, _ in Call.CALL_STATUS_CHOICES:
+        performance[f'{choice}_calls'] = row[_status_key(choice)]
+
+    if 'avg_duration' in row:
+        avg_duration = row['avg_duration'] or 0
+    else:
+        # ردیف‌های جدول خلاصه میانگین ندارند؛ از جمع و تعداد مدت‌ها محاسبه می‌شود
+        calls_with_duration = row['calls_with_duration']
+        avg_duration = row['total_duration'] / calls_with_duration if calls_with_duration else 0
+
+    performance.update({
+        'success_rate': round(success_rate, 2),
+        'answer_rate': round(answer_rate, 2),
+        'total_duration_seconds': row['total_duration'],
+        'avg_duration_seconds': round(avg_duration, 2),
+        'calls_with_duration': row['calls_with_duration'],
+    })
+    return performance
+
+
+def get_caller_performance_rows(project, calls=None, rollups=None):
+    """
+    عملکرد همه تماس‌گیرندگان یک پروژه با یک کوئری GROUP BY.
+    در صورت ارسال calls (مثلا با فیلتر تاریخ) همان کوئری‌ست گروه‌بندی می‌شود؛
+    با ارسال rollups به جای جدول تماس‌ها از جدول خلاصه روزانه خوانده می‌شود.
+    """
+    if rollups is not None:
+        queryset = rollups
+        annotations = rollup_totals_annotations()
+    else:
+        queryset = calls if calls is not None else Call.objects.filter(project=project)
+        annotations = _caller_performance_annotations()
+
+    rows = queryset.order_by().values(
+        'caller',
+        'caller__username',
+        'caller__first_name',
+        'caller__last_name',
+        'caller__phone_number',
+    ).annotate(**annotations)
+    return [_build_caller_performance(row) for row in rows]
+
+
+# وضعیت‌هایی که در شمارنده‌های تماس هر شماره تلفن (ContactSerializer) استفاده می‌شوند
+PHONE_CALL_COUNTERS = {
+    'phone_calls_count': {},
+    'phone_calls_answered_count': {'status': 'answered'},
+    'phone_calls_not_answered_count': {'status': 'no_answer'},
+}
+
+
+def _phone_calls_subquery(**filters):
+    """
+    زیرکوئری شمارش تماس‌های یک شماره تلفن در همه پروژه‌ها (برای annotate روی Contact)
+    """
+    queryset = Call.objects.filter(
+        contact__phone=OuterRef('phone'), **filters
+    ).order_by().values('contact__phone').annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(queryset, output_field=IntegerField()), 0)
+
+
+def annotate_phone_call_counters(queryset):
+    """
+    افزودن شمارنده‌های تماس هر شماره تلفن به کوئری‌ست مخاطبین؛
+    تاریخچه تماس بین پروژه‌ها مشترک است و بر اساس phone (نه خود مخاطب) شمرده می‌شود.
+    """
+    return queryset.annotate(**{
+        name: _phone_calls_subquery(**filters)
+        for name, filters in PHONE_CALL_COUNTERS.items()
+    })
+
+
+def get_phone_call_counters(phone):
+    """شمارنده‌های تماس یک شماره تلفن با یک کوئری (برای مخاطبی که annotate نشده است)"""
+    return Call.objects.filter(contact__phone=phone).aggregate(**{
+        name: Count('pk', filter=Q(**filters)) if filters else Count('pk')
+        for name, filters in PHONE_CALL_COUNTERS.items()
+    })
+
+
+def get_call_answers_summaries(project_ids):
+    """
+    هیستوگرام پاسخ‌های تماس چند پروژه: تعداد انتخاب هر گزینه برای هر سوال.
+    شمارش با یک GROUP BY روی (پروژه، سوال، گزینه) انجام می‌شود و فقط متن سوال‌ها
+    و گزینه‌ها جداگانه خوانده می‌شود. پاسخ‌های بدون گزینه در no_choice_count هستند.
+    خروجی دیکشنری {project_id: لیست سوال‌ها} است.
+    """
+    project_ids = list(project_ids)
+    counts = {}
+    answered_question_ids = set()
+    rows = CallAnswer.objects.filter(call__project_id__in=project_ids).order_by().values(
+        'call__project_id', 'question', 'selected_choice'
+    ).annotate(count=Count('pk'))
+    for row in rows:
+        question_counts = counts.setdefault((row['call__project_id'], row['question']), {})
+        question_counts[row['selected_choice']] = row['count']
+        answered_question_ids.add(row['question'])
+
+    questions = Question.objects.filter(
+        Q(project_id__in=project_ids) | Q(pk__in=answered_question_ids)
+    ).prefetch_related('choices').order_by('pk')
+
+    summaries = {project_id: [] for project_id in project_ids}
+    for question in questions:
+        # سوال در پروژه خودش و هر پروژه‌ای که تماس‌هایش به آن پاسخ داده‌اند نمایش داده می‌شود
+        for project_id in project_ids:
+            question_counts = counts.get((project_id, question.id))
+            if question_counts is None and question.project_id != project_id:
+                continue
+            question_counts = question_counts or {}
+            summaries[project_id].append({
+                'question': {'id': question.id, 'text': question.text},
+                'total_answers': sum(question_counts.values()),
+                'no_choice_count': question_counts.get(None, 0),
+                'choices': [
+                    {'id': choice.id, 'text': choice.text, 'count': question_counts.get(choice.id, 0)}
+                    for choice in question.choices.all()
+                ],
+            })
+    return summaries
+
+
+def get_call_answers_summary(project_id):
+    """هیستوگرام پاسخ‌های تماس یک پروژه (get_call_answers_summaries برای یک پروژه)"""
+    return get_call_answers_summaries([project_id])[project_id]
@@ -0,0 +1,199 @@
+from datetime import datetime, timedelta
+
+from django.db.models import Count, Sum, Q, F
+from django.db.models.functions import Coalesce, TruncDay, TruncWeek, TruncMonth
+from django.utils import timezone
+from persiantools.jdatetime import JalaliDate
+
+from ..models import Call
+from .rollups import ROLLUP_TIME_ZONE
+
+INTERVALS = ('day', 'week', 'month', 'jalali_month')
+
+# کلید سری تماس‌هایی که نتیجه ثبت نشده دارند
+NO_RESULT = 'no_result'
+
+# سقف تعداد بازه‌های یک سری؛ حلقه پر کردن بازه‌های خالی و پاسخ با طول بازه تاریخ رشد می‌کنند
+MAX_BUCKETS = 1000
+
+
+def result_series():
+    """سری‌های پیش‌فرض: کل تماس‌ها و یک سری برای هر نتیجه تماس"""
+    series = {'total_calls': None}
+    for choice, _ in Call.CALL_RESULT_CHOICES:
+        series[choice] = Q(call_result=choice)
+    series[NO_RESULT] = Q(call_result='') | Q(call_result__isnull=True)
+    return series
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.astimezone(ROLLUP_TIME_ZONE).date()
+    return value
+
+
+def bucket_start(day, interval):
+    """شروع بازه‌ای که یک روز در آن قرار می‌گیرد (هفته‌ها از دوشنبه، مثل TruncWeek)"""
+    if interval == 'day':
+        return day
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    jalali = JalaliDate(day)
+    return JalaliDate(jalali.year, jalali.month, 1).to_gregorian()
+
+
+def _next_bucket(start, interval):
+    if interval == 'day':
+        return start + timedelta(days=1)
+    if interval == 'week':
+        return start + timedelta(days=7)
+    if interval == 'month':
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    jalali = JalaliDate(start)
+    if jalali.month == 12:
+        return JalaliDate(jalali.year + 1, 1, 1).to_gregorian()
+    return JalaliDate(jalali.year, jalali.month + 1, 1).to_gregorian()
+
+
+def _month_index(start, interval):
+    if interval == 'jalali_month':
+        jalali = JalaliDate(start)
+        return jalali.year * 12 + jalali.month - 1
+    return start.year * 12 + start.month - 1
+
+
+def _bucket_count(first, last, interval):
+    """تعداد بازه‌ها از first تا last (هر دو شروع بازه هستند) بدون پیمایش آن‌ها"""
+    if last < first:
+        return 0
+    if interval == 'day':
+        return (last - first).days + 1
+    if interval == 'week':
+        return (last - first).days // 7 + 1
+    return _month_index(last, interval) - _month_index(first, interval) + 1
+
+
+def _buckets_before(last, interval, count):
+    """شروع بازه‌ای که count - 1 بازه قبل از last است"""
+    if interval == 'day':
+        return last - timedelta(days=count - 1)
+    if interval == 'week':
+        return last - timedelta(weeks=count - 1)
+    year, month = divmod(_month_index(last, interval) - (count - 1), 12)
+    if interval == 'jalali_month':
+        return JalaliDate(year, month + 1, 1).to_gregorian()
+    return last.replace(year=year, month=month + 1, day=1)
+
+
+def _too_many_buckets(interval):
+    return ValueError(
+        f"Date range is too large for interval '{interval}' (at most {MAX_BUCKETS} buckets); "
+        "narrow the range or use a larger interval."
+    )
+
+
+def _resolve_end_date(start_date, end_date):
+    """
+    پایان بازه سری: بازه‌ای که از start_date شروع شود و end_date نداشته باشد تا امروز
+    (وقت تهران) است؛ بدون هر دو، پایان از داده ساخته می‌شود (None)
+    """
+    if end_date:
+        return _as_date(end_date)
+    if start_date:
+        return timezone.localdate(timezone=ROLLUP_TIME_ZONE)
+    return None
+
+
+def validate_time_series_range(start_date, end_date, interval):
+    """
+    رد کردن بازه درخواستی که بیش از MAX_BUCKETS بازه دارد (ValueError).
+    پایان بازه مانند get_time_series تعیین می‌شود؛ بدون start_date بازه از داده
+    ساخته و در get_time_series به آخرین MAX_BUCKETS بازه محدود می‌شود.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Invalid interval. Must be one of: {', '.join(INTERVALS)}.")
+    if not start_date:
+        return
+    end_date = _resolve_end_date(start_date, end_date)
+    first = bucket_start(_as_date(start_date), interval)
+    if _bucket_count(first, bucket_start(end_date, interval), interval) > MAX_BUCKETS:
+        raise _too_many_buckets(interval)
+
+
+def _bucket_label(start, interval):
+    if interval == 'jalali_month':
+        return JalaliDate(start).strftime('%Y-%m')
+    return start
+
+
+def _grouped_rows(queryset, interval, series):
+    """
+    گروه‌بندی سمت دیتابیس؛ ماه شمسی روی ردیف‌های روزانه ساخته و در پایتون جمع می‌شود.
+    """
+    if queryset.model is Call:
+        # مسیر مستقیم روی تماس‌ها: برش زمانی به وقت تهران
+        truncs = {
+            'day': TruncDay('call_date', tzinfo=ROLLUP_TIME_ZONE),
+            'week': TruncWeek('call_date', tzinfo=ROLLUP_TIME_ZONE),
+            'month': TruncMonth('call_date', tzinfo=ROLLUP_TIME_ZONE),
+            'jalali_month': TruncDay('call_date', tzinfo=ROLLUP_TIME_ZONE),
+        }
+        aggregates = {name: Count('pk', filter=condition) for name, condition in series.items()}
+    else:
+        # مسیر جدول خلاصه: روزها از قبل به وقت تهران هستند
+        truncs = {
+            'day': F('day'),
+            'week': TruncWeek('day'),
+            'month': TruncMonth('day'),
+            'jalali_month': F('day'),
+        }
+        aggregates = {
+            name: Coalesce(Sum('call_count', filter=condition), 0)
+            for name, condition in series.items()
+        }
+    return queryset.order_by().annotate(bucket=truncs[interval]).values('bucket').annotate(**aggregates)
+
+
+def get_time_series(queryset, interval='day', start_date=None, end_date=None, series=None):
+    """
+    سری زمانی تماس‌ها در بازه‌های روز/هفته/ماه میلادی یا ماه شمسی (jalali_month).
+
+    queryset می‌تواند ردیف‌های CallDailyRollup (مسیر ارزان و پیش‌فرض داشبوردها) یا
+    تماس‌ها باشد. series دیکشنری {نام: شرط Q یا None برای همه} است. بازه‌های خالی
+    بین start_date و end_date (یا اولین و آخرین بازه دارای داده) با صفر پر می‌شوند؛
+    اگر فقط start_date داده شود، سری تا امروز ادامه دارد (حتی بدون هیچ داده‌ای).
+
+    سری حداکثر MAX_BUCKETS بازه دارد: بازه‌ای که از start_date شروع شود و بیشتر
+    باشد ValueError می‌دهد و بدون start_date فقط آخرین بازه‌ها برگردانده می‌شوند.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Invalid interval. Must be one of: {', '.join(INTERVALS)}.")
+    if series is None:
+        series = result_series()
+
+    buckets = {}
+    for row in _grouped_rows(queryset, interval, series):
+        start = bucket_start(_as_date(row['bucket']), interval)
+        bucket = buckets.setdefault(start, dict.fromkeys(series, 0))
+        for name in series:
+            bucket[name] += row[name]
+
+    end_date = _resolve_end_date(start_date, end_date)
+    first = bucket_start(_as_date(start_date), interval) if start_date else min(buckets, default=None)
+    last = bucket_start(end_date, interval) if end_date else max(buckets, default=None)
+    if first is None or last is None:
+        return []
+    if _bucket_count(first, last, interval) > MAX_BUCKETS:
+        if start_date:
+            raise _too_many_buckets(interval)
+        first = _buckets_before(last, interval, MAX_BUCKETS)
+
+    result = []
+    current = first
+    while current <= last:
+        values = buckets.get(current) or dict.fromkeys(series, 0)
+        result.append({'date': _bucket_label(current, interval), 'start_date': current, **values})
+        current = _next_bucket(current, interval)
+    return result
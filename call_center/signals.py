@@ -3,9 +3,16 @@ from django.dispatch import receiver
 
 from call_center.models import Call
 import requests
-from django.db.models.signals import post_save, pre_save
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, pre_save, post_delete, pre_delete
 from django.dispatch import receiver
-from .models import Call, Contact,Ticket
+from .models import (
+    Call, Contact,Ticket, Project, ProjectMembership, ProjectCaller, GlobalCounter,
+    CallAnswer, Question, AnswerChoice,
+)
+from .services.cache import invalidate_project_statistics, invalidate_contact_statistics
+from .services.counters import subtract_calls_from_counters
+from .services.rollups import subtract_calls_from_rollups
 from django.conf import settings
 @receiver(post_save, sender=Call)
 def update_contact_call_status(sender, instance, created, **kwargs):
@@ -58,4 +65,96 @@ def update_contact_status_on_callback_request(sender, instance, created, **kwarg
             contact=contact,
             action=f"وضعیت تماس به 'در انتظار' تغییر یافت بدلیل درخواست تماس مجدد در تماس شماره {instance.id}",
             performed_by=instance.caller
-        )
\ No newline at end of file
+        )
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=ProjectMembership)
+@receiver([post_save, post_delete], sender=ProjectCaller)
+@receiver([post_save, post_delete], sender=Contact)
+@receiver(post_save, sender=Call)
+def invalidate_statistics_cache(sender, instance, **kwargs):
+    """
+    با هر تغییر در داده‌های یک پروژه، نسخه کش آمار آن پروژه بالا می‌رود
+    """
+    project_id = instance.pk if sender is Project else instance.project_id
+    invalidate_project_statistics(project_id)
+
+
+@receiver([post_save, post_delete], sender=CallAnswer)
+@receiver([post_save, post_delete], sender=Question)
+@receiver([post_save, post_delete], sender=AnswerChoice)
+def invalidate_answers_summary_cache(sender, instance, **kwargs):
+    """
+    پاسخ‌ها بعد از ذخیره خود تماس ثبت می‌شوند؛ هیستوگرام پاسخ‌های پروژه باید جداگانه باطل شود
+    """
+    if sender is CallAnswer:
+        call = instance._state.fields_cache.get('call')
+        if call is not None:
+            project_id = call.project_id
+        else:
+            project_id = Call.objects.filter(pk=instance.call_id).values_list('project_id', flat=True).first()
+    elif sender is Question:
+        project_id = instance.project_id
+    else:
+        project_id = Question.objects.filter(pk=instance.question_id).values_list('project_id', flat=True).first()
+    invalidate_project_statistics(project_id)
+
+
+@receiver(post_save, sender=Contact)
+def invalidate_contact_statistics_cache(sender, instance, created, **kwargs):
+    """
+    آمار وضعیت مخاطبین فقط با ایجاد مخاطب یا تغییر call_status / assigned_caller باطل می‌شود
+    """
+    if created or instance.status_changed():
+        invalidate_contact_statistics(instance.project_id)
+
+
+@receiver(post_delete, sender=Contact)
+@receiver([post_save, post_delete], sender=ProjectMembership)
+def invalidate_contact_statistics_on_delete(sender, instance, **kwargs):
+    """حذف مخاطب یا تغییر عضویت (که دسترسی به مخاطبین را عوض می‌کند)"""
+    invalidate_contact_statistics(instance.project_id)
+
+
+def _origin_model(origin):
+    """مدلی که حذف از آن شروع شده (نمونه یا کوئری‌ست)"""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+@receiver(pre_delete, sender=Project)
+def remove_project_calls_from_counters(sender, instance, origin=None, **kwargs):
+    """
+    تماس‌های پروژه حذف شده با یک GROUP BY از شمارنده‌ها کم می‌شوند؛ آمار مخاطبین
+    و جدول خلاصه همراه پروژه حذف می‌شوند.
+    """
+    if _origin_model(origin) is Project:
+        subtract_calls_from_counters(Call.objects.filter(project=instance))
+
+
+@receiver(pre_delete, sender=Contact)
+def remove_contact_calls_from_statistics(sender, instance, origin=None, **kwargs):
+    """
+    تماس‌های مخاطب حذف شده دسته‌ای از شمارنده‌ها و جدول خلاصه (که به مخاطب وابسته
+    نیست) کم می‌شوند؛ آمار خود مخاطب همراهش حذف می‌شود.
+    """
+    if _origin_model(origin) is Contact:
+        calls = Call.objects.filter(contact=instance)
+        subtract_calls_from_counters(calls)
+        subtract_calls_from_rollups(calls)
+
+
+@receiver(post_delete, sender=Call)
+def remove_deleted_call_from_statistics(sender, instance, origin=None, **kwargs):
+    """
+    حذف تماس به صورت ردیف به ردیف از آمار، جدول خلاصه و شمارنده‌ها کم می‌شود؛
+    تماس‌هایی که همراه پروژه یا مخاطب حذف می‌شوند در pre_delete آن‌ها شمرده شده‌اند.
+    """
+    if _origin_model(origin) in (Project, Contact):
+        return
+    instance.remove_from_statistics()
+    invalidate_project_statistics(instance.project_id)
+
+
+@receiver(post_delete, sender=Project)
+def decrement_project_counter(sender, instance, **kwargs):
+    GlobalCounter.apply_deltas({GlobalCounter.PROJECTS: -1})
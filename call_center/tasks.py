@@ -119,4 +119,39 @@ from celery import shared_task
 
 @shared_task
 def check_special_contacts():
-    unassign_inactive_special_contacts()
\ No newline at end of file
+    unassign_inactive_special_contacts()
+
+@shared_task(name="reconcile_global_counters_task")
+def reconcile_global_counters_task():
+    """
+    تسک دوره‌ای برای همگام‌سازی شمارنده‌های سراسری با شمارش واقعی.
+    """
+    from .services.counters import reconcile_global_counters
+
+    changed = reconcile_global_counters()
+    if changed:
+        logger.warning(f"Global counters reconciled: {changed}")
+    return changed
+
+
+@shared_task(name="run_import_job_task")
+def run_import_job_task(uploaded_file_id):
+    """
+    import فایل آپلود شده (مخاطبین/تماس‌گیرندگان) خارج از درخواست HTTP
+    """
+    from .services.import_jobs import run_import_job
+
+    return run_import_job(uploaded_file_id)
+
+
+@shared_task(name="fail_stale_import_jobs_task")
+def fail_stale_import_jobs_task():
+    """
+    تسک دوره‌ای برای بستن jobهای import که worker آن‌ها وسط کار متوقف شده است.
+    """
+    from .services.import_jobs import fail_stale_import_jobs
+
+    count = fail_stale_import_jobs()
+    if count:
+        logger.warning(f"Marked {count} stale import jobs as failed")
+    return count
@@ -253,3 +253,1859 @@ class ExcelImportTestCase(TestCase):
         self.assertEqual(ali.assigned_caller, caller1)
         self.assertEqual(sara.assigned_caller, caller2)
         self.assertEqual(sara.full_name, "Sara Ahmadi")
+
+
+from django.contrib.auth import get_user_model
+from .models import Call, ProjectMembership
+from .services.statistics import get_projects_statistics, get_project_statistics
+from django.core.cache import cache
+
+
+class ProjectFixtureMixin:
+    """
+    داده پایه مشترک تست‌ها: کاربر، پروژه (با عضویت سازنده) و مخاطب.
+    کش آمار قبل از هر تست خالی می‌شود تا نسخه‌های کش تست قبلی اثری نداشته باشند.
+    """
+
+    password = 'pass1234'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    @classmethod
+    def create_user(cls, username, phone_number, **extra):
+        return get_user_model().objects.create_user(
+            username=username, password=cls.password, phone_number=phone_number, **extra
+        )
+
+    @classmethod
+    def create_project(cls, name, created_by, role=None):
+        project = Project.objects.create(name=name, created_by=created_by)
+        if role is not None:
+            ProjectMembership.objects.create(project=project, user=created_by, role=role)
+        return project
+
+    @classmethod
+    def create_contact(cls, project, phone, full_name='Contact', **extra):
+        return Contact.objects.create(project=project, full_name=full_name, phone=phone, **extra)
+
+    def authenticate(self, user):
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+
+class ProjectStatisticsEngineTestCase(ProjectFixtureMixin, TestCase):
+    """تست موتور آمار پروژه و تعداد کوئری‌ها"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(username='stats_admin', phone_number='09120000100')
+        self.projects = []
+        for index in range(20):
+            project = Project.objects.create(name=f'Project {index}', created_by=self.user)
+            contact = self.create_contact(project, f'0933000{index:04d}')
+            Call.objects.create(contact=contact, caller=self.user, project=project,
+                                call_result='interested', status='answered', duration=60)
+            Call.objects.create(contact=contact, caller=self.user, project=project,
+                                call_result='no_time', status='no_answer')
+            self.projects.append(project)
+
+    def test_single_project_statistics(self):
+        """آمار یک پروژه با یک کوئری"""
+        with self.assertNumQueries(1):
+            statistics = get_project_statistics(self.projects[0])
+        self.assertEqual(statistics['total_contacts'], 1)
+        self.assertEqual(statistics['total_calls'], 2)
+        self.assertEqual(statistics['call_results_distribution']['interested'], 1)
+        self.assertEqual(statistics['call_results_distribution']['no_time'], 1)
+        self.assertEqual(statistics['call_status_distribution']['answered'], 1)
+        self.assertEqual(statistics['total_duration_seconds'], 60)
+        self.assertEqual(statistics['calls_with_duration'], 1)
+        self.assertEqual(statistics['average_call_duration_seconds'], 30)
+        self.assertEqual(statistics['success_rate'], 50)
+
+    def test_page_of_projects_in_one_query(self):
+        """آمار بیست پروژه با یک کوئری محاسبه می‌شود"""
+        with self.assertNumQueries(1):
+            statistics = get_projects_statistics(project.pk for project in self.projects)
+        self.assertEqual(len(statistics), 20)
+        for project in self.projects:
+            self.assertEqual(statistics[project.pk]['total_calls'], 2)
+
+    def test_conditional_aggregate_without_answers_or_durations(self):
+        """تقسیم‌ها در همان کوئری شرطی روی پروژه بدون تماس موفق و بدون مدت تماس صفر می‌شوند"""
+        project = Project.objects.create(name='No answers', created_by=self.user)
+        contact = self.create_contact(project, '09330009999')
+        Call.objects.create(contact=contact, caller=self.user, project=project, status='no_answer')
+        with self.assertNumQueries(1):
+            statistics = get_project_statistics(project)
+        self.assertEqual(statistics['total_calls'], 1)
+        self.assertEqual(statistics['call_status_distribution']['no_answer'], 1)
+        self.assertEqual(statistics['calls_with_duration'], 0)
+        self.assertEqual(statistics['average_call_duration_seconds'], 0)
+        self.assertEqual(statistics['success_rate'], 0)
+
+
+from .services.statistics import get_caller_performance_rows
+
+
+class CallerPerformanceAggregatorTestCase(ProjectFixtureMixin, TestCase):
+    """تست گزارش عملکرد تماس‌گیرندگان با یک کوئری GROUP BY"""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user(username='perf_admin', phone_number='09120000200')
+        self.project = self.create_project('Performance', self.admin)
+        self.callers = [
+            self.create_user(username=f'perf_caller{i}', phone_number=f'0912000030{i}', first_name='Caller', last_name=str(i))
+            for i in range(5)
+        ]
+        contact = self.create_contact(self.project, '09330000300')
+        for caller in self.callers:
+            Call.objects.create(contact=contact, caller=caller, project=self.project,
+                                call_result='interested', status='answered', duration=120)
+            Call.objects.create(contact=contact, caller=caller, project=self.project,
+                                call_result='not_interested', status='answered')
+
+    def test_rows_in_one_query(self):
+        with self.assertNumQueries(1):
+            rows = get_caller_performance_rows(self.project)
+        self.assertEqual(len(rows), 5)
+        row = rows[0]
+        self.assertEqual(row['total_calls'], 2)
+        self.assertEqual(row['interested_calls'], 1)
+        self.assertEqual(row['not_interested_calls'], 1)
+        self.assertEqual(row['answered_calls'], 2)
+        self.assertEqual(row['calls_with_duration'], 1)
+        self.assertEqual(row['avg_duration_seconds'], 120)
+        self.assertEqual(row['success_rate'], 50)
+        self.assertEqual(row['answer_rate'], 100)
+
+    def test_project_report(self):
+        with self.assertNumQueries(1):
+            report = self.project.get_caller_performance_report()
+        self.assertEqual(len(report), 5)
+        self.assertEqual(report[0]['average_call_duration_seconds'], 60)
+        self.assertTrue(report[0]['caller_full_name'].startswith('Caller'))
+
+
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from datetime import timedelta
+from django.test.utils import CaptureQueriesContext
+from .models import CallStatistics
+
+
+class IncrementalCallStatisticsTestCase(ProjectFixtureMixin, TestCase):
+    """تست به‌روزرسانی تفاضلی CallStatistics و دستور بازسازی"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(username='delta_caller', phone_number='09120000400')
+        self.project = self.create_project('Delta', self.user)
+        self.contact = self.create_contact(self.project, '09330000400')
+
+    def _create_call(self, **kwargs):
+        return Call.objects.create(contact=self.contact, caller=self.user, project=self.project, **kwargs)
+
+    def _stats(self):
+        return CallStatistics.objects.get(contact=self.contact, project=self.project)
+
+    def test_new_calls_are_counted(self):
+        self._create_call(status='answered', call_result='interested')
+        self._create_call(status='no_answer')
+        stats = self._stats()
+        self.assertEqual(stats.total_calls, 2)
+        self.assertEqual(stats.successful_calls, 1)
+        self.assertEqual(float(stats.response_rate), 50.0)
+        self.assertEqual(stats.last_call_result, '')
+
+    def test_edit_applies_delta(self):
+        call = self._create_call(status='no_answer')
+        call = Call.objects.get(pk=call.pk)
+        call.status = 'answered'
+        call.call_result = 'no_time'
+        call.save()
+        stats = self._stats()
+        self.assertEqual(stats.total_calls, 1)
+        self.assertEqual(stats.successful_calls, 1)
+        self.assertEqual(stats.last_call_result, 'no_time')
+
+    def test_edit_without_relevant_change_skips_statistics(self):
+        call = self._create_call(status='answered')
+        call = Call.objects.get(pk=call.pk)
+        call.notes = 'updated'
+        with CaptureQueriesContext(connection) as queries:
+            call.save()
+        self.assertFalse([q for q in queries.captured_queries if 'call_center_callstatistics' in q['sql']])
+
+    def test_delete_decrements(self):
+        call = self._create_call(status='answered')
+        self._create_call(status='no_answer')
+        call.delete()
+        stats = self._stats()
+        self.assertEqual(stats.total_calls, 1)
+        self.assertEqual(stats.successful_calls, 0)
+
+    def test_delete_latest_call_recomputes_last_call(self):
+        older = self._create_call(status='answered', call_result='interested')
+        latest = self._create_call(status='answered', call_result='no_time')
+        Call.objects.filter(pk=older.pk).update(call_date=latest.call_date - timedelta(days=1))
+        self.assertEqual(self._stats().last_call_result, 'no_time')
+
+        latest.delete()
+        stats = self._stats()
+        self.assertEqual(stats.last_call_result, 'interested')
+        self.assertEqual(stats.last_call_date, latest.call_date - timedelta(days=1))
+
+        Call.objects.get(pk=older.pk).delete()
+        stats = self._stats()
+        self.assertEqual(stats.total_calls, 0)
+        self.assertIsNone(stats.last_call_date)
+        self.assertEqual(stats.last_call_result, '')
+
+    def test_rebuild_command(self):
+        self._create_call(status='answered', call_result='interested')
+        self._create_call(status='answered', call_result='no_time')
+        CallStatistics.objects.update(total_calls=0, successful_calls=0)
+        other = Contact.objects.create(project=self.project, full_name='Other', phone='09330000401')
+        CallStatistics.objects.create(contact=other, project=self.project, total_calls=3)
+
+        call_command('rebuild_call_statistics', stdout=StringIO())
+
+        stats = self._stats()
+        self.assertEqual(stats.total_calls, 2)
+        self.assertEqual(stats.successful_calls, 2)
+        self.assertEqual(float(stats.response_rate), 100.0)
+        self.assertEqual(stats.last_call_result, 'no_time')
+        self.assertFalse(CallStatistics.objects.filter(contact=other).exists())
+
+
+from datetime import datetime as dt
+from zoneinfo import ZoneInfo
+from .models import CallDailyRollup
+from .services.rollups import rollup_day
+
+
+class CallDailyRollupTestCase(ProjectFixtureMixin, TestCase):
+    """تست جدول خلاصه روزانه تماس‌ها و خواندن داشبوردها از آن"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(
+            username='rollup_caller', phone_number='09120000500',
+            is_staff=True,
+        )
+        self.project = self.create_project('Rollup', self.user)
+        self.contact = self.create_contact(self.project, '09330000500')
+
+    def _create_call(self, **kwargs):
+        return Call.objects.create(contact=self.contact, caller=self.user, project=self.project, **kwargs)
+
+    def _rollup(self, **filters):
+        return CallDailyRollup.objects.get(project=self.project, caller=self.user, **filters)
+
+    def test_rollup_day_uses_tehran_time(self):
+        # ساعت ۲۲ به وقت UTC در تهران روز بعد محسوب می‌شود
+        self.assertEqual(rollup_day(dt(2024, 3, 1, 22, 0, tzinfo=ZoneInfo('UTC'))).isoformat(), '2024-03-02')
+
+    def test_calls_update_rollup(self):
+        call = self._create_call(status='answered', call_result='interested', duration=60)
+        self._create_call(status='answered', call_result='interested', duration=30)
+        rollup = self._rollup(status='answered', call_result='interested')
+        self.assertEqual(rollup.day, rollup_day(call.call_date))
+        self.assertEqual(rollup.call_count, 2)
+        self.assertEqual(rollup.total_duration, 90)
+        self.assertEqual(rollup.duration_count, 2)
+
+    def test_edit_moves_call_between_rows(self):
+        call = self._create_call(status='no_answer')
+        call = Call.objects.get(pk=call.pk)
+        call.status = 'answered'
+        call.call_result = 'no_time'
+        call.duration = 45
+        call.save()
+        self.assertEqual(self._rollup(status='no_answer', call_result='').call_count, 0)
+        rollup = self._rollup(status='answered', call_result='no_time')
+        self.assertEqual(rollup.call_count, 1)
+        self.assertEqual(rollup.total_duration, 45)
+
+    def test_delete_decrements_rollup(self):
+        call = self._create_call(status='answered', call_result='interested', duration=20)
+        call.delete()
+        rollup = self._rollup(status='answered', call_result='interested')
+        self.assertEqual(rollup.call_count, 0)
+        self.assertEqual(rollup.total_duration, 0)
+
+    def test_rebuild_command(self):
+        self._create_call(status='answered', call_result='interested', duration=10)
+        self._create_call(status='no_answer')
+        CallDailyRollup.objects.all().delete()
+
+        call_command('rebuild_call_rollups', stdout=StringIO())
+
+        self.assertEqual(self._rollup(status='answered', call_result='interested').total_duration, 10)
+        self.assertEqual(self._rollup(status='no_answer', call_result='').call_count, 1)
+
+    def test_dashboard_reads_rollup(self):
+        self._create_call(status='answered', call_result='interested', duration=60)
+        self._create_call(status='no_answer')
+        # داشبورد فقط جدول خلاصه را می‌خواند، نه جدول تماس‌ها را
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/admin/dashboard/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([q for q in queries.captured_queries if 'call_center_call"' in q['sql']])
+        self.assertEqual(response.data['total_calls'], 2)
+        caller = response.data['callerPerformance'][0]
+        self.assertEqual(caller['total_calls'], 2)
+        self.assertEqual(caller['answered_calls'], 1)
+        self.assertEqual(caller['avg_call_duration_seconds'], 60.0)
+
+    def test_project_statistics_caller_performance_from_rollup(self):
+        self._create_call(status='answered', call_result='interested', duration=60)
+        self._create_call(status='answered', call_result='no_time', duration=30)
+        rows = get_caller_performance_rows(self.project, rollups=CallDailyRollup.objects.filter(project=self.project))
+        self.assertEqual(rows, get_caller_performance_rows(self.project))
+
+
+from django.core.cache import cache
+from django.test import override_settings
+
+
+class StatisticsCacheTestCase(ProjectFixtureMixin, TestCase):
+    """تست کش نسخه‌دار آمار و باطل شدن آن با تغییر داده‌ها"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(
+            username='cache_caller', phone_number='09120000600',
+            is_staff=True,
+        )
+        self.project = self.create_project('Cached', self.user)
+        self.other_project = Project.objects.create(name='Other', created_by=self.user)
+        self.contact = self.create_contact(self.project, '09330000600')
+
+    def _create_call(self, **kwargs):
+        return Call.objects.create(contact=self.contact, caller=self.user, project=self.project, **kwargs)
+
+    def test_repeated_statistics_hit_cache(self):
+        self._create_call(status='answered', call_result='interested')
+        self.assertEqual(self.project.get_statistics()['total_calls'], 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.project.get_statistics()['total_calls'], 1)
+
+    def test_call_write_invalidates_project(self):
+        self.assertEqual(self.project.get_statistics()['total_calls'], 0)
+        # نسخه کش پس از commit بالا می‌رود
+        with self.captureOnCommitCallbacks(execute=True):
+            call = self._create_call(status='answered')
+        self.assertEqual(self.project.get_statistics()['total_calls'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            call.delete()
+        self.assertEqual(self.project.get_statistics()['total_calls'], 0)
+
+    def test_invalidation_waits_for_commit(self):
+        self.project.get_statistics()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self._create_call(status='answered')
+        # تا commit نشده، درخواست همزمان همان نسخه قبلی را می‌بیند
+        self.assertEqual(self.project.get_statistics()['total_calls'], 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.project.get_statistics()['total_calls'], 1)
+
+    def test_contact_and_membership_writes_invalidate(self):
+        self.assertEqual(self.project.get_statistics()['total_contacts'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Contact.objects.create(project=self.project, full_name='Second', phone='09330000601')
+        self.assertEqual(self.project.get_statistics()['total_contacts'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectCaller.objects.create(project=self.project, caller=self.user)
+        self.assertEqual(self.project.get_statistics()['total_callers'], 1)
+
+    def test_other_project_stays_cached(self):
+        self.other_project.get_statistics()
+        self._create_call(status='answered')
+        with self.assertNumQueries(0):
+            self.other_project.get_statistics()
+
+    @override_settings(STATISTICS_CACHE_TTLS={'default': 0})
+    def test_ttl_is_configurable(self):
+        self.project.get_statistics()
+        with self.assertNumQueries(1):
+            self.project.get_statistics()
+
+    def test_dashboard_served_from_cache(self):
+        self._create_call(status='answered', call_result='interested')
+        client = APIClient()
+        client.force_authenticate(self.user)
+        first = client.get('/api/admin/dashboard/')
+        with CaptureQueriesContext(connection) as queries:
+            second = client.get('/api/admin/dashboard/')
+        self.assertEqual(first.data, second.data)
+        self.assertFalse([q for q in queries.captured_queries if 'call_center_calldailyrollup' in q['sql']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_call(status='no_answer')
+        self.assertEqual(client.get('/api/admin/dashboard/').data['total_calls'], 2)
+
+
+from datetime import date, timedelta
+from .services.dashboard import get_dashboard_snapshot
+
+
+class DashboardSnapshotTestCase(ProjectFixtureMixin, TestCase):
+    """تست سرویس تصویر داشبورد: تعداد ثابت کوئری و فیلترهای یکسان"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(username='snapshot_caller', phone_number='09120000700')
+        self.projects = []
+        for index in range(10):
+            project = Project.objects.create(name=f'Snapshot {index}', created_by=self.user)
+            ProjectMembership.objects.create(project=project, user=self.user, role='caller')
+            contact = self.create_contact(project, f'0933000070{index}')
+            Call.objects.create(contact=contact, caller=self.user, project=project,
+                                status='answered', call_result='interested', duration=40)
+            self.projects.append(project)
+        self.today = CallDailyRollup.objects.first().day
+
+    def test_bounded_query_count(self):
+        with self.assertNumQueries(5):
+            snapshot = get_dashboard_snapshot()
+        self.assertEqual(snapshot['total_projects'], 10)
+        self.assertEqual(snapshot['total_calls'], 10)
+        self.assertEqual(snapshot['total_callers'], 1)
+        self.assertEqual(snapshot['callerPerformance'][0]['project_count'], 10)
+
+    def test_date_filter_applies_to_all_sections(self):
+        CallDailyRollup.objects.filter(project=self.projects[0]).update(day=self.today - timedelta(days=30))
+        snapshot = get_dashboard_snapshot(start_date=self.today - timedelta(days=1))
+
+        self.assertEqual(snapshot['total_calls'], 9)
+        self.assertEqual(sum(row['calls'] for row in snapshot['callTrends']), 9)
+        self.assertEqual(snapshot['callerPerformance'][0]['total_calls'], 9)
+        stats = {row['id']: row for row in snapshot['projectStats']}
+        self.assertEqual(stats[self.projects[0].pk]['total_calls'], 0)
+        self.assertEqual(stats[self.projects[1].pk]['total_calls'], 1)
+
+    def test_project_and_scope_filters(self):
+        allowed = [self.projects[0].pk, self.projects[1].pk]
+        snapshot = get_dashboard_snapshot(allowed_project_ids=allowed)
+        self.assertEqual(snapshot['total_projects'], 2)
+        self.assertEqual(snapshot['total_calls'], 2)
+
+        snapshot = get_dashboard_snapshot(project_id=self.projects[1].pk, allowed_project_ids=allowed)
+        self.assertEqual([row['id'] for row in snapshot['projectStats']], [self.projects[1].pk])
+        self.assertEqual(snapshot['callStatusDistribution'][0], {'name': 'interested', 'count': 1})
+
+
+from persiantools.jdatetime import JalaliDate
+from .services.dashboard import get_admin_dashboard_snapshot
+from .utils import parse_report_date
+
+
+class AdminDashboardTestCase(ProjectFixtureMixin, TestCase):
+    """تست داشبورد مدیریت: GET با بازه تاریخ و توزیع کلیدخورده با کد نتیجه"""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user(username='dashboard_admin', phone_number='09120000800', is_staff=True)
+        self.callers = []
+        for index in range(3):
+            caller = self.create_user(username=f'dashboard_caller_{index}', phone_number=f'0912000081{index}')
+            project = Project.objects.create(name=f'Admin {index}', created_by=self.admin)
+            ProjectMembership.objects.create(project=project, user=caller, role='caller')
+            contact = self.create_contact(project, f'0933000080{index}')
+            Call.objects.create(contact=contact, caller=caller, project=project,
+                                status='answered', call_result='interested', duration=120)
+            Call.objects.create(contact=contact, caller=caller, project=project, status='no_answer')
+            self.callers.append(caller)
+        self.authenticate(self.admin)
+
+    def test_grouped_queries(self):
+        with self.assertNumQueries(4):
+            data = get_admin_dashboard_snapshot()
+        self.assertEqual(data['total_projects'], 3)
+        self.assertEqual(data['total_calls'], 6)
+        self.assertEqual(data['total_callers'], 3)
+        self.assertEqual(data['success_rate'], 50.0)
+        self.assertEqual(data['callerPerformance'][0]['avg_duration'], 2.0)
+
+    def test_projects_with_same_name_stay_separate(self):
+        original = Project.objects.get(name='Admin 0')
+        twin = Project.objects.create(name='Admin 0', created_by=self.admin)
+        # زمان ساخت یکسان؛ فقط id دو پروژه را از هم جدا می‌کند
+        Project.objects.filter(pk=twin.pk).update(created_at=original.created_at)
+        data = get_admin_dashboard_snapshot()
+        self.assertEqual(data['total_projects'], 4)
+        twins = sorted(
+            (row['id'], row['total_calls']) for row in data['projectStats'] if row['name'] == 'Admin 0'
+        )
+        self.assertEqual([total for _, total in twins], [2, 0])
+
+    def test_distribution_keyed_by_result(self):
+        data = self.client.get('/api/admin/dashboard-data/').data['data']
+        distribution = data['callStatusDistribution']
+        self.assertEqual(distribution['interested']['count'], 3)
+        self.assertEqual(distribution['no_time']['count'], 0)
+        self.assertEqual(distribution['no_result']['count'], 3)
+        self.assertEqual(data['intersted_rate'], 50.0)
+
+    def test_jalali_and_gregorian_dates(self):
+        today = CallDailyRollup.objects.first().day
+        self.assertEqual(parse_report_date(str(JalaliDate(today)).replace('-', '/')), today)
+
+        response = self.client.get('/api/admin/dashboard-data/', {'start_date': str(JalaliDate(today))})
+        self.assertEqual(response.data['data']['total_calls'], 6)
+        self.assertIn('max-age', response['Cache-Control'])
+
+        tomorrow = (today + timedelta(days=1)).isoformat()
+        response = self.client.get('/api/admin/dashboard-data/', {'start_date': tomorrow})
+        self.assertEqual(response.data['data']['total_calls'], 0)
+        self.assertEqual(response.data['data']['projectStats'][0]['total_calls'], 0)
+
+    def test_invalid_date_and_permissions(self):
+        response = self.client.get('/api/admin/dashboard-data/', {'start_date': '1404-13-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.callers[0])
+        response = self.client.get('/api/admin/dashboard-data/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+from django.utils import timezone
+from .services.rollups import ROLLUP_TIME_ZONE
+from .services.timeseries import MAX_BUCKETS, get_time_series
+
+
+class CallTimeSeriesTestCase(ProjectFixtureMixin, TestCase):
+    """تست سری زمانی تماس‌ها: بازه‌بندی، پر کردن بازه‌های خالی و ماه شمسی"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(username='series_caller', phone_number='09120000900')
+        self.project = self.create_project('Series', self.user)
+
+    def _rollup(self, day, count, call_result='interested'):
+        CallDailyRollup.objects.create(
+            project=self.project, caller=self.user, day=day, status='answered',
+            call_result=call_result, call_count=count,
+        )
+
+    def test_daily_gap_filling(self):
+        self._rollup(date(2025, 3, 1), 2)
+        self._rollup(date(2025, 3, 4), 1, call_result='no_time')
+        with self.assertNumQueries(1):
+            series = get_time_series(CallDailyRollup.objects.all(), 'day')
+        self.assertEqual([row['date'] for row in series], [date(2025, 3, day) for day in range(1, 5)])
+        self.assertEqual([row['total_calls'] for row in series], [2, 0, 0, 1])
+        self.assertEqual(series[3]['no_time'], 1)
+
+    def test_months_do_not_collapse_across_years(self):
+        self._rollup(date(2024, 3, 10), 1)
+        self._rollup(date(2025, 3, 10), 3)
+        series = get_time_series(
+            CallDailyRollup.objects.all(), 'month', date(2024, 2, 1), date(2025, 3, 31)
+        )
+        self.assertEqual(len(series), 14)
+        self.assertEqual(series[1], {
+            'date': date(2024, 3, 1), 'start_date': date(2024, 3, 1), 'total_calls': 1,
+            'interested': 1, 'no_time': 0, 'not_interested': 0, 'no_result': 0,
+        })
+        self.assertEqual(series[-1]['total_calls'], 3)
+
+    def test_weeks_start_on_monday(self):
+        self._rollup(date(2025, 3, 5), 1)  # چهارشنبه
+        self._rollup(date(2025, 3, 9), 1)  # یکشنبه همان هفته
+        series = get_time_series(CallDailyRollup.objects.all(), 'week')
+        self.assertEqual(series, [{
+            'date': date(2025, 3, 3), 'start_date': date(2025, 3, 3), 'total_calls': 2,
+            'interested': 2, 'no_time': 0, 'not_interested': 0, 'no_result': 0,
+        }])
+
+    def test_jalali_month_buckets(self):
+        self._rollup(date(2025, 3, 20), 1)  # ۲۹ اسفند ۱۴۰۳
+        self._rollup(date(2025, 3, 21), 2)  # ۱ فروردین ۱۴۰۴
+        self._rollup(date(2025, 5, 21), 4)  # ۳۱ اردیبهشت ۱۴۰۴
+        series = get_time_series(CallDailyRollup.objects.all(), 'jalali_month')
+        self.assertEqual(
+            [(row['date'], row['total_calls']) for row in series],
+            [('1403-12', 1), ('1404-01', 2), ('1404-02', 4)],
+        )
+        self.assertEqual(series[1]['start_date'], date(2025, 3, 21))
+
+    def test_calls_path_matches_rollup_path(self):
+        contact = self.create_contact(self.project, '09330000900')
+        Call.objects.create(contact=contact, caller=self.user, project=self.project,
+                            status='answered', call_result='interested')
+        Call.objects.create(contact=contact, caller=self.user, project=self.project, status='no_answer')
+        self.assertEqual(
+            get_time_series(Call.objects.all(), 'month'),
+            get_time_series(CallDailyRollup.objects.all(), 'month'),
+        )
+
+    def test_project_call_status_over_time(self):
+        self._rollup(date(2025, 3, 1), 2)
+        data = self.project.get_call_status_over_time(date(2025, 3, 1), date(2025, 3, 3), 'day')
+        self.assertEqual([row['total_calls'] for row in data], [2, 0, 0])
+
+    def test_bucket_count_is_capped(self):
+        self._rollup(date(2000, 1, 1), 1)
+        self._rollup(date(2025, 3, 1), 2)
+        # بدون start_date فقط آخرین MAX_BUCKETS بازه برگردانده می‌شود
+        series = get_time_series(CallDailyRollup.objects.all(), 'day')
+        self.assertEqual(len(series), MAX_BUCKETS)
+        self.assertEqual(series[-1]['date'], date(2025, 3, 1))
+        self.assertEqual(len(get_time_series(CallDailyRollup.objects.all(), 'jalali_month')), 303)
+
+        with self.assertRaises(ValueError):
+            get_time_series(CallDailyRollup.objects.all(), 'day', date(2000, 1, 1), date(2025, 3, 1))
+        self.assertEqual(
+            len(get_time_series(CallDailyRollup.objects.all(), 'month', date(2000, 1, 1), date(2025, 3, 1))), 303
+        )
+
+    def test_open_range_without_data_is_zero_filled_to_today(self):
+        today = timezone.localdate(timezone=ROLLUP_TIME_ZONE)
+        start = today - timedelta(days=6)
+        series = get_time_series(CallDailyRollup.objects.all(), 'day', start)
+        self.assertEqual([row['date'] for row in series], [start + timedelta(days=day) for day in range(7)])
+        self.assertEqual({row['total_calls'] for row in series}, {0})
+        # همان بازه‌ای که اعتبارسنجی شده برگردانده می‌شود
+        self.assertEqual(
+            len(self.project.get_call_status_over_time(today - timedelta(days=MAX_BUCKETS - 1), None, 'day')),
+            MAX_BUCKETS,
+        )
+
+    def test_oversized_range_is_rejected(self):
+        ProjectMembership.objects.create(project=self.project, user=self.user, role='admin')
+        self.user.is_staff = True
+        self.user.save()
+        self.authenticate(self.user)
+        params = {'start_date': '2000-01-01', 'end_date': '2025-03-01', 'interval': 'day'}
+        for path in (
+            '/api/admin/dashboard/', '/api/admin/dashboard-data/',
+            f'/api/projects/{self.project.pk}/call_status_over_time/',
+        ):
+            response = self.client.get(path, params)
+            self.assertEqual(response.status_code, 400, path)
+            self.assertIn('too large', response.data['error'])
+        # بدون end_date بازه تا امروز حساب می‌شود
+        response = self.client.get('/api/admin/dashboard/', {'start_date': '2000-01-01'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/admin/dashboard/', {'start_date': '2000-01-01', 'interval': 'month'})
+        self.assertEqual(response.status_code, 200)
+        with self.assertRaises(ValueError):
+            self.project.get_call_status_over_time(interval='year')
+
+
+class ContactStatisticsTestCase(ProjectFixtureMixin, TestCase):
+    """تست آمار وضعیت مخاطبین: یک aggregate و کش به ازای (پروژه، کاربر)"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(username='contact_stats_caller', phone_number='09120001000')
+        self.project = self.create_project('Contact stats', self.user, role='admin')
+        self.contacts = [
+            Contact.objects.create(project=self.project, full_name=f'Contact {index}', phone=f'0933000100{index}')
+            for index in range(3)
+        ]
+        self.authenticate(self.user)
+
+    def _statistics(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/contacts/statistics/', {'project_id': self.project.pk})
+        # فقط SELECT های جدول مخاطبین شمرده می‌شوند
+        contact_queries = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "call_center_contact"' in q['sql']
+        ]
+        return response.data, contact_queries
+
+    def test_single_aggregate_then_cache(self):
+        data, contact_queries = self._statistics()
+        self.assertEqual(len(contact_queries), 1)
+        self.assertEqual(data['total_contacts'], 3)
+        self.assertEqual(data['pending_contacts'], 3)
+        self.assertEqual(data['unassigned'], 3)
+
+        _, contact_queries = self._statistics()
+        self.assertEqual(contact_queries, [])
+
+    def test_status_and_assignment_changes_invalidate(self):
+        self._statistics()
+        contact = Contact.objects.get(pk=self.contacts[0].pk)
+        contact.assigned_caller = self.user
+        with self.captureOnCommitCallbacks(execute=True):
+            contact.save()
+        data, _ = self._statistics()
+        self.assertEqual(data['assigned_to_me'], 1)
+
+        contact.call_status = 'answered'
+        with self.captureOnCommitCallbacks(execute=True):
+            contact.save()
+        data, _ = self._statistics()
+        self.assertEqual(data['pending_contacts'], 2)
+
+    def test_unrelated_edit_keeps_cache(self):
+        self._statistics()
+        contact = Contact.objects.get(pk=self.contacts[0].pk)
+        contact.full_name = 'Renamed'
+        contact.save()
+        _, contact_queries = self._statistics()
+        self.assertEqual(contact_queries, [])
+
+
+from .models import GlobalCounter
+from .services.counters import get_global_counts, reconcile_global_counters, estimate_table_count
+
+
+class GlobalCounterTestCase(ProjectFixtureMixin, TestCase):
+    """تست شمارنده‌های سراسری، حذف زنجیره‌ای و تسک همگام‌سازی"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(username='counter_caller', phone_number='09120001100')
+        self.project = self.create_project('Counters', self.user)
+        self.contact = self.create_contact(self.project, '09330001100')
+
+    def _create_call(self, **kwargs):
+        return Call.objects.create(contact=self.contact, caller=self.user, project=self.project, **kwargs)
+
+    def _counts(self):
+        counts = get_global_counts()
+        return (
+            counts['projects'], counts['calls'],
+            counts['calls_status_answered'], counts['calls_status_pending'],
+        )
+
+    def test_counters_follow_writes(self):
+        call = self._create_call(status='pending')
+        self._create_call(status='answered')
+        self.assertEqual(self._counts(), (1, 2, 1, 1))
+
+        call = Call.objects.get(pk=call.pk)
+        call.status = 'answered'
+        call.save()
+        self.assertEqual(self._counts(), (1, 2, 2, 0))
+
+        call.delete()
+        self.assertEqual(self._counts(), (1, 1, 1, 0))
+
+    def test_cascade_delete_is_counted(self):
+        self._create_call(status='answered', call_result='interested')
+        self.contact.delete()
+        self.assertEqual(self._counts(), (1, 0, 0, 0))
+        self.assertEqual(CallDailyRollup.objects.get(project=self.project).call_count, 0)
+
+        self.project.delete()
+        self.assertEqual(self._counts(), (0, 0, 0, 0))
+
+    def test_cascade_delete_is_aggregated(self):
+        for index in range(10):
+            self._create_call(status='answered' if index % 2 else 'pending', duration=30)
+        other = self.create_contact(self.project, '09330001101')
+        Call.objects.create(contact=other, caller=self.user, project=self.project, status='answered')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.contact.delete()
+        # تماس‌های مخاطب با GROUP BY کم می‌شوند، نه با UPDATE جداگانه برای هر تماس
+        counter_updates = [
+            q for q in queries.captured_queries if q['sql'].startswith('UPDATE "call_center_globalcounter"')
+        ]
+        self.assertEqual(len(counter_updates), 3)
+        self.assertEqual(self._counts(), (1, 1, 1, 0))
+        self.assertEqual(
+            sum(CallDailyRollup.objects.filter(project=self.project).values_list('call_count', flat=True)), 1
+        )
+        self.assertEqual(
+            sum(CallDailyRollup.objects.filter(project=self.project).values_list('total_duration', flat=True)), 0
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.project.delete()
+        self.assertEqual(self._counts(), (0, 0, 0, 0))
+        self.assertFalse([q for q in queries.captured_queries if 'UPDATE "call_center_callstatistics"' in q['sql']])
+
+    def test_deleting_caller_updates_statistics(self):
+        # حذف کاربر از مسیر ردیف به ردیف تماس‌ها کم می‌شود
+        caller = self.create_user(username='counter_other', phone_number='09120001101')
+        self._create_call(status='answered')
+        Call.objects.create(contact=self.contact, caller=caller, project=self.project, status='pending')
+        caller.delete()
+        self.assertEqual(self._counts(), (1, 1, 1, 0))
+        self.assertEqual(CallStatistics.objects.get(contact=self.contact).total_calls, 1)
+
+    def test_reconcile_fixes_drift(self):
+        self._create_call(status='answered')
+        GlobalCounter.objects.filter(name='calls').update(value=42)
+        GlobalCounter.objects.filter(name='calls_status_pending').delete()
+
+        changed = reconcile_global_counters()
+
+        self.assertEqual(changed['calls'], 1)
+        self.assertEqual(changed['calls_status_pending'], 0)
+        self.assertNotIn('calls_status_answered', changed)
+        self.assertEqual(self._counts(), (1, 1, 1, 0))
+
+    def test_dashboard_stats_reads_counters(self):
+        self._create_call(status='answered')
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/main_dashboard', {'estimated': 'true'})
+        self.assertFalse([q for q in queries.captured_queries if 'FROM "call_center_call"' in q['sql']])
+        self.assertEqual(response.data, {
+            'project_count': 1, 'calls_count': 1, 'answered_calls_count': 1, 'pending_calls_count': 0,
+        })
+        # خارج از PostgreSQL تخمین در دسترس نیست و مقدار شمارنده برگردانده می‌شود
+        self.assertIsNone(estimate_table_count(Call))
+
+
+class ContactCallCountersTestCase(ProjectFixtureMixin, TestCase):
+    """تست شمارنده‌های تماس مخاطب از annotate کوئری‌ست (بین پروژه‌ها بر اساس شماره تلفن)"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(username='counters_admin', phone_number='09120001200')
+        self.project = self.create_project('Counters A', self.user, role='admin')
+        other_project = self.create_project('Counters B', self.user)
+
+        self.contact = Contact.objects.create(project=self.project, full_name='Shared', phone='09330001200')
+        other_contact = Contact.objects.create(project=other_project, full_name='Shared', phone='09330001200')
+        for index in range(4):
+            Contact.objects.create(project=self.project, full_name=f'Contact {index}', phone=f'0933000121{index}')
+
+        Call.objects.create(contact=self.contact, caller=self.user, project=self.project, status='answered')
+        Call.objects.create(contact=self.contact, caller=self.user, project=self.project, status='no_answer')
+        Call.objects.create(contact=other_contact, caller=self.user, project=other_project, status='answered')
+
+        self.authenticate(self.user)
+
+    def test_list_reads_annotated_counters(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/contacts/', {'project_id': self.project.pk})
+        self.assertEqual(response.status_code, 200)
+
+        # هیچ COUNT جداگانه‌ای به ازای هر ردیف روی تماس‌های یک شماره تلفن زده نمی‌شود
+        count_queries = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('SELECT COUNT') and '"call_center_contact"."phone" =' in q['sql']
+        ]
+        self.assertEqual(count_queries, [])
+
+        rows = response.data['results'] if isinstance(response.data, dict) else response.data
+        shared = next(row for row in rows if row['id'] == self.contact.pk)
+        self.assertEqual(shared['contact_calls_count'], 3)
+        self.assertEqual(shared['contacts_calls_answered_count'], 2)
+        self.assertEqual(shared['contact_calls_not_answered_count'], 1)
+        self.assertEqual(shared['contacts_calls_rate'], 66)
+
+        other = next(row for row in rows if row['id'] != self.contact.pk)
+        self.assertEqual(other['contact_calls_count'], 0)
+        self.assertEqual(other['contacts_calls_rate'], 0.0)
+
+    def test_serializer_without_annotations(self):
+        from .serializers import ContactSerializer
+
+        data = ContactSerializer(self.contact).data
+        self.assertEqual(data['contact_calls_count'], 3)
+        self.assertEqual(data['contacts_calls_answered_count'], 2)
+
+
+from .models import Question, AnswerChoice, CallAnswer
+
+
+class ContactCallNotesPrefetchTestCase(ProjectFixtureMixin, TestCase):
+    """تست پیش‌بارگذاری پنجره‌ای یادداشت‌های اخیر مخاطبین صفحه"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(username='notes_admin', phone_number='09120001300')
+        self.project = self.create_project('Notes', self.user, role='admin')
+        self.question = Question.objects.create(project=self.project, text='Question')
+        self.choice = AnswerChoice.objects.create(question=self.question, text='Choice')
+        self.authenticate(self.user)
+
+    def _add_contacts(self, count, calls_per_contact=7):
+        start = Contact.objects.count()
+        for index in range(start, start + count):
+            contact = Contact.objects.create(
+                project=self.project, full_name=f'Contact {index}', phone=f'093300013{index:02d}'
+            )
+            for call_index in range(calls_per_contact):
+                call = Call.objects.create(
+                    contact=contact, caller=self.user, project=self.project,
+                    status='answered', notes=f'Note {call_index}',
+                )
+                CallAnswer.objects.create(call=call, question=self.question, selected_choice=self.choice)
+
+    def _notes_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/contacts/', {'project_id': self.project.pk})
+        self.assertEqual(response.status_code, 200)
+        rows = response.data['results'] if isinstance(response.data, dict) else response.data
+        tables = ('"call_center_callanswer"', '"call_center_question"', '"call_center_answerchoice"')
+        notes_queries = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('SELECT') and (
+                'ROW_NUMBER' in q['sql'] or any(f'FROM {table}' in q['sql'] for table in tables)
+            )
+        ]
+        return rows, notes_queries
+
+    def test_latest_notes_in_constant_queries(self):
+        self._add_contacts(2)
+        rows, small_page_queries = self._notes_queries()
+        notes = rows[0]['call_notes']
+        self.assertEqual([note['note'] for note in notes], [f'Note {index}' for index in range(6, 1, -1)])
+        self.assertEqual(notes[0]['answers'], [{'question_text': 'Question', 'selected_choice_text': 'Choice'}])
+
+        self._add_contacts(4)
+        rows, large_page_queries = self._notes_queries()
+        self.assertEqual(len(rows), 6)
+        self.assertTrue(all(len(row['call_notes']) == 5 for row in rows))
+        self.assertEqual(len(large_page_queries), len(small_page_queries))
+        self.assertEqual(len(large_page_queries), 2)
+
+
+from django.test import RequestFactory
+from .services.memberships import get_project_role, has_project_role
+
+
+class MembershipMapTestCase(ProjectFixtureMixin, TestCase):
+    """تست نقشه عضویت‌های درخواست که بین سریالایزر و کلاس‌های دسترسی مشترک است"""
+
+    def setUp(self):
+        super().setUp()
+        self.caller = self.create_user(username='membership_caller', phone_number='09120001400')
+        self.project = self.create_project('Memberships', self.caller, role='caller')
+        self.contacts = [
+            Contact.objects.create(
+                project=self.project, full_name=f'Contact {index}', phone=f'093300014{index:02d}',
+                assigned_caller=self.caller if index % 2 == 0 else None,
+            )
+            for index in range(6)
+        ]
+        self.authenticate(self.caller)
+
+    def _membership_queries(self, path, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        membership_queries = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "call_center_projectmembership"' in q['sql']
+        ]
+        return response.data, membership_queries
+
+    def test_list_loads_memberships_once(self):
+        data, membership_queries = self._membership_queries('/api/contacts/', {'project_id': self.project.pk})
+        rows = data['results'] if isinstance(data, dict) else data
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(row['can_call'] for row in rows))
+        self.assertEqual(len(membership_queries), 1)
+
+    def test_detail_shares_map_with_permissions(self):
+        contact = self.contacts[0]
+        data, membership_queries = self._membership_queries(f'/api/contacts/{contact.pk}/')
+        self.assertTrue(data['can_call'])
+        self.assertEqual(len(membership_queries), 1)
+
+    def test_role_priority(self):
+        ProjectMembership.objects.create(project=self.project, user=self.caller, role='admin')
+        request = RequestFactory().get('/')
+        request.user = self.caller
+        self.assertEqual(get_project_role(request, self.project.pk), 'admin')
+        self.assertTrue(has_project_role(request, self.project.pk, ['caller']))
+        self.assertFalse(has_project_role(request, self.project.pk + 1))
+
+
+class CallAnswersSummaryTestCase(ProjectFixtureMixin, TestCase):
+    """تست هیستوگرام پاسخ‌های پروژه و برگرداندن اختیاری آن در لیست پروژه‌ها"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(username='answers_admin', phone_number='09120001500')
+        self.project = self.create_project('Answers', self.user, role='admin')
+        self.question = Question.objects.create(project=self.project, text='Question')
+        self.yes = AnswerChoice.objects.create(question=self.question, text='Yes')
+        self.no = AnswerChoice.objects.create(question=self.question, text='No')
+        self.contact = self.create_contact(self.project, '09330001500')
+        for choice in (self.yes, self.yes, None):
+            self._answer(choice)
+        self.authenticate(self.user)
+
+    def _answer(self, choice):
+        call = Call.objects.create(contact=self.contact, caller=self.user, project=self.project, status='answered')
+        return CallAnswer.objects.create(call=call, question=self.question, selected_choice=choice)
+
+    def test_histogram(self):
+        summary = self.project.get_call_answers_summary()
+        self.assertEqual(summary, [{
+            'question': {'id': self.question.pk, 'text': 'Question'},
+            'total_answers': 3,
+            'no_choice_count': 1,
+            'choices': [
+                {'id': self.yes.pk, 'text': 'Yes', 'count': 2},
+                {'id': self.no.pk, 'text': 'No', 'count': 0},
+            ],
+        }])
+
+        # پاسخ جدید کش پروژه را باطل می‌کند
+        with self.captureOnCommitCallbacks(execute=True):
+            self._answer(self.no)
+        choices = self.project.get_call_answers_summary()[0]['choices']
+        self.assertEqual([choice['count'] for choice in choices], [2, 1])
+
+    def test_list_include_is_opt_in(self):
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('call_answers_summary', response.data['results'][0])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/projects/', {'include': 'call_answers_summary'})
+        summary = response.data['results'][0]['call_answers_summary']
+        self.assertEqual(summary[0]['total_answers'], 3)
+        answer_queries = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "call_center_callanswer"' in q['sql']
+        ]
+        self.assertEqual(len(answer_queries), 1)
+
+        response = self.client.get(f'/api/projects/{self.project.pk}/')
+        self.assertEqual(response.data['call_answers_summary'][0]['no_choice_count'], 1)
+
+
+class SparseFieldsetTestCase(ProjectFixtureMixin, TestCase):
+    """تست ?fields= و ?expand= روی سریالایزرهای پروژه، مخاطب و تماس"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(username='sparse_admin', phone_number='09120001600')
+        self.project = self.create_project('Sparse', self.user, role='admin')
+        self.contact = self.create_contact(self.project, '09330001600')
+        Call.objects.create(
+            contact=self.contact, caller=self.user, project=self.project, status='answered', notes='Note'
+        )
+        self.authenticate(self.user)
+
+    def _get(self, path, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        rows = response.data['results'] if isinstance(response.data, dict) and 'results' in response.data else response.data
+        selects = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        return rows, selects
+
+    def test_lean_contact_payload_skips_call_queries(self):
+        rows, selects = self._get('/api/contacts/', {
+            'project_id': self.project.pk, 'fields': 'id,full_name,call_status',
+        })
+        self.assertEqual(set(rows[0]), {'id', 'full_name', 'call_status'})
+        self.assertFalse([sql for sql in selects if '"call_center_call"' in sql])
+
+        rows, _ = self._get('/api/contacts/', {'project_id': self.project.pk})
+        self.assertEqual(rows[0]['contact_calls_count'], 1)
+        self.assertEqual(len(rows[0]['call_notes']), 1)
+
+    def test_project_fields_and_expand(self):
+        rows, selects = self._get('/api/projects/', {'fields': 'id,name', 'expand': 'call_answers_summary'})
+        self.assertEqual(set(rows[0]), {'id', 'name', 'call_answers_summary'})
+        self.assertFalse([sql for sql in selects if '"call_center_projectmembership"."assigned_at"' in sql])
+
+    def test_call_fields(self):
+        rows, selects = self._get('/api/calls/', {'fields': 'id,status,persian_call_date'})
+        self.assertEqual(set(rows[0]), {'id', 'status', 'persian_call_date'})
+        self.assertFalse([sql for sql in selects if 'FROM "call_center_contact"' in sql])
+
+
+class CallFlatRepresentationTestCase(ProjectFixtureMixin, TestCase):
+    """تست نمایش تخت تماس‌ها و نسخه تو در تو فقط با ?expand="""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(
+            username='flat_caller', phone_number='09120001700',
+            first_name='Ali', last_name='Caller',
+        )
+        self.project = self.create_project('Flat', self.user, role='caller')
+        self.authenticate(self.user)
+
+    def _add_calls(self, count):
+        start = Contact.objects.count()
+        for index in range(start, start + count):
+            contact = Contact.objects.create(
+                project=self.project, full_name=f'Contact {index}', phone=f'093300017{index:02d}'
+            )
+            Call.objects.create(contact=contact, caller=self.user, project=self.project, status='answered')
+
+    def _list(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/calls/', params)
+        self.assertEqual(response.status_code, 200)
+        selects = [q for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        return response.data['results'], selects
+
+    def test_flat_list_in_constant_queries(self):
+        self._add_calls(2)
+        rows, small_selects = self._list()
+        self.assertNotIn('contact', rows[0])
+        self.assertNotIn('project', rows[0])
+        self.assertEqual(rows[0]['project_name'], 'Flat')
+        self.assertEqual(rows[0]['caller_name'], 'Ali Caller')
+        self.assertTrue(rows[0]['contact_name'].startswith('Contact'))
+
+        self._add_calls(5)
+        rows, large_selects = self._list()
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(len(large_selects), len(small_selects))
+
+    def test_expand_returns_nested_objects(self):
+        self._add_calls(1)
+        rows, _ = self._list({'expand': 'contact,caller'})
+        self.assertEqual(rows[0]['contact']['full_name'], 'Contact 0')
+        self.assertEqual(rows[0]['caller']['username'], 'flat_caller')
+        self.assertNotIn('project', rows[0])
+
+
+from datetime import datetime as dt_datetime, timezone as dt_timezone
+from django.test import SimpleTestCase
+from .utils import format_jalali_date, format_jalali_dates
+
+
+class JalaliDateFormattingTestCase(SimpleTestCase):
+    """تست تبدیل cache شده و دسته‌ای تاریخ شمسی"""
+
+    def test_matches_jalali_date(self):
+        moment = dt_datetime(2025, 3, 21, 23, 59)
+        self.assertEqual(format_jalali_date(moment), '1404-01-01')
+        self.assertEqual(format_jalali_date(moment.date()), str(JalaliDate(moment.date())))
+        self.assertIsNone(format_jalali_date(None))
+
+    def test_batch_keeps_order_and_blanks(self):
+        values = [date(2025, 3, 21), None, dt_datetime(2025, 3, 20, 8), date(2025, 3, 21)]
+        self.assertEqual(
+            format_jalali_dates(values),
+            ['1404-01-01', None, '1403-12-30', '1404-01-01'],
+        )
+
+
+import tracemalloc
+
+
+class ProjectListBudgetTestCase(ProjectFixtureMixin, TestCase):
+    """سقف تعداد کوئری و حافظه برای لیست ۵۰ پروژه با تماس و پاسخ"""
+
+    PROJECT_COUNT = 50
+    CALLS_PER_PROJECT = 10
+    # سقف کوئری‌های SELECT هر صفحه (مستقل از تعداد پروژه‌ها و تماس‌ها)
+    MAX_QUERIES_PER_PAGE = 8
+    # سقف اوج حافظه پایتون برای خواندن همه صفحه‌ها
+    MAX_PEAK_MEMORY = 8 * 1024 * 1024
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = cls.create_user(username='budget_admin', phone_number='09120001800')
+        caller = cls.create_user(username='budget_caller', phone_number='09120001801')
+        for project_index in range(cls.PROJECT_COUNT):
+            project = Project.objects.create(name=f'Budget {project_index}', created_by=cls.user)
+            ProjectMembership.objects.create(project=project, user=cls.user, role='admin')
+            ProjectMembership.objects.create(project=project, user=caller, role='caller')
+            question = Question.objects.create(project=project, text='Question')
+            choice = AnswerChoice.objects.create(question=question, text='Choice')
+            contact = Contact.objects.create(
+                project=project, full_name='Contact', phone=f'0933002{project_index:04d}'
+            )
+            for _ in range(cls.CALLS_PER_PROJECT):
+                call = Call.objects.create(contact=contact, caller=caller, project=project, status='answered')
+                CallAnswer.objects.create(call=call, question=question, selected_choice=choice)
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate(self.user)
+
+    def test_list_query_and_memory_budget(self):
+        seen = 0
+        page = 1
+        tracemalloc.start()
+        try:
+            while True:
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get('/api/projects/', {'page': page})
+                self.assertEqual(response.status_code, 200)
+                selects = [q for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+                self.assertLessEqual(len(selects), self.MAX_QUERIES_PER_PAGE)
+                # هیچ تماس یا پاسخی برای لیست بارگذاری نمی‌شود
+                self.assertFalse([
+                    q for q in selects
+                    if 'FROM "call_center_call"' in q['sql'] or 'FROM "call_center_callanswer"' in q['sql']
+                ])
+                seen += len(response.data['results'])
+                if not response.data['next']:
+                    break
+                page += 1
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(seen, self.PROJECT_COUNT)
+        self.assertLess(peak, self.MAX_PEAK_MEMORY)
+
+    def test_reporting_actions_skip_prefetches(self):
+        project = Project.objects.get(name='Budget 0')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/projects/{project.pk}/statistics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([
+            q for q in queries.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "call_center_projectmembership"' in q['sql']
+            and '"call_center_customuser"' in q['sql']
+        ])
+
+
+import json
+from decimal import Decimal
+from django.test import SimpleTestCase
+from django.conf import settings as django_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from .renderers import FastJSONRenderer
+
+
+class FastJSONRendererTestCase(SimpleTestCase):
+    """تست رندر JSON با orjson و هم‌خوانی آن با JSONRenderer خود DRF"""
+
+    def test_matches_drf_renderer(self):
+        data = {
+            'amount': Decimal('12.50'),
+            'day': date(2025, 3, 21),
+            'moment': dt_datetime(2025, 3, 21, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'label': gettext_lazy('pending'),
+            'name': 'مخاطب',
+            1: 'non-string key',
+        }
+        fast = FastJSONRenderer().render(data, 'application/json', {})
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data, 'application/json', {})))
+        self.assertEqual(json.loads(fast)['moment'], '2025-03-21T09:30:15.123456Z')
+
+    def test_indent_falls_back_to_drf(self):
+        rendered = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2', {})
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_production_profile_drops_browsable_api(self):
+        production = django_settings.API_RENDERER_PROFILES['production']
+        self.assertNotIn('rest_framework.renderers.BrowsableAPIRenderer', production)
+        self.assertEqual(production[0], 'call_center.renderers.FastJSONRenderer')
+
+
+class ValuesReadPathTestCase(ProjectFixtureMixin, TestCase):
+    """تست یکسان بودن خروجی مسیر values() با مسیر سریالایزر در لیست مخاطبین و تماس‌ها"""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user(
+            username='values_admin', phone_number='09120002000',
+            first_name='Sara', last_name='Admin',
+        )
+        self.caller = self.create_user(username='values_caller', phone_number='09120002001')
+        self.project = self.create_project('Values', self.admin, role='admin')
+        ProjectMembership.objects.create(project=self.project, user=self.caller, role='caller')
+        question = Question.objects.create(project=self.project, text='Interested?')
+        choice = AnswerChoice.objects.create(question=question, text='Yes')
+        other = Question.objects.create(project=self.project, text='Budget?')
+
+        for index in range(4):
+            contact = Contact.objects.create(
+                project=self.project, full_name=f'Values {index}', phone=f'0933000200{index}',
+                assigned_caller=self.caller if index % 2 else None,
+                custom_fields={'city': 'Tehran', 'index': index}, created_by=self.admin,
+                birth_date=date(1990, 1, index + 1) if index else None,
+            )
+            for call_index in range(index + 1):
+                call = Call.objects.create(
+                    contact=contact, project=self.project,
+                    caller=self.caller if call_index % 2 else self.admin,
+                    call_result='answered' if call_index % 2 else 'no_answer',
+                    status='answered' if call_index % 2 else 'no_answer',
+                    notes=f'note {call_index}' if call_index != 1 else '',
+                    duration=30 * call_index, original_data={'row': call_index},
+                )
+                CallAnswer.objects.create(call=call, question=question, selected_choice=choice)
+                CallAnswer.objects.create(call=call, question=other, selected_choice=None)
+
+        self.authenticate(self.admin)
+
+    def _get(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def _assert_same_output(self, url, params=None):
+        params = dict(params or {})
+        values = self._get(url, {**params, 'read_path': 'values'})
+        serialized = self._get(url, {**params, 'read_path': 'serializer'})
+        self.assertTrue(values['results'])
+        self.assertEqual(values, serialized)
+        return values['results']
+
+    def test_contacts_match_serializer(self):
+        rows = self._assert_same_output('/api/contacts/', {'project_id': self.project.pk})
+        self.assertEqual(rows[3]['call_statistics']['total_calls'], 4)
+        self.assertEqual(len(rows[3]['call_notes']), 3)
+        self.assertEqual(rows[1]['assigned_caller'], 'values_caller')
+
+    def test_contacts_sparse_fields_match_serializer(self):
+        rows = self._assert_same_output(
+            '/api/contacts/', {'project_id': self.project.pk, 'fields': 'id,phone,contacts_calls_rate'}
+        )
+        self.assertEqual(set(rows[0]), {'id', 'phone', 'contacts_calls_rate'})
+
+    def test_calls_match_serializer(self):
+        self.admin.is_staff = True
+        self.admin.save()
+        rows = self._assert_same_output('/api/calls/')
+        self.assertNotIn('selected_choice_text', rows[0]['answers'][1])
+        self.assertEqual(rows[0]['answers'][0]['selected_choice_text'], 'Yes')
+
+    def test_values_path_skips_serializer_queries(self):
+        self.admin.is_staff = True
+        self.admin.save()
+        with CaptureQueriesContext(connection) as queries:
+            self._get('/api/calls/', {'read_path': 'values'})
+        selects = [q for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        # شمارش، صفحه تماس‌ها و پاسخ‌ها (به علاوه کوئری‌های احراز هویت ثابت)
+        self.assertLessEqual(len(selects), 4)
+
+    def test_expand_falls_back_to_serializer(self):
+        self.admin.is_staff = True
+        self.admin.save()
+        rows = self._get('/api/calls/', {'expand': 'contact', 'read_path': 'values'})['results']
+        self.assertIn('full_name', rows[0]['contact'])
+
+
+import os
+import shutil
+import tempfile
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from .models import UploadedFile
+from .services.contact_imports import ContactUpsert
+from .services.cache import CONTACTS_SCOPE, cached_statistic
+
+
+class ImportJobTestMixin:
+    """آپلود فایل اکسل و اجرای job پس‌زمینه (Celery در تست‌ها eager است)"""
+
+    def _use_temp_media(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = self.settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _post_file(self, url, frame, data=None, name='upload.xlsx'):
+        content = BytesIO()
+        frame.to_excel(content, index=False)
+        upload = SimpleUploadedFile(name, content.getvalue())
+        # job بعد از commit تراکنش درخواست در صف قرار می‌گیرد
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {**(data or {}), 'file': upload}, format='multipart')
+        return response, queries
+
+    def _progress(self, file_id):
+        response = self.client.get(f'/api/uploaded-files/{file_id}/progress/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+
+class ContactUpsertImportTestCase(ImportJobTestMixin, ProjectFixtureMixin, TestCase):
+    """تست درج/به‌روزرسانی دسته‌ای upload_contacts_file"""
+
+    def setUp(self):
+        super().setUp()
+        self._use_temp_media()
+        self.admin = self.create_user(username='import_admin', phone_number='09120003000')
+        self.caller = self.create_user(
+            username='import_caller', phone_number='09120003001',
+            first_name='Reza', last_name='Caller',
+        )
+        self.project = self.create_project('Import', self.admin, role='admin')
+        ProjectMembership.objects.create(project=self.project, user=self.caller, role='caller')
+        self.authenticate(self.admin)
+
+    def _upload(self, frame):
+        response, queries = self._post_file(
+            '/api/contacts/upload-contacts/', frame, {'project_id': self.project.pk}, 'contacts.xlsx'
+        )
+        self.assertEqual(response.status_code, 202)
+        writes = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith(('INSERT', 'UPDATE')) and '"call_center_contact"' in q['sql']
+        ]
+        progress = self._progress(response.data['file_id'])
+        self.assertEqual(progress['status'], 'completed')
+        return progress['result'], writes
+
+    def test_inserts_updates_and_failures(self):
+        existing = Contact.objects.create(
+            project=self.project, full_name='Old', phone='09331110001', address='Old address',
+        )
+        frame = pd.DataFrame({
+            # شماره عددی بدون صفر ابتدا، همان مخاطب موجود است
+            'phone': [9331110001, 9331110002, 12345, None, 9331110002],
+            'full_name': ['Updated', 'New', 'Bad', 'Empty', 'New again'],
+            'email': ['new@example.com', 'not-an-email', '', '', ''],
+            'address': ['', 'Street', '', '', ''],
+        })
+        result, _ = self._upload(frame)
+        self.assertEqual(result['successful_count'], 1)
+        self.assertEqual(result['updated_count'], 1)
+        self.assertEqual(sorted(failure['row'] for failure in result['failed_contacts']), [4, 5])
+
+        existing.refresh_from_db()
+        self.assertEqual(existing.full_name, 'Updated')
+        self.assertEqual(existing.email, 'new@example.com')
+        self.assertEqual(existing.address, 'Old address')
+        self.assertEqual(existing.assigned_caller, self.caller)
+
+        # ردیف تکراری فایل، مخاطب تازه را به‌روزرسانی می‌کند
+        created = Contact.objects.get(project=self.project, phone='09331110002')
+        self.assertEqual(created.full_name, 'New again')
+        self.assertEqual(created.address, 'Street')
+        self.assertEqual(created.email, '')
+        self.assertEqual(created.created_by, self.admin)
+        self.assertEqual(result['successful_contacts'][0]['assigned_caller'], 'Reza Caller')
+
+        uploaded_file = UploadedFile.objects.get()
+        self.assertEqual(uploaded_file.records_count, 5)
+        self.assertEqual(uploaded_file.processed_rows, 5)
+        self.assertEqual(uploaded_file.failed_rows, 2)
+
+    def test_writes_in_batches(self):
+        Contact.objects.create(project=self.project, full_name='Old', phone='09331120000')
+        frame = pd.DataFrame({'phone': [f'0933112{index:04d}' for index in range(300)]})
+        result, writes = self._upload(frame)
+        self.assertEqual(result['successful_count'], 299)
+        self.assertEqual(result['updated_count'], 1)
+        # چند INSERT دسته‌ای (sqlite تعداد پارامتر هر کوئری را محدود می‌کند) و یک upsert
+        # دسته‌ای؛ نه یک کوئری به ازای هر ردیف
+        self.assertLessEqual(len(writes), 10)
+
+    def test_writes_each_chunk_and_samples_result(self):
+        self.assertEqual(self.project.get_statistics()['total_contacts'], 0)
+        upsert = ContactUpsert(self.project, [(self.caller.pk, 'Reza Caller')], sample_size=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            upsert.add_rows([(2, {'phone': '09331140001', 'full_name': 'First'})])
+            # دسته اول پیش از رسیدن دسته بعدی نوشته شده است
+            self.assertTrue(Contact.objects.filter(project=self.project, phone='09331140001').exists())
+            upsert.add_rows(
+                [(3, {'phone': '09331140001', 'full_name': 'Second'})]
+                + [(row, {'phone': '123'}) for row in range(4, 9)]
+            )
+            upsert.finish()
+
+        # ردیف تکراری در دسته بعدی همان مخاطب را به‌روزرسانی می‌کند و دوباره شمرده نمی‌شود
+        self.assertEqual((upsert.created_count, upsert.updated_count), (1, 0))
+        self.assertEqual(Contact.objects.get(project=self.project, phone='09331140001').full_name, 'Second')
+        self.assertEqual(upsert.failed_count, 5)
+        self.assertEqual([failure['row'] for failure in upsert.failed], [4, 5])
+        self.assertEqual(self.project.get_statistics()['total_contacts'], 1)
+
+
+class ImportJobTestCase(ImportJobTestMixin, ProjectFixtureMixin, TestCase):
+    """تست job پس‌زمینه آپلودها و endpoint پیشرفت"""
+
+    def setUp(self):
+        super().setUp()
+        self._use_temp_media()
+        self.admin = self.create_user(username='job_admin', phone_number='09120004000')
+        self.other = self.create_user(username='job_other', phone_number='09120004001')
+        self.project = self.create_project('Jobs', self.admin, role='admin')
+        self.authenticate(self.admin)
+
+    def _add_caller(self):
+        # import مخاطبین بدون تماس‌گیرنده در پروژه پذیرفته نمی‌شود
+        return ProjectMembership.objects.create(project=self.project, user=self.other, role='caller')
+
+    def test_request_returns_before_processing(self):
+        self._add_caller()
+        frame = pd.DataFrame({'phone': ['09331130001']})
+        # بدون اجرای callback های on_commit، job هنوز در صف است
+        content = BytesIO()
+        frame.to_excel(content, index=False)
+        response = self.client.post(
+            '/api/contacts/upload-contacts/',
+            {'project_id': self.project.pk, 'file': SimpleUploadedFile('queued.xlsx', content.getvalue())},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.data['progress_url'].endswith(f"/uploaded-files/{response.data['file_id']}/progress/"))
+        progress = self._progress(response.data['file_id'])
+        self.assertEqual(progress['status'], 'pending')
+        self.assertEqual(progress['progress'], 0)
+        self.assertNotIn('result', progress)
+        self.assertFalse(Contact.objects.exists())
+        self.assertTrue(UploadedFile.objects.get().file.name.endswith('.xlsx'))
+
+    def test_obvious_errors_are_rejected_before_queueing(self):
+        # پروژه تماس‌گیرنده ندارد
+        response, _ = self._post_file(
+            '/api/contacts/upload-contacts/', pd.DataFrame({'phone': ['09331130002']}),
+            {'project_id': self.project.pk},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'در این پروژه هیچ تماس‌گیرنده‌ای وجود ندارد')
+
+        self._add_caller()
+        response, _ = self._post_file(
+            '/api/contacts/upload-contacts/', pd.DataFrame({'mobile': ['09331130002']}),
+            {'project_id': self.project.pk},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['available_columns'], ['mobile'])
+
+        response, _ = self._post_file(
+            f'/api/projects/{self.project.pk}/upload-callers/', pd.DataFrame({'phone_number': ['09120004005']}),
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['required_columns'], ['phone_number', 'first_name', 'last_name'])
+        self.assertFalse(UploadedFile.objects.exists())
+
+    def test_validation_error_marks_job_failed(self):
+        membership = self._add_caller()
+        upload = SimpleUploadedFile('contacts.csv', b'phone\n09331130002\n')
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                '/api/contacts/upload-contacts/', {'project_id': self.project.pk, 'file': upload}, format='multipart',
+            )
+        # تماس‌گیرنده بعد از آپلود و قبل از اجرای job از پروژه حذف می‌شود
+        membership.delete()
+        for callback in callbacks:
+            callback()
+
+        progress = self._progress(response.data['file_id'])
+        self.assertEqual(progress['status'], 'failed')
+        self.assertEqual(progress['error_message'], 'در این پروژه هیچ تماس‌گیرنده‌ای وجود ندارد')
+        self.assertIsNotNone(progress['finished_at'])
+        self.assertFalse(UploadedFile.objects.get().file)
+
+    def test_stored_file_is_removed_when_finished(self):
+        self._add_caller()
+        response, _ = self._post_file(
+            '/api/contacts/upload-contacts/', pd.DataFrame({'phone': ['09331130007']}),
+            {'project_id': self.project.pk},
+        )
+        self.assertEqual(self._progress(response.data['file_id'])['status'], 'completed')
+        self.assertFalse(UploadedFile.objects.get().file)
+        self.assertEqual([files for _, _, files in os.walk(django_settings.MEDIA_ROOT) if files], [])
+
+    def test_stale_processing_job_is_failed(self):
+        from .services.import_jobs import fail_stale_import_jobs
+
+        self._add_caller()
+        upload = SimpleUploadedFile('contacts.csv', b'phone\n09331130008\n')
+        # job در صف می‌ماند و worker آن وسط کار از کار افتاده است
+        with self.captureOnCommitCallbacks():
+            response = self.client.post(
+                '/api/contacts/upload-contacts/', {'project_id': self.project.pk, 'file': upload}, format='multipart',
+            )
+        started = timezone.now() - timedelta(hours=2)
+        UploadedFile.objects.update(
+            status=UploadedFile.STATUS_PROCESSING, started_at=started, last_progress_at=started,
+        )
+        self.assertEqual(fail_stale_import_jobs(), 1)
+        progress = self._progress(response.data['file_id'])
+        self.assertEqual(progress['status'], 'failed')
+        self.assertIsNotNone(progress['finished_at'])
+        self.assertFalse(UploadedFile.objects.get().file)
+        self.assertEqual(fail_stale_import_jobs(), 0)
+
+    def test_long_job_reporting_progress_is_not_stale(self):
+        from .services.import_jobs import _report_progress, fail_stale_import_jobs
+
+        self._add_caller()
+        with self.captureOnCommitCallbacks():
+            self.client.post(
+                '/api/contacts/upload-contacts/',
+                {'project_id': self.project.pk, 'file': SimpleUploadedFile('contacts.csv', b'phone\n09331130009\n')},
+                format='multipart',
+            )
+        started = timezone.now() - timedelta(hours=2)
+        UploadedFile.objects.update(
+            status=UploadedFile.STATUS_PROCESSING, started_at=started, last_progress_at=started,
+        )
+        # job بیش از یک ساعت است اجرا می‌شود اما همین حالا دسته‌ای را پردازش کرده
+        _report_progress(UploadedFile.objects.get(), 1000, 0)
+        self.assertEqual(fail_stale_import_jobs(), 0)
+        uploaded_file = UploadedFile.objects.get()
+        self.assertEqual(uploaded_file.status, UploadedFile.STATUS_PROCESSING)
+        self.assertTrue(uploaded_file.file)
+
+    def test_finished_job_does_not_overwrite_stale_failure(self):
+        from .services.import_jobs import IMPORTERS, fail_stale_import_jobs
+
+        def swept_during_import(uploaded_file):
+            # sweep همزمان، job را پیش از پایان ناموفق ثبت کرده است
+            UploadedFile.objects.update(last_progress_at=timezone.now() - timedelta(hours=2))
+            fail_stale_import_jobs()
+            return {'failed_count': 0}
+
+        self._add_caller()
+        with mock.patch.dict(IMPORTERS, {'contacts': swept_during_import}):
+            response, _ = self._post_file(
+                '/api/contacts/upload-contacts/', pd.DataFrame({'phone': ['09331130010']}),
+                {'project_id': self.project.pk},
+            )
+        progress = self._progress(response.data['file_id'])
+        self.assertEqual(progress['status'], 'failed')
+        self.assertIsNone(progress['result'])
+        self.assertIn('دوباره آپلود', progress['error_message'])
+
+    def test_assigned_contacts_upload_reports_progress_per_chunk(self):
+        from .services import import_jobs
+
+        self.admin.is_staff = True
+        self.admin.save(update_fields=['is_staff'])
+        self._add_caller()
+        frame = pd.DataFrame({
+            'full_name': [f'Assigned {index}' for index in range(1500)],
+            # شماره تماس‌گیرنده بدون صفر ابتدا، مانند ستون عددی اکسل
+            'contact_phone': [f'9331150{index:03d}' if index < 1000 else f'933116{index:04d}' for index in range(1500)],
+            'assigned_caller_phone': ['9120004001', ''] * 750,
+        })
+        with mock.patch.object(import_jobs, '_report_progress', wraps=import_jobs._report_progress) as report:
+            response, queries = self._post_file(f'/api/projects/{self.project.pk}/import-contacts/', frame)
+        self.assertEqual(response.status_code, 202)
+        # دو دسته (PROGRESS_EVERY ردیفی) با INSERT دسته‌ای؛ sqlite تعداد پارامتر هر کوئری را
+        # محدود می‌کند و هر دسته چند INSERT می‌شود، نه یک کوئری به ازای هر ردیف
+        self.assertEqual([call.args[1] for call in report.call_args_list], [1000, 1500])
+        inserts = [
+            q for q in queries.captured_queries
+            if q['sql'].startswith('INSERT') and '"call_center_contact"' in q['sql']
+        ]
+        self.assertLess(len(inserts), 50)
+
+        progress = self._progress(response.data['file_id'])
+        self.assertEqual(progress['status'], 'completed')
+        self.assertEqual((progress['records_count'], progress['processed_rows']), (1500, 1500))
+        self.assertEqual(progress['result']['created_count'], 1500)
+        contact = Contact.objects.get(project=self.project, phone='09331150000')
+        self.assertEqual(contact.assigned_caller, self.other)
+        self.assertTrue(contact.is_special)
+        self.assertIsNone(Contact.objects.get(project=self.project, phone='09331150001').assigned_caller)
+
+    def test_callers_upload_runs_in_background(self):
+        frame = pd.DataFrame({
+            'phone_number': [9120004002],
+            'first_name': ['Nima'],
+            'last_name': ['Caller'],
+        })
+        response, _ = self._post_file(f'/api/projects/{self.project.pk}/upload-callers/', frame)
+        self.assertEqual(response.status_code, 202)
+        progress = self._progress(response.data['file_id'])
+        self.assertEqual(progress['status'], 'completed')
+        self.assertEqual(progress['progress'], 100)
+        self.assertEqual(progress['result']['successful_count'], 1)
+        self.assertTrue(ProjectMembership.objects.filter(
+            project=self.project, user__phone_number='09120004002', role='caller'
+        ).exists())
+
+    def test_callers_upload_invalidates_contact_statistics(self):
+        computed = []
+        def compute():
+            computed.append(1)
+            return len(computed)
+        cached_statistic('contact_statistics', compute, project_id=self.project.pk, scope=CONTACTS_SCOPE)
+        frame = pd.DataFrame({'phone_number': ['09120004006'], 'first_name': ['Sara'], 'last_name': ['Caller']})
+        self._post_file(f'/api/projects/{self.project.pk}/upload-callers/', frame)
+        # عضویت‌های دسته‌ای سیگنال ندارند؛ آمار مخاطبین پروژه هم باید باطل شود
+        self.assertEqual(
+            cached_statistic('contact_statistics', compute, project_id=self.project.pk, scope=CONTACTS_SCOPE), 2
+        )
+
+    def test_callers_upload_canonicalizes_phones(self):
+        existing = self.create_user(username='job_existing', phone_number='09120004003')
+        frame = pd.DataFrame({
+            'phone_number': ['0912 000 4003', '+989120004004', '0912'],
+            'first_name': ['Old', 'New', 'Bad'],
+            'last_name': ['Caller', 'Caller', 'Caller'],
+        })
+        response, _ = self._post_file(f'/api/projects/{self.project.pk}/upload-callers/', frame)
+        result = self._progress(response.data['file_id'])['result']
+        self.assertEqual(result['successful_count'], 2)
+        self.assertEqual([failure['row'] for failure in result['failed_callers']], [4])
+        self.assertTrue(ProjectMembership.objects.filter(project=self.project, user=existing).exists())
+        self.assertTrue(get_user_model().objects.filter(phone_number='09120004004').exists())
+
+    def test_callers_upload_resolves_users_in_bulk(self):
+        User = get_user_model()
+        admin_member = self.create_user(username='job_admin_member', phone_number='09120005000')
+        ProjectMembership.objects.create(project=self.project, user=admin_member, role='admin')
+        phones = [f'0912001{index:04d}' for index in range(60)]
+        frame = pd.DataFrame({
+            # ردیف آخر تکراری است
+            'phone_number': ['09120005000'] + phones + [phones[0]],
+            'first_name': ['Admin'] + [f'Caller {index}' for index in range(60)] + ['Again'],
+            'last_name': ['Member'] + ['Caller'] * 61,
+        })
+        response, queries = self._post_file(f'/api/projects/{self.project.pk}/upload-callers/', frame)
+        # تعداد کوئری‌ها به تعداد ردیف‌ها بستگی ندارد (لاگ کوئری با درخواست بعدی پاک می‌شود)
+        user_queries = [
+            q['sql'] for q in queries.captured_queries
+            if '"call_center_customuser"' in q['sql'] or '"call_center_projectmembership"' in q['sql']
+        ]
+        self.assertLess(len(user_queries), 15)
+        self.assertEqual(len([sql for sql in user_queries if sql.startswith('INSERT')]), 2)
+
+        result = self._progress(response.data['file_id'])['result']
+        self.assertEqual(result['successful_count'], 60)
+        self.assertEqual(
+            [caller['action'] for caller in result['updated_callers']], ['role_updated', 'already_caller']
+        )
+        self.assertEqual(ProjectMembership.objects.get(user=admin_member).role, 'caller')
+        self.assertEqual(User.objects.get(phone_number=phones[0]).first_name, 'Caller 0')
+        self.assertEqual(
+            ProjectMembership.objects.filter(project=self.project, role='caller').count(), 61
+        )
+
+    def test_job_runs_once(self):
+        from .services.import_jobs import run_import_job
+
+        self._add_caller()
+        response, _ = self._post_file(
+            '/api/contacts/upload-contacts/', pd.DataFrame({'phone': ['09331130003']}),
+            {'project_id': self.project.pk},
+        )
+        self.assertIsNone(run_import_job(response.data['file_id']))
+
+    def test_progress_is_limited_to_project_admins_and_uploader(self):
+        self._add_caller()
+        response, _ = self._post_file(
+            '/api/contacts/upload-contacts/', pd.DataFrame({'phone': ['09331130004']}),
+            {'project_id': self.project.pk},
+        )
+        self.client.force_authenticate(self.other)
+        progress = self.client.get(f"/api/uploaded-files/{response.data['file_id']}/progress/")
+        self.assertEqual(progress.status_code, 404)
+
+    def test_csv_upload(self):
+        self._add_caller()
+        upload = SimpleUploadedFile('contacts.csv', 'phone,full_name\n9331130005,علی\n\n09331130006,\n'.encode())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/contacts/upload-contacts/', {'project_id': self.project.pk, 'file': upload}, format='multipart',
+            )
+        self.assertEqual(response.status_code, 202)
+        progress = self._progress(response.data['file_id'])
+        self.assertEqual(progress['status'], 'completed')
+        self.assertEqual(progress['records_count'], 2)
+        self.assertEqual(progress['result']['successful_count'], 2)
+        self.assertEqual(Contact.objects.get(phone='09331130005').full_name, 'علی')
+
+
+from django.test import SimpleTestCase
+from .services.spreadsheets import SpreadsheetError, read_spreadsheet
+
+
+class SpreadsheetReaderTestCase(SimpleTestCase):
+    """تست خواننده جریانی اکسل/CSV"""
+
+    def _xlsx(self, frame):
+        content = BytesIO()
+        frame.to_excel(content, index=False)
+        content.seek(0)
+        return content
+
+    def test_xlsx_rows_are_cleaned(self):
+        frame = pd.DataFrame({
+            'phone': [9121234567, None, 9121234568.0],
+            'full_name': [' Ali ', None, 'null'],
+            'email': ['a@example.com', None, None],
+        })
+        with read_spreadsheet(self._xlsx(frame), name='contacts.xlsx') as reader:
+            self.assertEqual(reader.columns, ['phone', 'full_name', 'email'])
+            self.assertEqual(reader.total_rows, 3)
+            rows = list(reader.rows())
+        # ردیف خالی رد می‌شود ولی شماره ردیف‌ها همان شماره سطر فایل است
+        self.assertEqual(rows, [
+            (2, {'phone': '9121234567', 'full_name': 'Ali', 'email': 'a@example.com'}),
+            (4, {'phone': '9121234568', 'full_name': '', 'email': ''}),
+        ])
+
+    def test_csv_fast_path_and_chunks(self):
+        content = BytesIO(
+            '\ufeffphone,full_name\n'.encode() +
+            ''.join(f'0912{index:07d},نام {index}\n' for index in range(5)).encode() +
+            b'09129999999\n'
+        )
+        # بدون پسوند هم فایل غیر zip به عنوان CSV خوانده می‌شود
+        with read_spreadsheet(content, name='upload', chunk_size=2) as reader:
+            self.assertEqual(reader.columns, ['phone', 'full_name'])
+            self.assertEqual(reader.total_rows, 6)
+            chunks = list(reader.chunks())
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 2])
+        self.assertEqual(chunks[0][0], (2, {'phone': '09120000000', 'full_name': 'نام 0'}))
+        # ردیف کوتاه‌تر از سرستون‌ها
+        self.assertEqual(chunks[2][1], (7, {'phone': '09129999999', 'full_name': ''}))
+        self.assertFalse(content.closed)
+
+    def test_invalid_files(self):
+        with self.assertRaises(SpreadsheetError):
+            read_spreadsheet(BytesIO(b''), name='empty.csv')
+        with self.assertRaises(SpreadsheetError):
+            read_spreadsheet(BytesIO(b'PK\x03\x04broken'), name='broken.xlsx')
+        # بایت نامعتبر بعد از اولین بلوک خوانده شده، در حین پیمایش ردیف‌ها
+        reader = read_spreadsheet(BytesIO(b'phone\n' + b'09120000000\n' * 2000 + b'\xff\n'), name='latin.csv')
+        with self.assertRaises(SpreadsheetError):
+            list(reader.rows())
+
+
+import numpy as np
+from django.test import SimpleTestCase
+from .services.contact_imports import canonical_phones
+from .utils import normalize_phone_number, normalize_phone_numbers, validate_phone_number, validate_phone_numbers
+
+
+class PhoneNormalizationTestCase(SimpleTestCase):
+    """تست نسخه برداری نرمال‌سازی و اعتبارسنجی شماره تلفن"""
+
+    PHONES = [
+        '+98 912-123-4567', '00989121234567', '989121234567', '98912123456',
+        '0912 (123) 4567', '09\t121234567', 'abc', '+9809121234567', '۰۹۱۲۱۲۳۴۵۶۷', '',
+    ]
+
+    def test_normalize_column(self):
+        normalized, valid = normalize_phone_numbers(pd.Series(self.PHONES + [None, np.nan]))
+        self.assertEqual(normalized.tolist(), [
+            '09121234567', '09121234567', '09121234567', '98912123456',
+            '09121234567', '09121234567', 'abc', '009121234567', '۰۹۱۲۱۲۳۴۵۶۷', '', '', '',
+        ])
+        self.assertEqual(valid.tolist(), [True, True, True, False, True, True] + [False] * 6)
+
+    def test_validate_column(self):
+        phones, valid = validate_phone_numbers(np.array(self.PHONES))
+        self.assertEqual(phones[0], '+989121234567')
+        # 98 بدون + فقط بعد از نرمال‌سازی معتبر است
+        self.assertEqual(valid.tolist(), [True, True, False, False, True, True] + [False] * 4)
+
+    def test_row_wise_wrappers(self):
+        for phone in self.PHONES:
+            normalized, _ = normalize_phone_numbers([phone])
+            expected = normalized[0] if phone else phone
+            self.assertEqual(normalize_phone_number(phone), expected)
+        self.assertIsNone(normalize_phone_number(None))
+        self.assertEqual(validate_phone_number('+98 912 123 4567'), (True, '+989121234567'))
+        self.assertEqual(validate_phone_number(''), (False, "شماره تلفن خالی است"))
+        self.assertEqual(validate_phone_number('0912'), (False, "فرمت شماره تلفن نامعتبر است"))
+
+    def test_canonical_phones(self):
+        phones, valid = canonical_phones(['9121234567', '912123456', '09121234567', '12345'])
+        self.assertEqual(phones.tolist(), ['09121234567', '0912123456', '09121234567', '12345'])
+        self.assertEqual(valid.tolist(), [True, False, True, False])
@@ -29,7 +29,6 @@ router.register(r'call-statistics', views.CallStatisticsViewSet)
 router.register(r'saved-searches', views.SavedSearchViewSet)
 router.register(r'uploaded-files', views.UploadedFileViewSet)
 router.register(r'export-reports', views.ExportReportViewSet)
-router.register(r'cached-statistics', views.CachedStatisticsViewSet)
 
 router.register(r"tickets",views.TicketViewSet)
 router.register(r'excel',views.CallExcelViewSet,basename='excel')
@@ -47,6 +46,7 @@ urlpatterns = [
     path('auth/token/', auth_views.CustomAuthToken.as_view(), name='api_token_auth'),
     path('',views.check_postgresql_connection, name='check_postgresql_connection'),
     path('admin/dashboard/', views.dashboard_data, name='dashboard_data'),
+    path('admin/dashboard-data/', views.admin_dashboard_data, name='admin_dashboard_data'),
     path('project/<int:project_id>/statistics/',views.project_statistics_api, name='project-statistics-api'),
     path('main_dashboard', views.dashboard_stats, name='dashboard_data'),
     path('request-otp/', auth_views.request_otp, name='request-otp'),
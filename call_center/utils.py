@@ -5,6 +5,100 @@ from .models import Contact, ProjectCaller, ProjectMembership
 from django.db.models import Count
 
 import string
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from persiantools.jdatetime import JalaliDate
+
+# جداکننده‌هایی که از شماره تلفن حذف می‌شوند
+PHONE_SEPARATORS_RE = re.compile(r'[\s\-\(\)]')
+
+# پیشوندهای بین‌المللی (پیشوند، طول لازم شماره یا None) به ترتیب بررسی؛ همه با 0 جایگزین می‌شوند
+PHONE_PREFIXES = (('+98', None), ('0098', None), ('98', 12))
+
+
+def as_phone_array(phones):
+    """
+    تبدیل ستون شماره‌ها (pandas Series، لیست یا آرایه numpy) به آرایه رشته‌ای numpy؛
+    None و NaN رشته خالی می‌شوند
+    """
+    if isinstance(phones, np.ndarray) and phones.dtype.kind == 'U':
+        return phones
+    if isinstance(phones, (list, tuple)) and all(type(phone) is str for phone in phones):
+        # ردیف‌های خواننده فایل و فراخوانی تک شماره؛ بدون هزینه ساخت Series
+        return np.array(phones, dtype=str)
+    values = pd.Series(phones, dtype=object)
+    return values.where(values.notna(), '').to_numpy(dtype=str)
+
+
+def _has_separators(phones):
+    # شماره‌ای که غیر از + ابتدا فقط رقم دارد، جداکننده ندارد
+    return ~np.strings.isdecimal(np.strings.lstrip(phones, '+')) & (np.strings.str_len(phones) > 0)
+
+
+def strip_phone_separators(phones):
+    """
+    حذف فاصله، خط تیره و پرانتز از همه شماره‌ها.
+
+    فقط ردیف‌هایی که غیر از رقم و + کاراکتر دیگری دارند پردازش می‌شوند: چهار
+    جداکننده رایج با ufuncهای numpy.strings و باقی (مثلا tab یا فاصله یونیکد) با
+    PHONE_SEPARATORS_RE.
+    """
+    phones = np.array(as_phone_array(phones))
+    dirty = _has_separators(phones)
+    if not dirty.any():
+        return phones
+
+    subset = phones[dirty]
+    for separator in (' ', '-', '(', ')'):
+        subset = np.strings.replace(subset, separator, '')
+    rest = _has_separators(subset)
+    if rest.any():
+        subset[rest] = [PHONE_SEPARATORS_RE.sub('', phone) for phone in subset[rest].tolist()]
+    phones[dirty] = subset
+    return phones
+
+
+def match_phone_patterns(phones):
+    """
+    ماسک شماره‌های معتبر (09xxxxxxxxx، +989xxxxxxxxx، 00989xxxxxxxxx) در آرایه بدون جداکننده
+    """
+    length = np.strings.str_len(phones)
+    return (
+        ((length == 11) & np.strings.startswith(phones, '09'))
+        | ((length == 13) & np.strings.startswith(phones, '+989'))
+        | ((length == 14) & np.strings.startswith(phones, '00989'))
+    ) & np.strings.isdecimal(np.strings.lstrip(phones, '+'))
+
+
+def normalize_phone_numbers(phones):
+    """
+    نسخه برداری normalize_phone_number روی یک ستون کامل.
+    خروجی (آرایه شماره‌های نرمال شده به فرمت 09xxxxxxxxx، ماسک معتبر بودن هر شماره)
+    """
+    phones = strip_phone_separators(phones)
+    length = np.strings.str_len(phones)
+    remaining = np.ones(len(phones), dtype=bool)
+    for prefix, required_length in PHONE_PREFIXES:
+        matched = remaining & np.strings.startswith(phones, prefix)
+        if required_length is not None:
+            matched &= length == required_length
+        if matched.any():
+            phones[matched] = np.strings.add('0', np.strings.replace(phones[matched], prefix, '', 1))
+        remaining &= ~matched
+    return phones, match_phone_patterns(phones)
+
+
+def validate_phone_numbers(phones):
+    """
+    نسخه برداری validate_phone_number.
+    خروجی (آرایه شماره‌های بدون جداکننده، ماسک معتبر بودن هر شماره)
+    """
+    phones = strip_phone_separators(phones)
+    return phones, match_phone_patterns(phones)
+
 
 def validate_phone_number(phone):
     """
@@ -14,19 +108,9 @@ def validate_phone_number(phone):
     if not phone:
         return False, "شماره تلفن خالی است"
 
-    # حذف فاصله‌ها و کاراکترهای اضافی
-    phone = re.sub(r'[\s\-\(\)]', '', phone)
-
-    # بررسی فرمت‌های مختلف شماره تلفن ایرانی
-    patterns = [
-        r'^09\d{9}$',  # 09123456789
-        r'^\+989\d{9}$',  # +989123456789
-        r'^00989\d{9}$',  # 00989123456789
-    ]
-
-    for pattern in patterns:
-        if re.match(pattern, phone):
-            return True, phone
+    phones, valid = validate_phone_numbers([phone])
+    if valid[0]:
+        return True, str(phones[0])
 
     return False, "فرمت شماره تلفن نامعتبر است"
 
@@ -38,18 +122,8 @@ def normalize_phone_number(phone):
     if not phone:
         return phone
 
-    # حذف فاصله‌ها و کاراکترهای اضافی
-    phone = re.sub(r'[\s\-\(\)]', '', phone)
-
-    # تبدیل به فرمت استاندارد
-    if phone.startswith('+98'):
-        phone = '0' + phone[3:]
-    elif phone.startswith('0098'):
-        phone = '0' + phone[4:]
-    elif phone.startswith('98') and len(phone) == 12:
-        phone = '0' + phone[2:]
-
-    return phone
+    phones, _ = normalize_phone_numbers([phone])
+    return str(phones[0])
 
 def generate_username(phone):
     random_letters = random.choice((string.punctuation))+phone
@@ -202,4 +276,57 @@ def assign_contacts_randomly(project, unassigned_contacts=None):
             caller_load[min_load_caller_id] += 1
             assigned_count += 1
 
-    return assigned_count, f"{assigned_count} مخاطب به صورت تصادفی تخصیص داده شد."
\ No newline at end of file
+    return assigned_count, f"{assigned_count} مخاطب به صورت تصادفی تخصیص داده شد."
+
+def parse_report_date(value):
+    """
+    تبدیل تاریخ گزارش (میلادی یا شمسی) به date میلادی.
+    فرمت‌های مجاز: 2025-03-14، 1404-01-01 و 1404/01/01؛ سال‌های کمتر از ۱۷۰۰ شمسی در نظر گرفته می‌شوند.
+    برای ورودی نامعتبر ValueError برمی‌گرداند.
+    """
+    if not value:
+        return None
+
+    match = re.match(r'^(\d{4})[-/](\d{1,2})[-/](\d{1,2})$', str(value).strip())
+    if not match:
+        raise ValueError(f"فرمت تاریخ نامعتبر است: {value}")
+
+    year, month, day = (int(part) for part in match.groups())
+    if year < 1700:
+        return JalaliDate(year, month, day).to_gregorian()
+    return date(year, month, day)
+
+
+# تعداد روزهای متمایزی که تبدیل شمسی آن‌ها در حافظه نگه داشته می‌شود (حدود ۲۷ سال)
+JALALI_CACHE_SIZE = 10000
+
+
+@lru_cache(maxsize=JALALI_CACHE_SIZE)
+def _jalali_date_string(day):
+    return str(JalaliDate(day))
+
+
+def _as_day(value):
+    # مثل کد قبلی سریالایزرها: تاریخ datetime بدون تبدیل منطقه زمانی برداشته می‌شود
+    return value.date() if isinstance(value, datetime) else value
+
+
+def format_jalali_date(value):
+    """
+    تاریخ شمسی (مثل 1404-01-15) برای یک date یا datetime؛ None برای مقدار خالی.
+    تبدیل هر روز فقط یک بار انجام و در یک cache LRU محدود نگه داشته می‌شود.
+    """
+    if value is None:
+        return None
+    return _jalali_date_string(_as_day(value))
+
+
+def format_jalali_dates(values):
+    """
+    نسخه دسته‌ای format_jalali_date برای خروجی‌های حجیم: روزهای تکراری فقط یک بار
+    تبدیل می‌شوند و لیستی هم‌ترتیب با values برمی‌گردد.
+    """
+    days = [None if value is None else _as_day(value) for value in values]
+    formatted = {day: _jalali_date_string(day) for day in set(days) if day is not None}
+    formatted[None] = None
+    return [formatted[day] for day in days]
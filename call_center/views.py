@@ -7,6 +7,7 @@ from django.db.models.functions import Coalesce
 from django.db.models import Count, Avg, Q
 from django.db.models.aggregates import Sum
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action, api_view, permission_classes
@@ -20,27 +21,40 @@ import logging
 import random
 from django.db import connections
 from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
 from rest_framework.pagination import PageNumberPagination
 from .models import (
     Project, ProjectCaller, Contact, Call, CallEditHistory,
-    CallStatistics, SavedSearch, UploadedFile, ExportReport, CachedStatistics, ProjectMembership, CustomUser
+    CallStatistics, SavedSearch, UploadedFile, ExportReport, ProjectMembership, CustomUser, GlobalCounter
 )
 from .serializers import (
     CustomUserSerializer, ProjectSerializer, ContactSerializer,
     CallSerializer, CallEditHistorySerializer, CallStatisticsSerializer,
-    SavedSearchSerializer, UploadedFileSerializer, ExportReportSerializer, CachedStatisticsSerializer,
+    SavedSearchSerializer, UploadedFileSerializer, UploadedFileProgressSerializer, ExportReportSerializer,
     CustomUserSerializer, CallExcelSerializer, AnswerChoiceSerializer,TicketSerializer
 )
 from .utils import (
     validate_phone_number, normalize_phone_number, generate_secure_password,
-    is_caller_user, assign_contacts_randomly, validate_excel_data, clean_string_field,generate_username
+    is_caller_user, assign_contacts_randomly, validate_excel_data, clean_string_field,generate_username, parse_report_date
 )
 from drf_excel.mixins import XLSXFileMixin
 from drf_excel.renderers import XLSXRenderer
 import traceback
 from rest_framework.views import APIView
 from rest_framework import status, permissions
-from .excel_imports import import_contacts_from_excel
+from .services.statistics import get_caller_performance_rows, annotate_phone_call_counters
+from .services.contacts import recent_call_notes_prefetch
+from .services.memberships import get_project_roles, has_project_role
+from .services.projections import READ_PATHS, ContactProjection, CallProjection
+from .services.import_jobs import ImportJobError, enqueue_import, validate_upload
+from .services.spreadsheets import SPREADSHEET_EXTENSIONS
+from .services.rollups import filter_rollups, get_rollup_totals, rollup_sum
+from .services.cache import (
+    cached_statistic, invalidate_project_statistics, invalidate_contact_statistics, get_ttl, CONTACTS_SCOPE
+)
+from .services.dashboard import get_dashboard_snapshot, get_admin_dashboard_snapshot
+from .services.timeseries import INTERVALS as TIME_SERIES_INTERVALS, validate_time_series_range
+from .services.counters import get_global_counts
 
 from django.shortcuts import get_object_or_404
 # تنظیم logger
@@ -60,6 +74,56 @@ def check_postgresql_connection(request):
         return HttpResponse("PostgreSQL connection successful")
     except Exception as e:
         return HttpResponse(f"PostgreSQL connection failed: {e}")
+class SparseFieldsetViewMixin:
+    """
+    دسترسی view به فیلدهای خواسته شده با ?fields= / ?expand= تا prefetch ها و
+    annotate ها فقط برای فیلدهایی که واقعا برگردانده می‌شوند اعمال شوند.
+    """
+
+    def get_requested_fields(self):
+        serializer_class = self.get_serializer_class()
+        if not hasattr(serializer_class, 'get_requested_fields'):
+            return set(getattr(serializer_class.Meta, 'fields', ()))
+        return serializer_class.get_requested_fields(self.request, getattr(self, 'action', None))
+
+    def fields_requested(self, *names):
+        """آیا حداقل یکی از فیلدهای names در پاسخ هست"""
+        requested = self.get_requested_fields()
+        return any(name in requested for name in names)
+
+
+class ValuesReadPathMixin:
+    """
+    مسیر خواندن values() برای list: ردیف‌ها با values_projection_class از ستون‌ها و
+    کوئری‌های دسته‌ای ساخته می‌شوند و مدل و سریالایزر برای هر ردیف ساخته نمی‌شود.
+    خروجی همان شکل سریالایزر را دارد. values_read_path مسیر پیش‌فرض endpoint است و
+    ?read_path=serializer|values آن را برای یک درخواست عوض می‌کند. اگر فیلدی (مثلا یک
+    رابطه expand شده) در projection پشتیبانی نشود، مسیر سریالایزر استفاده می‌شود.
+    """
+    values_projection_class = None
+    values_read_path = True
+
+    def use_values_read_path(self):
+        read_path = self.request.query_params.get('read_path')
+        if read_path in READ_PATHS:
+            return read_path == 'values'
+        return self.values_read_path
+
+    def list(self, request, *args, **kwargs):
+        if self.values_projection_class is None or not self.use_values_read_path():
+            return super().list(request, *args, **kwargs)
+
+        projection = self.values_projection_class(self.get_serializer(), request)
+        if not projection.supported:
+            return super().list(request, *args, **kwargs)
+
+        queryset = projection.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(projection.rows(page))
+        return Response(projection.rows(queryset))
+
+
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet برای مشاهده کاربران.
@@ -88,67 +152,49 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-def safe_dict_conversion(row):
+def import_accepted_response(request, uploaded_file):
     """
-    تبدیل ایمن pandas Series به dictionary با جلوگیری از مقادیر NaN
+    پاسخ فوری درخواست آپلود؛ پردازش فایل در پس‌زمینه است و پیشرفت آن از progress_url خوانده می‌شود
     """
-    try:
-        if hasattr(row, 'to_dict'):
-            row_dict = row.to_dict()
-            # تبدیل همه مقادیر NaN به رشته خالی
-            for key, value in row_dict.items():
-                if pd.isna(value) or (isinstance(value, float) and np.isnan(value)):
-                    row_dict[key] = ''
-                else:
-                    row_dict[key] = str(value)
-            return row_dict
-        else:
-            return str(row)
-    except Exception:
-        return "خطا در تبدیل داده"
-
-
-def clean_string_field(value):
-    """
-    تمیز کردن و اعتبارسنجی فیلدهای رشته‌ای
-    """
-    if pd.isna(value) or value is None:
-        return ''
-
-    # تبدیل به رشته
-    str_value = str(value).strip()
-
-    # حذف مقادیر نامعتبر
-    if str_value.lower() in ['nan', 'none', 'null', '']:
-        return ''
-
-    return str_value
+    return Response({
+        'message': 'فایل دریافت شد و در صف پردازش قرار گرفت',
+        'file_id': uploaded_file.id,
+        'status': uploaded_file.status,
+        'progress_url': request.build_absolute_uri(
+            reverse('uploadedfile-progress', args=[uploaded_file.id])
+        ),
+    }, status=status.HTTP_202_ACCEPTED)
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated, IsReadOnlyOrProjectAdmin]
 
+    # اکشن‌هایی که خروجی‌شان ProjectSerializer است؛ بقیه (گزارش‌ها، آمار و آپلود)
+    # فقط خود پروژه را از get_object می‌خواهند و prefetch نمی‌گیرند
+    SERIALIZER_ACTIONS = ('list', 'retrieve', 'create', 'update', 'partial_update')
+
     def get_queryset(self):
         user = self.request.user
-        base_prefetch = [
-            Prefetch(
-                'questions',
-                queryset=Question.objects.prefetch_related('choices')
-            ),
-            Prefetch(
-                'calls__answers',
-                queryset=CallAnswer.objects.select_related('selected_choice').prefetch_related(
-                    Prefetch('question__choices')
-                )
-            )
-        ]
-
+        # خلاصه پاسخ‌ها از هیستوگرام کش شده خوانده می‌شود و نیازی به بارگذاری تماس‌ها نیست
         if user.is_superuser:
-            return Project.objects.all().prefetch_related(*base_prefetch)
+            queryset = Project.objects.all()
+        else:
+            queryset = user.projects.distinct()
+
+        if self.action not in self.SERIALIZER_ACTIONS:
+            return queryset
 
-        return user.projects.distinct().prefetch_related(*base_prefetch)
+        # فقط رابطه‌هایی که فیلدهای خواسته شده (?fields=) لازم دارند بارگذاری می‌شوند
+        if self.fields_requested('created_by'):
+            queryset = queryset.select_related('created_by')
+        if self.fields_requested('members'):
+            queryset = queryset.prefetch_related(Prefetch(
+                'projectmembership_set',
+                queryset=ProjectMembership.objects.select_related('user')
+            ))
+        return queryset
     #TODO must  change this and just check this on s
     def perform_create(self, serializer):
         user = self.request.user
@@ -486,179 +532,21 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return Response({"error": "فایل ارسال نشده است"}, status=status.HTTP_400_BAD_REQUEST)
 
         # بررسی نوع فایل
-        if not file.name.endswith(('.xlsx', '.xls')):
+        if not file.name.lower().endswith(SPREADSHEET_EXTENSIONS):
             return Response({
-                "error": "فقط فایل‌های اکسل (.xlsx, .xls) پشتیبانی می‌شوند"
+                "error": "فقط فایل‌های اکسل (.xlsx, .xls) و CSV پشتیبانی می‌شوند"
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        # خطاهای آشکار (ستون ضروری، نبودن تماس‌گیرنده) همین حالا برگردانده می‌شوند
         try:
-            import pandas as pd
+            validate_upload(file, 'callers', project)
+        except ImportJobError as e:
+            return Response({"error": str(e), **(e.details or {})}, status=status.HTTP_400_BAD_REQUEST)
 
-            # خواندن فایل اکسل
-            try:
-                df = pd.read_excel(file)
-            except Exception as e:
-                return Response({
-                    "error": f"خطا در خواندن فایل اکسل: {str(e)}"
-                }, status=status.HTTP_400_BAD_REQUEST)
-            # بررسی وجود ستون شماره تلفن
-            if ('phone_number' and "first_name" and "last_name" not in df.columns):
-                return Response({
-                    "error": "ستون های  ';last_name','first_name',' phone_number'  الزامی است",
-                    "required_columns": ["phone_number"],
-                    "available_columns": list(df.columns)
-                }, status=status.HTTP_400_BAD_REQUEST)
+        # خواندن و پردازش فایل در job پس‌زمینه (services.import_jobs.import_callers_file)
+        uploaded_file = enqueue_import(file, 'callers', project, request.user)
+        return import_accepted_response(request, uploaded_file)
 
-            successful_callers = []
-            failed_callers = []
-            updated_callers = []
-
-            with transaction.atomic():
-                # ذخیره اطلاعات فایل آپلود شده
-                uploaded_file = UploadedFile.objects.create(
-                    file_name=file.name,
-                    file_path=f"uploads/callers/{file.name}",
-                    file_type='callers',
-                    records_count=len(df),
-                    project=project,
-                    uploaded_by=request.user
-                )
-
-                for index, row in df.iterrows():
-                    try:
-                        # تمیز کردن شماره تلفن
-                        phone_number = clean_string_field(str(row.get('phone_number', '')))
-                        first_name = clean_string_field(str(row.get("first_name","")))
-                        last_name = clean_string_field(str(row.get("last_name","")))
-                        if not phone_number or phone_number == 'nan':
-                            failed_callers.append({
-                                'row': index + 2,
-                                'phone_number': phone_number,
-                                'error': 'شماره تلفن الزامی است'
-                            })
-                            continue
-
-
-                        # نرمال‌سازی و اعتبارسنجی شماره تلفن
-                        try:
-                            normalized_phone = normalize_phone_number(phone_number)
-                            if not validate_phone_number(normalized_phone):
-                                failed_callers.append({
-                                    'row': index + 2,
-                                    'phone_number': phone_number,
-                                    'error': 'شماره تلفن نامعتبر است'
-                                })
-                                continue
-                        except:
-                            failed_callers.append({
-                                'row': index + 2,
-                                'phone_number': phone_number,
-                                'error': 'شماره تلفن نامعتبر است'
-                            })
-                            continue
-
-                        # جستجوی کاربر بر اساس شماره تلفن
-                        try:
-                            normalized_phone = "0" + normalized_phone
-                            user = CustomUser.objects.get(phone_number=normalized_phone)
-                        except CustomUser.DoesNotExist:
-                            user = CustomUser.objects.create(phone_number=normalized_phone,first_name=first_name,
-                                                             last_name=last_name,username=generate_username(normalized_phone))
-                        # بررسی اینکه آیا کاربر قبلاً عضو پروژه است
-                        existing_membership = ProjectMembership.objects.filter(
-                            project=project,
-                            user=user
-                        ).first()
-
-                        if existing_membership:
-                            # اگر قبلاً عضو است، نقشش را به caller تغییر می‌دهیم
-                            old_role = existing_membership.role
-                            if old_role != 'caller':
-                                existing_membership.role = 'caller'
-                                existing_membership.save()
-
-                                updated_callers.append({
-                                    'user_id': user.id,
-                                    'username': user.username,
-                                    'full_name': user.get_full_name() or user.username,
-                                    'phone_number': user.phone_number,
-                                    'old_role': old_role,
-                                    'new_role': 'caller',
-                                    'action': 'role_updated'
-                                })
-                            else:
-                                # اگر قبلاً تماس‌گیرنده بوده، در لیست به‌روزرسانی قرار نمی‌گیرد
-                                updated_callers.append({
-                                    'user_id': user.id,
-                                    'username': user.username,
-                                    'full_name': user.get_full_name() or user.username,
-                                    'phone_number': user.phone_number,
-                                    'old_role': old_role,
-                                    'new_role': 'caller',
-                                    'action': 'already_caller'
-                                })
-                        else:
-                            # اضافه کردن کاربر جدید به پروژه با نقش caller
-                            ProjectMembership.objects.create(
-                                project=project,
-                                user=user,
-                                role='caller'
-                            )
-
-                            successful_callers.append({
-                                'user_id': user.id,
-                                'username': user.username,
-                                'full_name': user.get_full_name() or user.username,
-                                'phone_number': user.phone_number,
-                                'role': 'caller',
-                                'action': 'added_to_project'
-                            })
-
-                    except Exception as e:
-                        failed_callers.append({
-                            'row': index + 2,
-                            'phone_number': phone_number if 'phone_number' in locals() else 'نامشخص',
-                            'error': str(e)
-                        })
-
-            # آماده کردن پاسخ
-            response_data = {
-                'message': 'فایل تماس‌گیرندگان با موفقیت پردازش شد',
-                'file_id': uploaded_file.id,
-                'total_records': len(df),
-                'successful_count': len(successful_callers),
-                'updated_count': len(updated_callers),
-                'failed_count': len(failed_callers),
-                'project_id': project.id,
-                'project_name': project.name
-            }
-
-            if successful_callers:
-                response_data['successful_callers'] = successful_callers
-
-            if updated_callers:
-                response_data['updated_callers'] = updated_callers
-
-            if failed_callers:
-                response_data['failed_callers'] = failed_callers
-
-            # تنظیم وضعیت پاسخ
-            if failed_callers and not successful_callers and not updated_callers:
-                status_code = status.HTTP_400_BAD_REQUEST
-                response_data['message'] = 'پردازش فایل با خطا مواجه شد'
-            elif failed_callers:
-                status_code = status.HTTP_207_MULTI_STATUS
-                response_data['message'] = 'فایل با موفقیت جزئی پردازش شد'
-            else:
-                status_code = status.HTTP_201_CREATED
-
-            return Response(response_data, status=status_code)
-
-        except Exception as e:
-            logger.error(f"خطا در پردازش فایل تماس‌گیرندگان: {str(e)}")
-            return Response({
-                "error": f"خطای داخلی سرور: {str(e)}"
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     #TODO maybe need some changes
     @action(detail=True, methods=['post'], url_path='toggle-user-role',
             permission_classes=[IsAuthenticated, IsProjectAdmin])
@@ -713,6 +601,8 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 )
                 assigned_contacts_count = assigned_contacts.count()
                 assigned_contacts.update(assigned_caller=None)
+                invalidate_project_statistics(project.id)
+                invalidate_contact_statistics(project.id)
 
             elif membership.role == 'contact':
                 # تغییر از contact به caller
@@ -796,12 +686,12 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def call_status_over_time(self, request, pk=None):
         project = self.get_object()
         # ... (منطق این اکشن از کد قبلی شما بدون تغییر باقی می‌ماند)
-        start_date_str = request.query_params.get("start_date")
-        end_date_str = request.query_params.get("end_date")
         interval = request.query_params.get("interval", "day")
-        start_date = datetime.strptime(start_date_str, "%Y-%m-%d") if start_date_str else None
-        end_date = datetime.strptime(end_date_str, "%Y-%m-%d") if end_date_str else None
         try:
+            # تاریخ‌ها میلادی یا شمسی
+            start_date = parse_report_date(request.query_params.get("start_date"))
+            end_date = parse_report_date(request.query_params.get("end_date"))
+            validate_time_series_range(start_date, end_date, interval)
             data = project.get_call_status_over_time(start_date, end_date, interval)
             return Response(data)
         except ValueError as e:
@@ -822,9 +712,10 @@ class ProjectCallerViewSet(viewsets.ModelViewSet):
     permission_classes = [IsProjectAdmin,IsAuthenticated]
 
 
-class ContactViewSet(viewsets.ModelViewSet):
+class ContactViewSet(ValuesReadPathMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Contact.objects.all()
     serializer_class = ContactSerializer
+    values_projection_class = ContactProjection
     permission_classes = [IsAuthenticated, IsProjectAdminOrCaller|IsAdminUser]
 
     def get_serializer_context(self):
@@ -845,15 +736,11 @@ class ContactViewSet(viewsets.ModelViewSet):
         if project_id:
             try:
                 project = Project.objects.get(id=project_id)
-                if not (user.is_superuser or ProjectMembership.objects.filter(
-                        project=project, user=user
-                ).exists()):
+                if not (user.is_superuser or has_project_role(self.request, project.id)):
                     return Contact.objects.none()
 
                 # بررسی نقش کاربر در پروژه
-                is_admin = ProjectMembership.objects.filter(
-                    project=project, user=user, role='admin'
-                ).exists()
+                is_admin = has_project_role(self.request, project.id, ['admin'])
 
                 if user.is_superuser or is_admin:
                     # ادمین همه مخاطبین پروژه را می‌بیند
@@ -864,16 +751,10 @@ class ContactViewSet(viewsets.ModelViewSet):
                         project=project,
                         assigned_caller=user
                     )
-                contacts_qs = contacts_qs.prefetch_related(
-                    'calls__answers__selected_choice',
-                    'calls__answers__question',
-                    'assigned_caller',
-                    'project'
-                )
                 # Filter on call status if provided (via relation)
                 if status_filter:
                     contacts_qs = contacts_qs.filter(call_status=status_filter)
-                return contacts_qs
+                return self._with_serializer_data(contacts_qs)
 
             except Project.DoesNotExist:
                 return Contact.objects.none()
@@ -883,28 +764,33 @@ class ContactViewSet(viewsets.ModelViewSet):
             contacts_qs = queryset.all()
         else:
             user_projects = Project.objects.filter(members=user)
-            is_admin_in_any_project = ProjectMembership.objects.filter(
-                project__in=user_projects,
-                user=user,
-                role='admin'
-            ).exists()
+            is_admin_in_any_project = any(
+                'admin' in roles for roles in get_project_roles(self.request).values()
+            )
 
             if is_admin_in_any_project:
                 contacts_qs = queryset.filter(project__in=user_projects)
             else:
                 contacts_qs = queryset.filter(assigned_caller=user)
 
-            # Eager loading (applied globally)
-            contacts_qs = contacts_qs.prefetch_related(
-                'calls__answers__selected_choice',
-                'calls__answers__question',
-                'assigned_caller',
-                'project'
-            )
-
         # Filter on call status if provided
         if status_filter:
             contacts_qs = contacts_qs.filter(call_status=status_filter)
+        return self._with_serializer_data(contacts_qs)
+
+    def _with_serializer_data(self, contacts_qs):
+        """
+        Eager loading فقط برای فیلدهایی از ContactSerializer که در پاسخ هستند (?fields= / ?expand=)
+        """
+        if self.fields_requested('assigned_caller', 'assigned_caller_phone'):
+            contacts_qs = contacts_qs.select_related('assigned_caller')
+        if self.fields_requested('call_notes'):
+            contacts_qs = contacts_qs.prefetch_related(recent_call_notes_prefetch())
+        if self.fields_requested(
+            'contact_calls_count', 'contacts_calls_answered_count',
+            'contact_calls_not_answered_count', 'contacts_calls_rate',
+        ):
+            contacts_qs = annotate_phone_call_counters(contacts_qs)
         return contacts_qs
 
     def perform_create(self, serializer):
@@ -951,211 +837,20 @@ class ContactViewSet(viewsets.ModelViewSet):
             return Response({"error": "فایل ارسال نشده است"}, status=status.HTTP_400_BAD_REQUEST)
 
         # بررسی نوع فایل
-        if not file.name.endswith(('.xlsx', '.xls')):
+        if not file.name.lower().endswith(SPREADSHEET_EXTENSIONS):
             return Response({
-                "error": "فقط فایل‌های اکسل (.xlsx, .xls) پشتیبانی می‌شوند"
+                "error": "فقط فایل‌های اکسل (.xlsx, .xls) و CSV پشتیبانی می‌شوند"
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        # خطاهای آشکار (ستون ضروری، نبودن تماس‌گیرنده) همین حالا برگردانده می‌شوند
         try:
-            # خواندن فایل اکسل با تنظیمات ویژه برای جلوگیری از NaN
-            try:
-                df = pd.read_excel(file, na_values=['', ' ', 'NA', 'N/A', 'null'])
-
-                # جایگزینی همه مقادیر NaN با رشته خالی
-                df = df.fillna('')
-
-                # تبدیل تمام ستون‌ها به رشته برای جلوگیری از مشکلات نوع داده
-                df = df.astype(str)
-
-                # تمیز کردن مقادیر 'nan' string که ممکن است ایجاد شده باشد
-                df = df.replace('nan', '')
-                df = df.replace('None', '')
-
-            except Exception as e:
-                return Response({
-                    "error": f"خطا در خواندن فایل اکسل: {str(e)}"
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-            # بررسی وجود ستون‌های ضروری
-            required_columns = ['phone']
-            optional_columns = ['full_name', 'email', 'address', 'custom_fields']
-
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                return Response({
-                    "error": f"ستون‌های ضروری موجود نیستند: {', '.join(missing_columns)}",
-                    "required_columns": required_columns,
-                    "optional_columns": optional_columns,
-                    "available_columns": list(df.columns)
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-            # دریافت لیست تماس‌گیرندگان فعال پروژه
-            project_callers = list(ProjectMembership.objects.filter(
-                project=project, role='caller'
-            ).select_related('user'))
-
-            if not project_callers:
-                return Response({
-                    "error": "در این پروژه هیچ تماس‌گیرنده‌ای وجود ندارد"
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-            successful_contacts = []
-            failed_contacts = []
-            updated_contacts = []
-
-            with transaction.atomic():
-                # ذخیره اطلاعات فایل آپلود شده
-                uploaded_file = UploadedFile.objects.create(
-                    file_name=file.name,
-                    file_path=f"uploads/contacts/{file.name}",
-                    file_type='contacts',
-                    records_count=len(df),
-                    project=project,
-                    uploaded_by=request.user
-                )
-
-                for index, row in df.iterrows():
-                    try:
-                        # تمیز کردن داده‌ها و جلوگیری از مقادیر NaN
-                        phone = clean_string_field(str(row.get('phone', '')).strip())
-                        full_name = clean_string_field(str(row.get('full_name', '')).strip())
-                        email = clean_string_field(str(row.get('email', '')).strip())
-                        address = clean_string_field(str(row.get('address', '')).strip())
-                        custom_fields = clean_string_field(str(row.get('custom_fields', '')).strip())
-
-                        # اطمینان از اینکه مقادیر 'nan' string تبدیل به رشته خالی شوند
-                        if phone.lower() == 'nan':
-                            phone = ''
-                        if full_name.lower() == 'nan':
-                            full_name = ''
-                        if email.lower() == 'nan':
-                            email = ''
-                        if address.lower() == 'nan':
-                            address = ''
-                        if custom_fields.lower() == 'nan':
-                            custom_fields = ''
-
-                        if not phone:
-                            failed_contacts.append({
-                                'row': index + 2,
-                                'data': safe_dict_conversion(row),
-                                'error': 'شماره تلفن الزامی است'
-                            })
-                            continue
-
-                        # اعتبارسنجی شماره تلفن
-                        normalized_phone = normalize_phone_number(phone)
-                        if not validate_phone_number(normalized_phone):
-                            failed_contacts.append({
-                                'row': index + 2,
-                                'data': safe_dict_conversion(row),
-                                'error': 'شماره تلفن نامعتبر است'
-                            })
-                            continue
-
-                        # اگر نام کامل وجود نداشت
-                        if not full_name:
-                            full_name = f"مخاطب {normalized_phone}"
-
-                        # بررسی وجود مخاطب
-                        existing_contact = Contact.objects.filter(
-                            project=project,
-                            phone=normalized_phone
-                        ).first()
-
-                        if existing_contact:
-                            # به‌روزرسانی مخاطب موجود
-                            existing_contact.full_name = full_name
-                            existing_contact.email = email if email and '@' in email else existing_contact.email
-                            existing_contact.address = address or existing_contact.address
-                            existing_contact.custom_fields = custom_fields or existing_contact.custom_fields
-                            existing_contact.is_active = True
-
-                            if not existing_contact.assigned_caller:
-                                random_caller = random.choice(project_callers)
-                                existing_contact.assigned_caller = random_caller.user
-
-                            existing_contact.save()
-
-                            updated_contacts.append({
-                                'id': existing_contact.id,
-                                'full_name': existing_contact.full_name,
-                                'phone': existing_contact.phone,
-                                'assigned_caller': existing_contact.assigned_caller.get_full_name() if existing_contact.assigned_caller else None,
-                                'custom_fields': existing_contact.custom_fields,
-                                'action': 'updated'
-                            })
-                        else:
-                            # ایجاد مخاطب جدید
-                            random_caller = random.choice(project_callers)
-                            normalized_phone = "0" + normalized_phone
-                            new_contact = Contact.objects.create(
-                                project=project,
-                                full_name=full_name,
-                                phone=normalized_phone,
-                                email=email if email and '@' in email else '',
-                                address=address or '',
-                                custom_fields=custom_fields or '',
-                                assigned_caller=random_caller.user,
-                                call_status='pending',
-                                created_by=request.user
-                            )
-
-                            successful_contacts.append({
-                                'id': new_contact.id,
-                                'full_name': new_contact.full_name,
-                                'phone': new_contact.phone,
-                                'assigned_caller': new_contact.assigned_caller.get_full_name(),
-                                'assigned_caller_id': new_contact.assigned_caller.id,
-                                'custom_fields': new_contact.custom_fields,
-                                'action': 'created'
-                            })
-
-                    except Exception as e:
-                        failed_contacts.append({
-                            'row': index + 2,
-                            'data': safe_dict_conversion(row),
-                            'error': str(e)
-                        })
-
-            # آماده کردن پاسخ با تبدیل ایمن به JSON
-            response_data = {
-                'message': 'فایل مخاطبین با موفقیت پردازش شد',
-                'file_id': uploaded_file.id,
-                'total_records': len(df),
-                'successful_count': len(successful_contacts),
-                'updated_count': len(updated_contacts),
-                'failed_count': len(failed_contacts),
-                'project_id': project.id,
-                'project_name': project.name,
-                'callers_count': len(project_callers)
-            }
-
-            if successful_contacts:
-                response_data['successful_contacts'] = successful_contacts
+            validate_upload(file, 'contacts', project)
+        except ImportJobError as e:
+            return Response({"error": str(e), **(e.details or {})}, status=status.HTTP_400_BAD_REQUEST)
 
-            if updated_contacts:
-                response_data['updated_contacts'] = updated_contacts
-
-            if failed_contacts:
-                response_data['failed_contacts'] = failed_contacts
-
-            if failed_contacts and not successful_contacts and not updated_contacts:
-                status_code = status.HTTP_400_BAD_REQUEST
-                response_data['message'] = 'پردازش فایل با خطا مواجه شد'
-            elif failed_contacts:
-                status_code = status.HTTP_207_MULTI_STATUS
-                response_data['message'] = 'فایل با موفقیت جزئی پردازش شد'
-            else:
-                status_code = status.HTTP_201_CREATED
-
-            return Response(response_data, status=status_code)
-
-        except Exception as e:
-            logger.error(f"خطا در پردازش فایل مخاطبین: {str(e)}")
-            return Response({
-                "error": f"خطای داخلی سرور: {str(e)}"
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        # خواندن و پردازش فایل در job پس‌زمینه (services.import_jobs.import_contacts_file)
+        uploaded_file = enqueue_import(file, 'contacts', project, request.user)
+        return import_accepted_response(request, uploaded_file)
 
     @action(detail=False, methods=['post'], url_path='request_new')
     def request_new_contact(self, request):
@@ -1324,7 +1019,7 @@ class ContactViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='statistics')
     def get_statistics(self, request):
         """
-        آمارهای کلی مخاطبین
+        آمارهای کلی مخاطبین (یک aggregate شرطی، کش شده به ازای پروژه و کاربر)
         """
         project_id = request.query_params.get('project_id')
         user = request.user
@@ -1342,6 +1037,7 @@ class ContactViewSet(viewsets.ModelViewSet):
                     )
 
                 base_queryset = Contact.objects.filter(project=project)
+                cache_project_id = project.id
             except Project.DoesNotExist:
                 return Response(
                     {"detail": "پروژه یافت نشد."},
@@ -1350,19 +1046,32 @@ class ContactViewSet(viewsets.ModelViewSet):
         else:
             # آمار کلی برای کاربر
             base_queryset = self.get_queryset()
-
-        statistics = {
-            'total_contacts': base_queryset.count(),
-            'pending_contacts': base_queryset.filter(call_status='pending').count(),
-            'contacted': base_queryset.filter(call_status='contacted').count(),
-            'follow_up': base_queryset.filter(call_status='follow_up').count(),
-            'not_interested': base_queryset.filter(call_status='not_interested').count(),
-            'assigned_to_me': base_queryset.filter(assigned_caller=user).count() if not user.is_superuser else None,
-            'unassigned': base_queryset.filter(assigned_caller__isnull=True).count(),
-        }
-
+            cache_project_id = None
+
+        statistics = cached_statistic(
+            'contact_statistics',
+            lambda: self._build_contact_statistics(base_queryset, user),
+            project_id=cache_project_id,
+            params={'user': user.pk, 'status': request.query_params.get('status')},
+            scope=CONTACTS_SCOPE,
+        )
         return Response(statistics)
 
+    @staticmethod
+    def _build_contact_statistics(base_queryset, user):
+        statistics = base_queryset.order_by().aggregate(
+            total_contacts=Count('pk'),
+            pending_contacts=Count('pk', filter=Q(call_status='pending')),
+            contacted=Count('pk', filter=Q(call_status='contacted')),
+            follow_up=Count('pk', filter=Q(call_status='follow_up')),
+            not_interested=Count('pk', filter=Q(call_status='not_interested')),
+            assigned_to_me=Count('pk', filter=Q(assigned_caller=user)),
+            unassigned=Count('pk', filter=Q(assigned_caller__isnull=True)),
+        )
+        if user.is_superuser:
+            statistics['assigned_to_me'] = None
+        return statistics
+
     @action(detail=False, methods=['post'], url_path='bulk-assign')
     def bulk_assign_contacts(self, request):
         """
@@ -1408,6 +1117,8 @@ class ContactViewSet(viewsets.ModelViewSet):
                         )
 
                     updated_count = contacts.update(assigned_caller=caller)
+                    invalidate_project_statistics(project.id)
+                    invalidate_contact_statistics(project.id)
 
                 except User.DoesNotExist:
                     return Response(
@@ -1443,16 +1154,17 @@ class ContactViewSet(viewsets.ModelViewSet):
                 {"error": "پروژه یافت نشد."},
                 status=status.HTTP_404_NOT_FOUND
             )
-class CallViewSet(viewsets.ModelViewSet):
+class CallViewSet(ValuesReadPathMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Call.objects.all()
     serializer_class = CallSerializer
+    values_projection_class = CallProjection
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         project_id = self.request.GET.get('project_id')
         if project_id :
             project  = get_object_or_404(Project,id=project_id)
-        queryset = super().get_queryset()
+        queryset = self._with_serializer_data(super().get_queryset())
         if self.request.user.is_staff:
             return queryset
         if project_id and project.created_by == self.request.user:
@@ -1460,6 +1172,23 @@ class CallViewSet(viewsets.ModelViewSet):
         # Callers can only see their own calls
         return queryset.filter(caller=self.request.user)
 
+    def _with_serializer_data(self, queryset):
+        """رابطه‌های CallSerializer فقط وقتی بارگذاری می‌شوند که در پاسخ باشند (?fields= / ?expand=)"""
+        relations = {
+            'contact': ('contact', 'contact_name', 'contact_phone'),
+            'caller': ('caller', 'caller_name'),
+            'project': ('project', 'project_name'),
+            'edited_by': ('edited_by',),
+        }
+        related = [name for name, fields in relations.items() if self.fields_requested(*fields)]
+        if related:
+            queryset = queryset.select_related(*related)
+        if self.fields_requested('answers'):
+            queryset = queryset.prefetch_related(Prefetch(
+                'answers', queryset=CallAnswer.objects.select_related('question', 'selected_choice').order_by('pk')
+            ))
+        return queryset
+
     def perform_create(self, serializer):
         serializer.save(caller=self.request.user)
 
@@ -1622,8 +1351,22 @@ class UploadedFileViewSet(viewsets.ReadOnlyModelViewSet):
         if user.is_superuser:
             return UploadedFile.objects.all()
         admin_projects = Project.objects.filter(projectmembership__user=user, projectmembership__role='admin')
+        if self.action == 'progress':
+            # آپلود کننده پیشرفت فایل خودش را می‌بیند (مثلا کاربر staff در ContactImportView)
+            return UploadedFile.objects.filter(Q(project__in=admin_projects) | Q(uploaded_by=user))
         return UploadedFile.objects.filter(project__in=admin_projects)
 
+    @action(detail=True, methods=['get'], url_path='progress', permission_classes=[IsAuthenticated])
+    def progress(self, request, pk=None):
+        """
+        وضعیت و پیشرفت job import فایل؛ کلاینت تا completed یا failed شدن آن را poll می‌کند
+        """
+        uploaded_file = self.get_object()
+        response = Response(UploadedFileProgressSerializer(uploaded_file).data)
+        if not uploaded_file.is_finished:
+            patch_cache_control(response, no_cache=True, no_store=True)
+        return response
+
     @action(detail=False, methods=["post"], url_path='contacts')
     def upload_contacts(self, request):
         project_id = request.data.get("project_id")
@@ -1687,121 +1430,42 @@ class ExportReportViewSet(viewsets.ReadOnlyModelViewSet):
         return Response({"detail": "Download endpoint not yet implemented."}, status=status.HTTP_501_NOT_IMPLEMENTED)
 
 
-class CachedStatisticsViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = CachedStatistics.objects.all()
-    serializer_class = CachedStatisticsSerializer
-    permission_classes = [IsAdminUser]
-
-
-#TODO request must change to get and start and end date must change also and queris must get optimised
-@api_view(['POST'])
+@api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def admin_dashboard_data(request):
+    """
+    داشبورد مدیریت؛ start_date و end_date (میلادی یا شمسی) و interval روند تماس‌ها
+    از query string خوانده می‌شوند.
+    """
     if not request.user.is_staff:
         return Response({'error': 'Access denied'}, status=403)
-    start_date = request.data.get('start_date')  # میلادی: "2025-03-14"
-    end_date = request.data.get('end_date')  # میلادی: "2025-03-21"
-    # فیلتر تاریخی
-    calls_qs = Call.objects.all()
-    if start_date:
-        calls_qs = calls_qs.filter(call_date__gte=start_date)
-    if end_date:
-        calls_qs = calls_qs.filter(call_date__lte=end_date)
-
-    # 1. Overview Statistics
-    total_projects = Project.objects.filter(status='active').count()
-    total_calls = calls_qs.count()
-    total_callers = CustomUser.objects.filter(
-        projectmembership__role='caller'
-    ).distinct().count()
-    successful_calls = calls_qs.filter(status='answered').count()
-    success_rate = (successful_calls / total_calls * 100) if total_calls > 0 else 0
-
-
-    # 2. Project Statistics
-    project_stats = []
-    project_stats = []
-    projects = Project.objects.filter(status='active')
-    for project in projects:
-        project_calls = calls_qs.filter(project=project)
-        total_calls_proj = project_calls.count()
-        successful_calls_proj = project_calls.filter(status='answered').count()
-        project_stats.append({
-            'name': project.name,
-            'total_calls': total_calls_proj,
-            'successful_calls': successful_calls_proj
-        })
-
-    # 3. Call Status Distribution
-    call_status_distribution = []
-    status_counts = calls_qs.values('call_result').annotate(count=Count('id'))
-
-    status_mapping = {
-        'answered': 'موفق',
-        'no_answer': 'ناموفق',
-        'busy': 'مشغول',
-        'unreachable': 'در دسترس نیست',
-        'wrong_number': 'خطا'
-    }
-
-    for status in status_counts:
-        call_status_distribution.append({
-            'name': status_mapping.get(status['call_result'], status['call_result']),
-            'value': status['count']
-        })
-    total_no_time_count = call_status_distribution[0]['value']
-    total_not_intrested_count = call_status_distribution[1]['value']
-    total_intrested_count = call_status_distribution[2]['value']
-    no_time_rate = (total_no_time_count / total_calls) * 100 if total_calls > 0 else 0
-    not_intrested_rate = (total_not_intrested_count / total_calls) * 100 if total_calls > 0 else 0
-    intersted_rate = (total_intrested_count / total_calls) * 100 if total_calls > 0 else 0
-    call_status_distribution[0]['value'] =  no_time_rate
-    call_status_distribution[1]['value'] = not_intrested_rate
-    call_status_distribution[2]['value'] = intersted_rate
-    # 4. Call Trends
-    call_trends = calls_qs.extra(
-        select={'date': 'DATE(call_date)'}
-    ).values('date').annotate(
-        calls=Count('id'),
-        successful=Count('id', filter=Q(call_result='answered'))
-    ).order_by('date')
-
-    # 5. Caller Performance
-    caller_performance = []
-    callers = CustomUser.objects.filter(projectmembership__role='caller').distinct()
-    for caller in callers:
-        caller_calls = calls_qs.filter(caller=caller)
-        total_calls_caller = caller_calls.count()
-        successful_calls_caller = caller_calls.filter(call_result='answered').count()
-        avg_duration = caller_calls.aggregate(Avg('duration'))['duration__avg'] or 0
-        success_rate_caller = (successful_calls_caller / total_calls_caller * 100) if total_calls_caller > 0 else 0
-
-        caller_performance.append({
-            'name': caller.get_full_name() or caller.username,
-            'total_calls': total_calls_caller,
-            'successful_calls': successful_calls_caller,
-            'success_rate': round(success_rate_caller, 1),
-            'avg_duration': round(avg_duration / 60, 1) if avg_duration else 0 ,
-            #"successful_calls_rate": 0  if total_calls_caller==0 else  total_calls_caller;# دقیقه
-        })
 
-    return Response({
+    try:
+        start_date = parse_report_date(request.query_params.get('start_date'))  # "2025-03-14" یا "1404-01-01"
+        end_date = parse_report_date(request.query_params.get('end_date'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    interval = request.query_params.get('interval', 'day')
+    if interval not in TIME_SERIES_INTERVALS:
+        return Response({'error': 'Invalid interval'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        validate_time_series_range(start_date, end_date, interval)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = cached_statistic(
+        'admin_dashboard',
+        lambda: get_admin_dashboard_snapshot(start_date, end_date, interval),
+        params={'start_date': start_date, 'end_date': end_date, 'interval': interval},
+    )
+    response = Response({
         'success': True,
-        'data': {
-            'total_projects': total_projects,
-            'total_calls': total_calls,
-            'total_callers': total_callers,
-            'success_rate': round(success_rate, 1),
-            'projectStats': project_stats,
-            "projectLength":len(project_stats),
-            'callStatusDistribution': call_status_distribution,
-            'callTrends': list(call_trends),
-            'callerPerformance': caller_performance,
-            "no_time_rate" : no_time_rate,
-            "not_intrested_rate":not_intrested_rate,
-            "intersted_rate" : intersted_rate
-        }
+        'data': data
     })
+    patch_cache_control(response, private=True, max_age=get_ttl('admin_dashboard'))
+    return response
+
+
 class LargePageSizePagination(PageNumberPagination):
     page_size = 100000
     page_size_query_param = 'page_size'
@@ -1834,197 +1498,50 @@ class CallExcelViewSet(XLSXFileMixin,viewsets.ReadOnlyModelViewSet):
 @permission_classes([IsAuthenticated])
 def dashboard_data(request):
     """
-    Simple dashboard data endpoint - returns raw data for client-side filtering
+    Dashboard snapshot endpoint - همه بخش‌ها با فیلتر پروژه و بازه تاریخ یکسان
     """
     project_id = request.GET.get('project_id')
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
+    interval = request.GET.get('interval', 'day')
+    try:
+        # تاریخ‌ها میلادی یا شمسی
+        start_date = parse_report_date(request.GET.get('start_date'))
+        end_date = parse_report_date(request.GET.get('end_date'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if interval not in TIME_SERIES_INTERVALS:
+        return Response({'error': 'Invalid interval'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        validate_time_series_range(start_date, end_date, interval)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     # بررسی دسترسی کاربر
     user = request.user
     if not (user.is_superuser or user.is_staff):
         # محدود کردن به پروژه‌هایی که کاربر در آن‌ها ادمین است
-        admin_projects = ProjectMembership.objects.filter(
+        allowed_project_ids = list(ProjectMembership.objects.filter(
             user=user, role='admin'
-        ).values_list('project_id', flat=True)
+        ).values_list('project_id', flat=True))
 
-        if not admin_projects:
+        if not allowed_project_ids:
             return Response({
                 'error': 'شما اجازه دسترسی به این گزارش را ندارید'
             }, status=status.HTTP_403_FORBIDDEN)
-
-    # شروع query اصلی
-    calls_query = Call.objects.all().select_related('caller', 'project', 'contact')
-
-    # اعمال فیلترهای تاریخی
-    if start_date:
-        calls_query = calls_query.filter(call_date__gte=start_date)
-    if end_date:
-        calls_query = calls_query.filter(call_date__lte=end_date)
-
-    # فیلتر پروژه خاص
-    if project_id:
-        calls_query = calls_query.filter(project_id=project_id)
-
-    # محدود کردن دسترسی برای کاربران غیر ادمین
-    if not (user.is_superuser or user.is_staff):
-        calls_query = calls_query.filter(project__in=admin_projects)
-
-    # Get all data without filtering - let client handle filtering
-    all_calls = Call.objects.all().select_related('contact', 'project', 'caller')
-    all_projects = Project.objects.all()
-    all_callers = CustomUser.objects.filter(projectmembership__role='caller')
-
-    intersted_calls = all_calls.filter(call_result='interested').count()
-    if all_calls.count() == 0:
-        success_rate = 0
     else:
-        success_rate = intersted_calls / all_calls.count() * 100
-
-    # عملکرد تماس‌گیرندگان - استفاده از query بهبود یافته
-    caller_stats = calls_query.values(
-        'caller__id',
-        'caller__username',
-        'caller__first_name',
-        'caller__last_name',
-        'caller__phone_number'
-    ).annotate(
-        # تعداد کل تماس‌ها
-        total_calls=Count('id'),
-
-        # تماس‌های پاسخ داده شده (status='answered')
-        answered_calls=Count(
-            Case(
-                When(status='answered', then=1),
-                output_field=IntegerField()
-            )
-        ),
-
-        # تماس‌های موفق (call_result='interested')
-        successful_calls=Count(
-            Case(
-                When(call_result='interested', then=1),
-                output_field=IntegerField()
-            )
-        ),
-
-        # مجموع مدت تماس‌ها (به ثانیه)
-        total_duration_seconds=Coalesce(Sum('duration'), 0),
-
-        # میانگین مدت تماس (فقط برای تماس‌های پاسخ داده شده)
-        avg_call_duration_seconds=Coalesce(
-            Avg('duration', filter=Q(status='answered')), 0.0
-        ),
-
-        # تعداد پروژه‌های مختلف که در آن‌ها تماس گرفته
-        project_count=Count('project', distinct=True)
-
-    ).annotate(
-        # نرخ پاسخ‌دهی (درصد تماس‌هایی که پاسخ داده شد)
-        response_rate=Case(
-            When(total_calls=0, then=0.0),
-            default=F('answered_calls') * 100.0 / F('total_calls'),
-            output_field=FloatField()
-        ),
-
-        # نرخ موفقیت (درصد تماس‌های موفق از کل تماس‌ها)
-        success_rate=Case(
-            When(total_calls=0, then=0.0),
-            default=F('successful_calls') * 100.0 / F('total_calls'),
-            output_field=FloatField()
-        ),
-
-        # نرخ تبدیل (درصد تماس‌های موفق از تماس‌های پاسخ داده شده)
-        conversion_rate=Case(
-            When(answered_calls=0, then=0.0),
-            default=F('successful_calls') * 100.0 / F('answered_calls'),
-            output_field=FloatField()
-        )
-    ).order_by('-total_calls')
-
-    # تبدیل نتایج به فرمت مطلوب
-    caller_performance_data = []
-
-    for caller in caller_stats:
-        # ساخت نام کامل
-        full_name = f"{caller['caller__first_name'] or ''} {caller['caller__last_name'] or ''}".strip()
-        if not full_name:
-            full_name = caller['caller__username']
-
-        # تبدیل ثانیه به دقیقه:ثانیه برای نمایش بهتر
-        total_minutes = int(caller['total_duration_seconds'] // 60)
-        total_seconds = int(caller['total_duration_seconds'] % 60)
-
-        avg_minutes = int(caller['avg_call_duration_seconds'] // 60)
-        avg_seconds_remainder = int(caller['avg_call_duration_seconds'] % 60)
-
-        caller_performance_data.append({
-            'caller_id': caller['caller__id'],
-            'name': full_name,
-            'username': caller['caller__username'],
-            'phone_number': caller['caller__phone_number'],
-            'total_calls': caller['total_calls'],
-            'answered_calls': caller['answered_calls'],
-            'successful_calls': caller['successful_calls'],
-            'response_rate': round(caller['response_rate'], 2),
-            'success_rate': round(caller['success_rate'], 2),
-            'conversion_rate': round(caller['conversion_rate'], 2),
-            'avg_call_duration_formatted': f"{avg_minutes}:{avg_seconds_remainder:02d}",
-            'avg_call_duration_seconds': round(caller['avg_call_duration_seconds'], 2),
-            'total_duration_formatted': f"{total_minutes}:{total_seconds:02d}",
-            'total_duration_seconds': caller['total_duration_seconds'],
-            'project_count': caller['project_count'],
-            # برای سازگاری با کد قبلی
-            'total_calls_all_projects': caller['total_calls'],
-            'total_successful_calls_all_projects': caller['successful_calls'],
-            'total_answered_calls_all_projects': caller['answered_calls'],
-            'total_duration_all_projects': caller['total_duration_seconds'],
-            'overall_response_rate': round(caller['response_rate'], 2),
-            'overall_success_rate': round(caller['success_rate'], 2),
-            'overall_conversion_rate': round(caller['conversion_rate'], 2),
-            'overall_avg_duration': round(caller['avg_call_duration_seconds'], 2)
-        })
-
-    # Basic stats
-    dashboard_data_response = {
-        'total_projects': all_projects.count(),
-        'total_calls': all_calls.count(),
-        'total_callers': all_callers.count(),
-        'success_rate': success_rate,
-
-        # Project stats - raw data
-        'projectStats': [
-            {
-                'id': project.id,
-                'name': project.name,
-                'total_calls': project.calls.count(),
-                'successful_calls': project.calls.filter(call_result='interested').count()
-            }
-            for project in all_projects
-        ],
-
-        # Call status distribution - raw counts
-        'callStatusDistribution': [
-            {'name': 'interested', 'count': all_calls.filter(call_result='interested').count()},
-            {'name': 'not_interested', 'count': all_calls.filter(call_result='not_interested').count()},
-            {'name': 'no_time', 'count': all_calls.filter(call_result='no_time').count()},
-        ],
-
-        # Call trends - raw data by date
-        'callTrends': list(
-            all_calls.extra(select={'date': 'DATE(call_date)'})
-            .values('date')
-            .annotate(
-                calls=Count('id'),
-                successful=Count('id', filter=Q(call_result='interested'))
-            )
-            .order_by('date')
-        ),
-
-        # Caller performance - بر اساس query جدید
-        'callerPerformance': caller_performance_data
-    }
-
+        allowed_project_ids = None
+
+    dashboard_data_response = cached_statistic(
+        'dashboard',
+        lambda: get_dashboard_snapshot(project_id, allowed_project_ids, start_date, end_date, interval),
+        params={
+            'project_id': project_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'interval': interval,
+            # نتیجه برای کاربران غیر ادمین به پروژه‌های خودشان محدود است
+            'scope': allowed_project_ids,
+        },
+    )
     return Response(dashboard_data_response)
 
 
@@ -2086,113 +1603,34 @@ def has_project_access(user, project):
 
 def get_project_general_statistics(project):
     """دریافت آمار کلی پروژه"""
-
-    # تعداد کل مخاطبین
-    total_contacts = project.contacts.filter(is_active=True).count()
-
-    # تعداد کل تماس‌ها
-    total_calls = project.calls.count()
-
-    # تماس‌های موفق (نتیجه interested)
-    successful_calls = project.calls.filter(call_result='interested').count()
-
-    # تماس‌های پاسخ داده شده (وضعیت answered)
-    answered_calls = project.calls.filter(status='answered').count()
-
-    # محاسبه نرخ‌ها
-    success_rate = (successful_calls / total_calls * 100) if total_calls > 0 else 0
-    answer_rate = (answered_calls / total_calls * 100) if total_calls > 0 else 0
+    statistics = project.get_statistics()
 
     return {
-        "total_contacts": total_contacts,
-        "total_calls": total_calls,
-        "successful_calls": successful_calls,
-        "answered_calls": answered_calls,
-        "success_rate": round(success_rate, 2),
-        "answer_rate": round(answer_rate, 2)
+        "total_contacts": statistics['active_contacts'],
+        "total_calls": statistics['total_calls'],
+        "successful_calls": statistics['successful_calls'],
+        "answered_calls": statistics['answered_calls'],
+        "success_rate": statistics['success_rate'],
+        "answer_rate": statistics['answer_rate']
     }
 
 
 def get_caller_performance(project):
-    """دریافت عملکرد تماس‌گیرندگان پروژه"""
-
-    # دریافت همه تماس‌گیرندگانی که در این پروژه تماس گرفته‌اند
-    callers_with_calls = User.objects.filter(
-        calls__project=project
-    ).distinct()
-
-    caller_performance = []
-
-    for caller in callers_with_calls:
-        # تماس‌های این تماس‌گیرنده در این پروژه
-        caller_calls = project.calls.filter(caller=caller)
-
-        # آمارهای پایه
-        total_calls = caller_calls.count()
+    """دریافت عملکرد تماس‌گیرندگان پروژه (از کش آمار)"""
+    return cached_statistic(
+        'caller_performance', lambda: build_caller_performance(project), project_id=project.pk
+    )
 
-        # تماس‌های با نتایج مختلف
-        interested_calls = caller_calls.filter(call_result='interested').count()
-        no_time_calls = caller_calls.filter(call_result='no_time').count()
-        not_interested_calls = caller_calls.filter(call_result='not_interested').count()
 
-        # تماس‌های با وضعیت‌های مختلف
-        answered_calls = caller_calls.filter(status='answered').count()
-        no_answer_calls = caller_calls.filter(status='no_answer').count()
-        wrong_number_calls = caller_calls.filter(status='wrong_number').count()
-        pending_calls = caller_calls.filter(status='pending').count()
-
-        # مدت زمان مکالمه (فقط برای تماس‌هایی که duration دارند)
-        duration_stats = caller_calls.exclude(duration__isnull=True).aggregate(
-            total_duration=Sum('duration'),
-            avg_duration=Avg('duration')
-        )
-
-        total_duration = duration_stats['total_duration'] or 0
-        avg_duration = duration_stats['avg_duration'] or 0
-
-        # محاسبه نرخ‌ها
-        success_rate = (interested_calls / total_calls * 100) if total_calls > 0 else 0
-        answer_rate = (answered_calls / total_calls * 100) if total_calls > 0 else 0
+def build_caller_performance(project):
+    caller_performance = get_caller_performance_rows(
+        project, rollups=filter_rollups(project_ids=[project.pk])
+    )
 
+    for caller_data in caller_performance:
         # تبدیل مدت زمان از ثانیه به دقیقه و ثانیه
-        avg_duration_formatted = format_duration(avg_duration)
-        total_duration_formatted = format_duration(total_duration)
-
-        caller_data = {
-            "caller_id": caller.id,
-            "first_name": caller.first_name,
-            "last_name": caller.last_name,
-            "full_name": caller.get_full_name(),
-            "username": caller.username,
-            "phone_number": getattr(caller, 'phone_number', ''),
-            "total_calls": total_calls,
-
-            # تماس‌های بر اساس نتیجه
-            "interested_calls": interested_calls,
-            "no_time_calls": no_time_calls,
-            "not_interested_calls": not_interested_calls,
-
-            # تماس‌های بر اساس وضعیت
-            "answered_calls": answered_calls,
-            "no_answer_calls": no_answer_calls,
-            "wrong_number_calls": wrong_number_calls,
-            "pending_calls": pending_calls,
-
-            # نرخ‌ها
-            "success_rate": round(success_rate, 2),  # نرخ علاقه‌مندی
-            "answer_rate": round(answer_rate, 2),  # نرخ پاسخ‌دهی
-
-            # مدت زمان
-            "total_duration_seconds": total_duration,
-            "avg_duration_seconds": round(avg_duration, 2),
-            "total_duration_formatted": total_duration_formatted,
-            "avg_duration_formatted": avg_duration_formatted,
-
-            # جزئیات اضافی
-            "calls_with_duration": caller_calls.exclude(duration__isnull=True).count()
-        }
-
-        caller_performance.append(caller_data)
+        caller_data["total_duration_formatted"] = format_duration(caller_data["total_duration_seconds"])
+        caller_data["avg_duration_formatted"] = format_duration(caller_data["avg_duration_seconds"])
 
     # مرتب‌سازی بر اساس تعداد تماس‌های موفق (علاقه‌مند) نزولی
     caller_performance.sort(key=lambda x: x['interested_calls'], reverse=True)
@@ -2211,14 +1649,16 @@ def format_duration(seconds):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_stats(request):
-    project_count = Project.objects.count()
-    calls_count = Call.objects.count()
-    answered_calls_count = Call.objects.filter(status='answered').count()
-    pending_calls_count = Call.objects.filter(status='pending').count()
-    result = {"project_count":project_count,
-              "calls_count":calls_count,
-              "answered_calls_count":answered_calls_count,
-              "pending_calls_count":pending_calls_count,
+    """
+    شمارش‌های صفحه اصلی از جدول شمارنده‌های سراسری (O(1)).
+    با estimated=true تعداد کل پروژه‌ها و تماس‌ها از آمار PostgreSQL خوانده می‌شود.
+    """
+    estimated = request.query_params.get('estimated', '').lower() in ('1', 'true')
+    counts = get_global_counts(estimated=estimated)
+    result = {"project_count":counts[GlobalCounter.PROJECTS],
+              "calls_count":counts[GlobalCounter.CALLS],
+              "answered_calls_count":counts[GlobalCounter.call_status_name('answered')],
+              "pending_calls_count":counts[GlobalCounter.call_status_name('pending')],
     }
     return Response(result,status=status.HTTP_200_OK)
 
@@ -2232,7 +1672,7 @@ class ContactImportView(APIView):
 
     def post(self, request, project_id):
         """
-        آپلود فایل اکسل و افزودن مخاطبین جدید.
+        آپلود فایل اکسل و افزودن مخاطبین جدید (در پس‌زمینه).
         اگر تماس‌گیرنده وجود داشته باشد، اختصاص داده می‌شود.
         """
         project = get_object_or_404(Project, id=project_id)
@@ -2244,24 +1684,9 @@ class ContactImportView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            created_contacts = import_contacts_from_excel(file_obj, project)
-            return Response(
-                {
-                    "message": f"{len(created_contacts)} مخاطب با موفقیت اضافه شد.",
-                    "created_count": len(created_contacts),
-                    "contacts": created_contacts,  # شامل شماره و نام
-                    "project": project.name,
-                },
-                status=status.HTTP_201_CREATED
-            )
-
-        except Exception as e:
-            traceback.print_exc()
-            return Response(
-                {"error": f"خطا در پردازش فایل: {str(e)}"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        # پردازش در job پس‌زمینه (services.import_jobs.import_assigned_contacts_file)
+        uploaded_file = enqueue_import(file_obj, 'assigned_contacts', project, request.user)
+        return import_accepted_response(request, uploaded_file)
 
 class QuestionViewSet(viewsets.ModelViewSet):
     """
@@ -14,4 +14,12 @@ app.conf.beat_schedule = {
         'task': 'call_center.tasks.check_special_contacts',
         'schedule': crontab(hour='*/6'),  # هر ۶ ساعت یک‌بار
     },
+    'reconcile-global-counters': {
+        'task': 'reconcile_global_counters_task',
+        'schedule': crontab(minute=30, hour=3),  # هر شب ساعت ۳:۳۰
+    },
+    'fail-stale-import-jobs': {
+        'task': 'fail_stale_import_jobs_task',
+        'schedule': crontab(minute='*/15'),  # هر ۱۵ دقیقه
+    },
 }
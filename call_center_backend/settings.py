@@ -10,11 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+import sys
 from email.policy import default
 from pathlib import Path
 import dj_database_url
 from dotenv import load_dotenv
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 
 load_dotenv()
@@ -25,6 +27,9 @@ TSMS_PASSWORD = os.getenv('TSMS_PASSWORD')
 TSMS_FROM_NUMBER =os.getenv('TSMS_FROM_NUMBER')
 DEV_PHONE = os.getenv('DEV_PHONE')
 
+# اجرای `manage.py test`
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -58,6 +63,26 @@ CORS_ALLOWED_ORIGINS = [
     'https://callcenter.liara.run'
 ]
 CORS_ALLOW_CREDENTIALS = True
+
+# پروفایل رندر پاسخ‌ها: development با رابط BrowsableAPI و production بدون آن
+API_RENDERER_PROFILE = os.getenv('API_RENDERER_PROFILE', 'development')
+API_RENDERER_PROFILES = {
+    'development': (
+        'call_center.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'drf_excel.renderers.XLSXRenderer',
+    ),
+    'production': (
+        'call_center.renderers.FastJSONRenderer',
+        'drf_excel.renderers.XLSXRenderer',
+    ),
+}
+if API_RENDERER_PROFILE not in API_RENDERER_PROFILES:
+    raise ImproperlyConfigured(
+        f"Unknown API_RENDERER_PROFILE {API_RENDERER_PROFILE!r}; "
+        f"choose one of: {', '.join(API_RENDERER_PROFILES)}."
+    )
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -70,12 +95,9 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
-    'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-        'drf_excel.renderers.XLSXRenderer',
-    ),
+    'DEFAULT_RENDERER_CLASSES': API_RENDERER_PROFILES[API_RENDERER_PROFILE],
 }
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -109,6 +131,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
 ]
+# silk هر درخواست را با کوئری‌های خودش (EXPLAIN، ذخیره پروفایل) ثبت می‌کند و شمارش
+# کوئری تست‌ها را به هم می‌زند؛ در تست‌ها غیرفعال است
+if TESTING:
+    MIDDLEWARE.remove("silk.middleware.SilkyMiddleware")
 
 ROOT_URLCONF = 'call_center_backend.urls'
 
@@ -187,6 +213,9 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Tehran'
+# در تست‌ها (و با CELERY_TASK_ALWAYS_EAGER=1) تسک‌ها همان‌جا اجرا می‌شوند، بدون broker
+CELERY_TASK_ALWAYS_EAGER = TESTING or os.getenv('CELERY_TASK_ALWAYS_EAGER') == '1'
+CELERY_TASK_EAGER_PROPAGATES = CELERY_TASK_ALWAYS_EAGER
 
 # تنظیمات Celery Beat برای اجرای دوره‌ای
 CELERY_BEAT_SCHEDULE = {
@@ -196,9 +225,9 @@ CELERY_BEAT_SCHEDULE = {
     },
 }
 
- DATABASES = {
-   'default': dj_database_url.config(default=os.environ.get("DATABASE_URL")),
- }
+DATABASES = {
+    'default': dj_database_url.config(default=os.environ.get("DATABASE_URL")),
+}
 
 
 #DATABASES = {
@@ -213,3 +242,30 @@ CELERY_BEAT_SCHEDULE = {
 #    }
 
 
+
+# Cache
+# در production با تنظیم REDIS_CACHE_URL از Redis استفاده می‌شود؛ در توسعه و تست از حافظه محلی
+REDIS_CACHE_URL = os.getenv('REDIS_CACHE_URL')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'KEY_PREFIX': 'call_center',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'call-center-statistics',
+        }
+    }
+
+# کش آمار (call_center/services/cache.py)
+STATISTICS_CACHE_ALIAS = 'default'
+STATISTICS_CACHE_TTLS = {
+    'default': int(os.getenv('STATISTICS_CACHE_TTL', 300)),
+    'dashboard': int(os.getenv('DASHBOARD_CACHE_TTL', 120)),
+    'admin_dashboard': int(os.getenv('DASHBOARD_CACHE_TTL', 120)),
+}